@@ -1,383 +1,56 @@
-import datetime
 import streamlit as st
-import pandas as pd
-from components.customer import (
-    add_customer, get_customer_by_phone, get_all_customers, remove_customer_if_combos_used_up,
-    edit_customer, delete_customer, add_combo_to_existing_customer, remove_combo_from_customer, export_customers_to_csv
-)
-from components.combo import (
-    add_combo_type, get_combo_types, delete_combo_type, get_customer_combos, add_combo, get_services_for_combo
-)
-from components.appointment import (
-    book_appointment, get_customer_appointments, get_appointment_by_date, delete_appointment, edit_appointment
-)
-from components.notifications import (
-    send_appointment_confirmation, send_appointment_cancellation
-)
+from components.backup import start_backup_scheduler
+from components.combo_ledger import start_reconciliation_job
+from components.instrumentation import begin_rerun
+from components.log import configure_logging
+from components.notifications import get_sms_channel, start_email_worker
+from components.reminders import start_reminder_scheduler
 
-# Set the title of the app
-st.title("Ani's Threading and Skincare Management System")
-
-# Sidebar menu
-menu = ["Home", "Customer Management", "Customer N Combo", "Appointment Management", "View Appointments", "Download Data", "Combo Management"]
-choice = st.sidebar.selectbox("Menu", menu)
-
-# ============================
-# Home Page
-# ============================
-if choice == "Home":
-    st.subheader("Welcome to Ani's Threading and Skincare Management System!")
-    st.write("""
-        This system allows you to:
-        - Manage customers and assign combos.
-        - Handle combo packages for discounted services.
-        - Schedule and manage appointments.
-        - Track combo usage and appointment history.
-    """)
-
-# ============================
-# Customer Management
-# ============================
-elif choice == "Customer Management":
-    st.subheader("Customer Management")
-
-    # Add a new customer with a combo
-    st.write("### Add a New Customer with Combo")
-    name = st.text_input("Customer Name")
-    phone = st.text_input("Phone Number")
-    email = st.text_input("Email Address")
-
-    # Dropdown to select a combo type
-    combo_types = get_combo_types()
-    if combo_types:
-        combo_type_options = {f"{combo['name']} (Uses: {combo['total_uses']})": combo['id'] for combo in combo_types}
-        selected_combo = st.selectbox("Select a Combo", options=list(combo_type_options.keys()))
-        selected_combo_id = combo_type_options[selected_combo]
-    else:
-        st.warning("No combo types available. Please add combos in the Combo Management tab.")
-        selected_combo_id = None
-
-    if st.button("Add Customer with Combo"):
-        if selected_combo_id and add_customer(name, phone, email, selected_combo_id):
-            st.success(f"Customer '{name}' added successfully with combo '{selected_combo}'!")
-            st.session_state["search_query"] = phone  # Auto-store newly added customer for quick lookup
-            st.rerun()
-        else:
-            st.error("Failed to add the customer. Please ensure the information is correct.")
-
-    # Search for a customer by phone
-    st.write("### Search Customer by Phone")
-
-    # Ensure search query persists in session state
-    if "search_query" not in st.session_state:
-        st.session_state["search_query"] = ""
-
-    search_query = st.text_input("Enter Customer Phone Number", st.session_state["search_query"])
-
-    if st.button("Search"):
-        customer = get_customer_by_phone(search_query)
-        if customer:
-            st.session_state["search_query"] = search_query  # Persist search query
-            st.session_state["customer_data"] = customer  # Store customer data
-            st.session_state["editing"] = False  # Ensure editing state resets
-        else:
-            st.error("Customer not found.")
+# Component logs to stderr; level and format come from SALON_LOG_LEVEL / SALON_LOG_FORMAT
+configure_logging()
 
-    # Display customer details if found
-    if "customer_data" in st.session_state and st.session_state["customer_data"]:
-        customer = st.session_state["customer_data"]
+# Send queued confirmation/cancellation emails in the background
+start_email_worker()
 
-        st.write("### Customer Details")
-        st.write(f"**ID:** {customer['ID']}")
-        st.write(f"**Name:** {customer['Name']}")
-        st.write(f"**Phone:** {customer['Phone']} (Phone Number is not editable)")
-        st.write(f"**Email:** {customer['Email']}")
-        st.write(f"**Combos:** {customer['Combos']}")
+# Rotating database snapshots in database/backups
+start_backup_scheduler()
 
-        # Edit Customer Button
-        with st.expander("Edit Customer"):
-            new_name = st.text_input("New Name", customer['Name'])
-            new_email = st.text_input("New Email", customer['Email'])
+# Periodically check combo balances against the usage ledger
+start_reconciliation_job()
 
-            if st.button("Update Customer Details"):
-                result = edit_customer(customer['ID'], new_name, new_email)
-
-                if result == 'email_exists':
-                    st.error(f"Failed to update customer. Email '{new_email}' is already in use by another customer.")
-                elif result:
-                    st.success(f"Customer {customer['Name']} updated successfully!")
-                    st.session_state["customer_data"]["Name"] = new_name  # Update session data
-                    st.session_state["customer_data"]["Email"] = new_email
-                    st.rerun()
-                else:
-                    st.error("Failed to update customer.")
-
-        # Delete Customer Button (No Confirmation, Immediate Deletion)
-        if st.button("Delete Customer"):
-            delete_status = delete_customer(customer['ID'])  # Try deleting the customer
-            if delete_status:
-                st.success(f"Customer {customer['Name']} deleted successfully!")
-                
-                # Ensure UI refreshes correctly
-                st.session_state.pop("customer_data", None)
-                st.session_state.pop("search_query", None)
-                st.rerun()
-            else:
-                st.error("Failed to delete customer. Customer might not exist.")
-
-
-# ============================
-# Customer N Combo Management
-# ============================
-elif choice == "Customer N Combo":
-    st.subheader("Customer & Combo Management")
-
-    # Search for customer by phone
-    st.write("### Search for a Customer")
-    phone = st.text_input("Enter Customer Phone Number")
-
-    if st.button("Search Customer"):
-        customer = get_customer_by_phone(phone)
-        if customer:
-            st.session_state["customer_data"] = customer
-        else:
-            st.error("Customer not found.")
-
-    # Display and manage customer combos
-    if "customer_data" in st.session_state and st.session_state["customer_data"]:
-        customer = st.session_state["customer_data"]
-        st.write(f"**Customer Name:** {customer['Name']}")
-        st.write(f"**Phone:** {customer['Phone']}")
-        st.write(f"**Email:** {customer['Email']}")
-
-        # Display customer's current combos
-        st.write("### Combos for the Customer:")
-        if customer["Combos"]:
-            for combo in customer["Combos"]:
-                st.write(f"- {combo['name']} ({combo['remaining_uses']})")
-            
-            # Remove a combo
-            combo_options = {f"{combo['name']}": combo["id"] for combo in customer["Combos"]}
-            selected_combo_to_remove = st.selectbox("Select a Combo to Remove", options=list(combo_options.keys()))
-
-            if st.button("Remove Selected Combo"):
-                if remove_combo_from_customer(customer["ID"], combo_options[selected_combo_to_remove]):
-                    st.success(f"Combo '{selected_combo_to_remove}' removed successfully.")
-                    st.rerun()
-                else:
-                    st.error("Failed to remove combo.")
-
-        else:
-            st.write("No active combos.")
-
-        # Add a new combo
-        st.write("### Add a New Combo for This Customer")
-        available_combos = get_combo_types()
-        combo_selection = {f"{combo['name']} (Uses: {combo['total_uses']})": combo['id'] for combo in available_combos}
-        new_combo_selected = st.selectbox("Select a New Combo", options=list(combo_selection.keys()))
-
-        if st.button("Add Selected Combo"):
-            if add_combo_to_existing_customer(customer["ID"], combo_selection[new_combo_selected]):
-                st.success(f"New combo '{new_combo_selected}' added successfully!")
-                st.rerun()
-            else:
-                st.error("Failed to add combo.")
-
-# ============================
-# Appointment Management
-# ============================
-elif choice == "Appointment Management":
-    st.subheader("Appointment Management")
-
-    st.write("### Book an Appointment")
-    phone = st.text_input("Customer Phone Number (for appointment)")
-    date = st.date_input("Appointment Date")
-
-    customer = get_customer_by_phone(phone) if phone else None
-
-    if customer:
-        all_services = get_services_for_combo(None)
-        service_options = {service['name']: service['id'] for service in all_services}
-        selected_service = st.selectbox("Select a Service", list(service_options.keys()))
-        selected_service_id = service_options[selected_service]
-
-        use_combo = st.checkbox("Use Available Combo")
-        selected_combo_id = None
-
-        if use_combo:
-            available_combos = get_customer_combos(customer["ID"])
-            if available_combos:
-                combo_options = {f"{combo['name']} (Remaining: {combo['remaining_uses']})": combo['id'] for combo in available_combos}
-                selected_combo = st.selectbox("Select a Combo", options=list(combo_options.keys()))
-                selected_combo_id = combo_options[selected_combo]
-            else:
-                st.warning("No available combos for this customer.")
-
-        if st.button("Book Appointment"):
-            if book_appointment(customer["ID"], selected_service_id, str(date), use_combo=True, combo_id=selected_combo_id):
-                st.success(f"Appointment booked for {customer['Name']} on {date} with service {selected_service}!")
-                
-                # Send email confirmation if customer has an email
-                if customer["Email"]:
-                    send_appointment_confirmation(
-                        customer["ID"], # Pass customer ID
-                        customer["Name"],
-                        customer["Email"],
-                        selected_service,
-                        date,
-                        selected_combo_id #pass the booked combo ID
-                    )
-                
-                st.rerun()
-            else:
-                st.error("Failed to book appointment.")
-
-# ============================
-# View Appointments
-# ============================
-elif choice == "View Appointments":
-    st.subheader("View Appointments")
-
-    # Ensure selected date exists and is valid
-    if "selected_date" not in st.session_state or not isinstance(st.session_state["selected_date"], datetime.date):
-        st.session_state["selected_date"] = datetime.date.today()  # Default to today
-
-    # Properly set date_to_check
-    date_to_check = st.date_input("Select a Date", value=st.session_state["selected_date"])
-
-    if st.button("View Appointments by Date"):
-        st.session_state["selected_date"] = date_to_check  # Store selected date
-        appointments = get_appointment_by_date(str(st.session_state["selected_date"]))
-        st.session_state["appointments"] = appointments  # Store appointments in session
-        st.rerun()  # Refresh UI
-
-    # Display appointments
-    if "appointments" in st.session_state and st.session_state["appointments"]:
-        for appointment in st.session_state["appointments"]:
-            st.write(f"**Appointment ID:** {appointment['ID']}")
-            st.write(f"**Customer:** {appointment['Name']} ({appointment['Phone']})")
-            st.write(f"**Service:** {appointment['Service']}")
-            st.write(f"**Date:** {appointment['Date']}")
-
-            # Delete appointment button
-            if st.button(f"Delete Appointment {appointment['ID']}", key=f"delete_appointment_{appointment['ID']}"):
-                if delete_appointment(appointment['ID']):
-                    st.success(f"Appointment ID {appointment['ID']} deleted successfully!")
-
-                    # Remove deleted appointment from session manually
-                    st.session_state["appointments"] = [
-                        appt for appt in st.session_state["appointments"] if appt["ID"] != appointment["ID"]
-                    ]
-                    st.rerun()
-                else:
-                    st.error(f"Failed to Delete the appointment ID {appointment["ID"]}")
-            st.write("---") #seperator
-    else:
-        st.write("No appointments found on this date")
+# Queue day-before reminders for tomorrow's appointments (by SMS for customers without email)
+start_reminder_scheduler(sms_enabled=get_sms_channel() is not None)
 
+# Set the title of the app
+st.title("Ani's Threading and Skincare Management System")
 
 # ============================
-# Download Data Tab
+# Pages
 # ============================
-if choice == "Download Data":
-    st.subheader("Download Customer Data")
-    st.write("Click the button below to download all customer data as a CSV file.")
-
-    if st.button("Download All Customers Data"):
-        csv_filepath = export_customers_to_csv()
-        if csv_filepath:
-            with open(csv_filepath, "rb") as file:
-                st.download_button(
-                    label="Download CSV",
-                    data=file,
-                    file_name="customers_data.csv",
-                    mime="text/csv"
-                )
-            st.success("Customer data is ready for download!")
-        else:
-            st.error("No customer data available.")
-
-    st.write("---")
-
-# ---- Warning Notice for Admin Only ----
-    st.warning("Do Not Use. (For Admin use Only)")
-
-    st.subheader("Database Backup")
-    st.write("Click the button below to download a backup of the entire database. Use this backup to restore data if needed.")
-    try:
-        with open("database/business.db", "rb") as db_file:
-            st.download_button(
-                label="Download Database Backup",
-                data=db_file,
-                file_name="business_backup.db",
-                mime="application/octet-stream"
-            )
-    except FileNotFoundError:
-        st.error("Database file not found. Please ensure the file 'database/business.db' exists.")
-    except Exception as e:
-        st.error(f"An error occurred while backing up the database: {e}")
 
-    st.write("---")
-
-# ---- Warning Notice for Admin Only ----
-    st.warning("Do Not Use. (For Admin use Only)")
-
-    # ---- New Database Restore Section ----
-    st.subheader("Restore Database Backup")
-    st.write("Upload the database backup file you previously downloaded. This will overwrite the current database. **Warning:** This action will replace all current data.")
-
-    uploaded_file = st.file_uploader("Upload Database Backup", type=["db"])
-    if uploaded_file is not None:
-        if st.button("Restore Database"):
-            # Optional: Backup current database before overwriting (for extra safety)
-            try:
-                import shutil
-                backup_path = "database/business_backup_before_restore.db"
-                shutil.copyfile("database/business.db", backup_path)
-                st.info("A backup of the current database was saved as 'business_backup_before_restore.db'.")
-            except Exception as backup_error:
-                st.warning(f"Could not backup the current database before restore: {backup_error}")
-
-            try:
-                # Overwrite the current database file with the uploaded backup
-                with open("database/business.db", "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                st.success("Database restored successfully! Please restart the app for changes to take effect.")
-            except Exception as e:
-                st.error(f"Error restoring database: {e}")
-
-# ============================
-# Combo Management
-# ============================
-elif choice == "Combo Management":
-    st.subheader("Combo Management")
+# Each page is its own script in views/, so a rerun only executes (and imports) the page
+# being shown. Widgets inside a page's st.fragment rerun just that fragment.
+pages = [
+    st.Page("views/home.py", title="Home", default=True),
+    st.Page("views/customers.py", title="Customer Management"),
+    st.Page("views/customer_combos.py", title="Customer N Combo"),
+    st.Page("views/appointments.py", title="Appointment Management"),
+    st.Page("views/view_appointments.py", title="View Appointments"),
+    st.Page("views/download_data.py", title="Download Data"),
+    st.Page("views/import_data.py", title="Import Data"),
+    st.Page("views/combo_management.py", title="Combo Management"),
+]
 
-    # Add a new combo type
-    st.write("### Add a New Combo Type")
-    combo_name = st.text_input("Combo Name")
-    total_uses = st.number_input("Total Uses", min_value=1, step=1)
+# Hidden admin page: open the app with ?admin=1. Remembered for the session, because
+# switching pages drops the query string.
+if st.query_params.get("admin") == "1":
+    st.session_state["admin"] = True
+if st.session_state.get("admin"):
+    pages.append(st.Page("views/query_stats.py", title="Query Stats"))
 
-    all_services = get_services_for_combo(None)
-    service_options = {service['name']: service['id'] for service in all_services}
-    selected_services = st.multiselect("Select Services for Combo", list(service_options.keys()))
+page = st.navigation(pages)
 
-    if st.button("Add Combo Type"):
-        selected_service_ids = [service_options[service] for service in selected_services]
-        if add_combo_type(combo_name, selected_service_ids, total_uses):
-            st.success(f"Combo type '{combo_name}' added successfully with services {selected_services}!")
-            st.rerun()
-        else:
-            st.error("Failed to add the combo type. It may already exist.")
+# Count this rerun's SQL statements separately (see the Query Stats page)
+begin_rerun(page.title)
 
-    # View, edit, and delete combo types
-    st.write("### Existing Combo Types")
-    combo_types = get_combo_types()
-    if combo_types:
-        for combo in combo_types:
-            st.write(f"**ID:** {combo['id']}, **Name:** {combo['name']}, **Total Uses:** {combo['total_uses']}")
-            if st.button(f"Delete Combo '{combo['name']}'", key=f"delete_combo_{combo['id']}"):
-                if delete_combo_type(combo['id']):
-                    st.success(f"Combo '{combo['name']}' deleted successfully!")
-                    st.rerun()
-                else:
-                    st.error(f"Failed to delete combo '{combo['name']}'.")
\ No newline at end of file
+page.run()
@@ -0,0 +1,97 @@
+"""
+Multi-threaded stress check for combo redemption.
+
+Many threads book appointments against the same combo and cancel some of them
+again. At the end, every use must be accounted for: no combo use is lost,
+none is redeemed twice, and the usage ledger agrees with the balance.
+
+tests/test_combo_redemption.py runs the same check at a smaller scale with the
+test suite; this script is the heavier, optional version.
+
+Run from the repository root:
+    python -m benchmarks.combo_redemption_stress
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import build_database
+from components import db
+from components.appointment import book_appointment, delete_appointment
+from components.combo import add_combo
+from components.combo_ledger import reconcile_combo_balances
+
+THREADS = 16
+ATTEMPTS_PER_THREAD = 25
+TOTAL_USES = 100
+CANCEL_PROBABILITY = 0.3
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stress.db")
+        build_database(path, 10)
+
+        conn = sqlite3.connect(path)
+        combo_type_id = conn.execute(
+            "INSERT INTO combo_types (name, total_uses) VALUES ('Stress Combo', ?)", (TOTAL_USES,)
+        ).lastrowid
+        # No email, so cancellations don't queue messages
+        customer_id = conn.execute(
+            "INSERT INTO customers (name, phone, email) VALUES ('Stress Customer', '5559999999', NULL)"
+        ).lastrowid
+        conn.commit()
+        conn.close()
+
+        db.configure_pool(path)
+        add_combo(customer_id, combo_type_id)
+        with db.get_db_connection() as conn:
+            combo_id = conn.execute("SELECT id FROM combos WHERE customer_id = ?", (customer_id,)).fetchone()[0]
+        lock = threading.Lock()
+        totals = {"booked": 0, "rejected": 0, "cancelled": 0}
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(ATTEMPTS_PER_THREAD):
+                booking = book_appointment(customer_id, 1, "2026-10-18", use_combo=True, combo_id=combo_id)
+                with lock:
+                    totals["booked" if booking else "rejected"] += 1
+                if booking and rng.random() < CANCEL_PROBABILITY:
+                    if delete_appointment(booking["AppointmentID"]):
+                        with lock:
+                            totals["cancelled"] += 1
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        with db.get_db_connection() as conn:
+            remaining = conn.execute("SELECT remaining_uses FROM combos WHERE id = ?", (combo_id,)).fetchone()[0]
+            linked = conn.execute("SELECT COUNT(*) FROM appointments WHERE combo_id = ?", (combo_id,)).fetchone()[0]
+        mismatches = reconcile_combo_balances()
+        db.configure_pool(db.DB_PATH)
+
+    expected_remaining = TOTAL_USES - totals["booked"] + totals["cancelled"]
+    print(f"{THREADS} threads x {ATTEMPTS_PER_THREAD} attempts in {elapsed:.2f} s: {totals}")
+    print(f"remaining uses={remaining} (expected {expected_remaining}), appointments using the combo={linked}")
+
+    if remaining != expected_remaining or linked != TOTAL_USES - remaining or remaining < 0:
+        print("FAIL: combo uses were lost or redeemed twice.")
+        return 1
+    if mismatches:
+        print(f"FAIL: {len(mismatches)} combo balances disagree with the usage ledger.")
+        return 1
+    print("OK: every combo use is accounted for, in the balance and in the ledger.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Round-trip benchmark for the customer listing and export paths.
+
+Builds throwaway databases of increasing size and counts the SQL statements
+and connections that `get_all_customers` and the in-memory CSV `export_data` need.
+Both counts must stay constant as the number of customers grows.
+
+Run from the repository root:
+    python -m benchmarks.customer_queries
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import build_database
+from components import db
+from components.customer import get_all_customers
+from components.export import export_data
+
+SIZES = (100, 1000, 5000)
+
+
+def measure(func):
+    """Runs `func` once and returns (elapsed seconds, statements issued, connections opened)."""
+    statements = []
+
+    def trace(conn):
+        conn.set_trace_callback(statements.append)
+
+    db.register_connection_hook(trace)
+    try:
+        pool = db.get_pool()
+        opened_before = pool.connections_opened
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        return elapsed, len(statements), pool.connections_opened - opened_before
+    finally:
+        db.unregister_connection_hook(trace)
+
+
+def main():
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            path = os.path.join(tmp, f"bench_{size}.db")
+            build_database(path, size)
+
+            for name, func in (("get_all_customers", get_all_customers),
+                               ("export_data", export_data)):
+                # A fresh pool per run so connection setup is counted too
+                db.configure_pool(path)
+                elapsed, statements, connections = measure(func)
+                results.append((name, size, elapsed, statements, connections))
+                print(f"{name:<26} customers={size:<6} time={elapsed * 1000:8.1f} ms "
+                      f"statements={statements:<4} connections={connections}")
+        db.configure_pool(db.DB_PATH)
+
+    # Round-trips must not depend on the number of customers
+    for name in {row[0] for row in results}:
+        counts = {(row[3], row[4]) for row in results if row[0] == name}
+        if len(counts) != 1:
+            print(f"FAIL: {name} issues a different number of statements/connections per size: {sorted(counts)}")
+            return 1
+    print("OK: statement and connection counts are constant across sizes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
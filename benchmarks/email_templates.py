@@ -0,0 +1,49 @@
+"""
+Micro-benchmark: compiled, cached email templates vs. the old read-and-replace loop.
+
+Run from the repository root:
+    python -m benchmarks.email_templates
+"""
+import os
+import timeit
+
+from components.email_templates import render_template
+
+TEMPLATES = ("appointment_confirmation.html", "appointment_cancellation.html")
+ITERATIONS = 20000
+
+COMBO_TABLE = "<table>" + "".join(
+    f"<tr><td>Combo {i}</td><td>{i}</td></tr>" for i in range(5)
+) + "</table>"
+
+PLACEHOLDERS = {
+    "CUSTOMER_NAME": "Priya Sharma",
+    "SERVICE": "Eyebrow Threading",
+    "DATE": "2026-10-18",
+    "COMBO_TABLE": COMBO_TABLE,
+}
+
+
+def legacy_load_email_template(template_name, placeholders):
+    """The previous implementation: read the file, then one str.replace per placeholder."""
+    template_path = os.path.join("templates", template_name)
+    with open(template_path, "r", encoding="utf-8") as file:
+        template = file.read()
+    for key, value in placeholders.items():
+        template = template.replace(f"{{{{{key}}}}}", str(value))
+    return template
+
+
+def main():
+    for name in TEMPLATES:
+        # Same output for values that need no escaping
+        assert legacy_load_email_template(name, PLACEHOLDERS) == render_template(name, PLACEHOLDERS, ("COMBO_TABLE",))
+
+        legacy = timeit.timeit(lambda: legacy_load_email_template(name, PLACEHOLDERS), number=ITERATIONS)
+        compiled = timeit.timeit(lambda: render_template(name, PLACEHOLDERS, ("COMBO_TABLE",)), number=ITERATIONS)
+        print(f"{name:<32} legacy={legacy / ITERATIONS * 1e6:7.2f} us  "
+              f"compiled={compiled / ITERATIONS * 1e6:7.2f} us  speedup={legacy / compiled:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Import-time budget for the components.
+
+Imports each module in a fresh interpreter with `python -X importtime`, takes the
+median cumulative import time over several runs and compares it with the module's
+budget. Also checks that importing the components does not load Streamlit or the
+heavy optional libraries, which are only imported when a feature needs them.
+
+Run from the repository root:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --top 15    # also list the slowest imports per module
+
+Exits with 1 if a module is over its budget or loads a module it should not.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+
+# Median cumulative import time allowed per module, in milliseconds. Each budget leaves
+# room for slower machines; a module that starts importing Streamlit, pandas or the
+# email stack at import time goes well over it.
+IMPORT_BUDGETS_MS = {
+    "components.appointment": 120,   # Pulls in customer, combo, schedule and notifications
+    "components.notifications": 100,
+    "components.backup": 80,
+    "components.bulk_import": 100,
+    "components.export": 100,
+    "components.reminders": 80,
+}
+
+# Loaded on first use only (sending email or SMS, importing or exporting files, the app itself)
+LAZY_MODULES = ("streamlit", "pandas", "pyarrow", "twilio", "smtplib", "ssl", "dotenv", "tomllib")
+
+
+def import_profile(module):
+    """
+    Imports `module` in a fresh interpreter.
+
+    Returns:
+        tuple: ({imported name: (self us, cumulative us)} for `module` and everything it
+            imported, sorted list of the LAZY_MODULES that were loaded).
+    """
+    check = f"import sys, {module}; print(','.join(sorted(m for m in {LAZY_MODULES!r} if m in sys.modules)))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", check],
+                            capture_output=True, text=True, check=True)
+    # Imports are listed after the modules they imported; a top-level name ends its subtree
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # The header
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+        if not name[1:].startswith(" "):  # Top level (interpreter startup, or the module itself)
+            if name.strip() == module:
+                break
+            timings = {}
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return timings, loaded
+
+
+def measure(module, runs=RUNS):
+    """Returns (median cumulative ms, loaded lazy modules, the last run's timings)."""
+    totals = []
+    loaded = set()
+    timings = {}
+    for _ in range(runs):
+        timings, run_loaded = import_profile(module)
+        totals.append(timings[module][1] / 1000)
+        loaded.update(run_loaded)
+    return statistics.median(totals), sorted(loaded), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=RUNS, help="fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=0, help="list the N slowest imports (self time) per module")
+    args = parser.parse_args()
+
+    failures = 0
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        median_ms, loaded, timings = measure(module, args.runs)
+        over = median_ms > budget
+        status = "FLAG" if over or loaded else "ok"
+        print(f"  {status:<4} {module:<26} {median_ms:7.1f} ms (budget {budget} ms)"
+              + (f"  loads {', '.join(loaded)}" if loaded else ""))
+        failures += over or bool(loaded)
+        if args.top:
+            slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+            for name, (self_us, cumulative_us) in slowest:
+                print(f"         {name:<40} self={self_us / 1000:6.1f} ms cumulative={cumulative_us / 1000:6.1f} ms")
+
+    if failures:
+        print(f"\nFAIL: {failures} modules are over their import budget or load a module that should be lazy.")
+        return 1
+    print("\nOK: every module imports within its budget, without Streamlit or the optional libraries.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
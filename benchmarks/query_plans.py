@@ -0,0 +1,464 @@
+"""
+Query-plan audit for the SQL in components/.
+
+Finds every statement passed to `execute`/`executemany` in components/*.py, runs
+EXPLAIN QUERY PLAN on it and flags full table scans, temporary B-trees and
+foreign keys whose child columns have no index (SQLite looks those up on every
+parent delete, and EXPLAIN does not show it). Statements assembled at runtime
+(f-strings) are captured by calling their function with representative
+arguments (RUNTIME_CALLS) and explained with the values they were run with.
+The audit runs on the schema before and after the last migration, then the hot
+lookups are timed on both, over several rounds because single runs are noisy.
+
+Run from the repository root:
+    python -m benchmarks.query_plans
+    python -m benchmarks.query_plans --plans      # print every plan
+    python -m benchmarks.query_plans --audit-only # skip the timings
+    python -m benchmarks.query_plans --rounds 5   # more timing rounds
+
+Exits with 1 if the current schema has a finding that is not expected below.
+"""
+import argparse
+import ast
+import datetime
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import build_database
+from components import db
+from components.migrations import LATEST_VERSION
+
+COMPONENTS_DIR = "components"
+AUDITED_KEYWORDS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+SETUP_KEYWORDS = ("CREATE TEMP",)  # Run before the audit, so statements on temp tables can be explained
+
+# Findings that are the point of the statement, or too small to matter: (module, function)
+EXPECTED_FINDINGS = {
+    ("backup", "validate_backup"): "lists the tables of a staged backup",
+    ("bulk_import", "import_customers"): "reads back the chunk's staged combos",
+    ("combo", "_load_combo_types"): "loads the small catalog once per cache lifetime",
+    ("combo", "get_customer_combos"): "sorts one customer's few combos by id",
+    ("customer", "iter_customers_with_combos"): "sorts one customer's few combos by id (the full listing is the export)",
+    ("combo_ledger", "reconcile_combo_balances"): "checks every combo",
+    ("combo_ledger", "revoke_combo_type_combos"): "only `delete_combo_type`, a rare admin action",
+    ("export", "<module>"): "exports whole tables",
+    ("migrations", "_combo_ledger"): "one-off backfill",
+    ("reminders", "get_reminder_status"): "groups one day's reminders by status",
+}
+
+# Unindexed foreign keys whose parent rows are (practically) never deleted: (table, column)
+EXPECTED_UNINDEXED_FKS = {
+    ("appointments", "service_id"): "services are never deleted",
+    ("combo_services", "service_id"): "services are never deleted",
+    ("combos", "combo_type_id"): "only `delete_combo_type`, a rare admin action",
+}
+
+# Data for the plans and timings
+CUSTOMERS = 10000
+APPOINTMENTS = 100000
+LOOKUPS = 500
+DELETES = 50
+ROUNDS = 3
+
+# ============================
+# Collecting Statements
+# ============================
+
+class _StatementCollector(ast.NodeVisitor):
+    """Collects (line, function, sql) for every execute() call; sql is None when built at runtime."""
+
+    def __init__(self, module_constants):
+        self.module_constants = module_constants
+        self.scopes = [("<module>", module_constants)]
+        self.statements = []
+
+    def visit_FunctionDef(self, node):
+        self.scopes.append((node.name, _string_assignments(node, self.module_constants)))
+        self.generic_visit(node)
+        self.scopes.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Attribute) and node.func.attr in ("execute", "executemany") and node.args:
+            function, assignments = self.scopes[-1]
+            argument = node.args[0]
+            sql = _resolve(argument, assignments)
+            if sql is not None:
+                self.statements.append((node.lineno, function, sql))
+            elif isinstance(argument, ast.JoinedStr) and _is_audited(_leading_text(argument)):
+                self.statements.append((node.lineno, function, None))
+            # Anything else is a parameter (e.g. `query` passed in by the caller)
+        self.generic_visit(node)
+
+
+def _string_assignments(node, inherited):
+    """
+    Maps names to the SQL they hold. `query = "..."` followed by `query += "..."` is
+    concatenated in source order, i.e. the variant with every optional clause applied.
+    """
+    assignments = dict(inherited)
+    for child in sorted(ast.walk(node), key=lambda n: getattr(n, "lineno", 0)):
+        if isinstance(child, ast.Assign) and len(child.targets) == 1 and isinstance(child.targets[0], ast.Name):
+            value = _resolve(child.value, assignments)
+            if value is not None:
+                assignments[child.targets[0].id] = value
+        elif isinstance(child, ast.AugAssign) and isinstance(child.target, ast.Name) and isinstance(child.op, ast.Add):
+            value = _resolve(child.value, assignments)
+            if value is not None and child.target.id in assignments:
+                assignments[child.target.id] += value
+    return assignments
+
+
+def _resolve(node, assignments):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return assignments.get(node.id)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _resolve(node.left, assignments), _resolve(node.right, assignments)
+        return left + right if left is not None and right is not None else None
+    return None  # f-strings and anything else assembled at runtime
+
+
+def _leading_text(node):
+    first = node.values[0] if node.values else None
+    return first.value if isinstance(first, ast.Constant) else ""
+
+
+def _is_audited(sql, keywords=AUDITED_KEYWORDS + SETUP_KEYWORDS):
+    return sql.lstrip().upper().startswith(keywords)
+
+
+def collect_statements(components_dir=COMPONENTS_DIR):
+    """
+    Returns (module, line, function, sql) for every DML statement in the components,
+    passed to `execute` or kept in a module-level constant. `sql` is None for statements
+    assembled at runtime, which cannot be audited statically.
+    """
+    found = []
+    for file_name in sorted(os.listdir(components_dir)):
+        if not file_name.endswith(".py"):
+            continue
+        with open(os.path.join(components_dir, file_name), "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), file_name)
+        module_constants = _string_assignments(
+            ast.Module(body=[node for node in tree.body if isinstance(node, ast.Assign)], type_ignores=[]), {}
+        )
+        collector = _StatementCollector(module_constants)
+        collector.visit(tree)
+        module = file_name[:-3]
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) \
+                    and isinstance(node.value.value, str) and _is_audited(node.value.value, AUDITED_KEYWORDS):
+                found.append((module, node.lineno, "<module>", node.value.value))
+        for line, function, sql in collector.statements:
+            if sql is None or _is_audited(sql):
+                found.append((module, line, function, sql))
+    return found
+
+# ============================
+# Statements Built at Runtime
+# ============================
+
+def _runtime_calls(sample):
+    """
+    (module, function, variant, call) for the statements assembled at runtime. Each `call(conn)`
+    runs the function the way the app does; `sample` holds IDs and dates from the database.
+    """
+    from components.appointment import get_appointments_in_range
+    from components.customer import iter_customers_with_combos
+    from components.reminders import _fetch_due_reminders
+
+    return [
+        ("customer", "iter_customers_with_combos", "one customer (booking, lookups)",
+         lambda conn: list(iter_customers_with_combos(conn, customer_id=sample["customer_id"]))),
+        ("appointment", "get_appointments_in_range", "week view",
+         lambda conn: get_appointments_in_range(sample["week_start"], sample["week_end"], limit=20)),
+        ("appointment", "get_appointments_in_range", "month view, one service, next page",
+         lambda conn: get_appointments_in_range(sample["month_start"], sample["month_end"], service_id=1,
+                                                after=sample["cursor"], limit=20)),
+        ("reminders", "_fetch_due_reminders", "email only",
+         lambda conn: _fetch_due_reminders(conn, sample["date"], 100, sms_enabled=False)),
+        ("reminders", "_fetch_due_reminders", "email and SMS",
+         lambda conn: _fetch_due_reminders(conn, sample["date"], 100, sms_enabled=True)),
+    ]
+
+
+def _sample(path):
+    """Representative arguments: a busy day, its week and month, and a customer with combos."""
+    conn = sqlite3.connect(path)
+    try:
+        date = conn.execute(
+            "SELECT date FROM appointments GROUP BY date ORDER BY COUNT(*) DESC, date LIMIT 1"
+        ).fetchone()[0]
+        customer_id = conn.execute("SELECT customer_id FROM combos ORDER BY id LIMIT 1").fetchone()[0]
+        month_start = date[:8] + "01"
+        cursor = conn.execute(
+            "SELECT date, id FROM appointments WHERE date >= ? ORDER BY date, id LIMIT 1 OFFSET 19", (month_start,)
+        ).fetchone()
+    finally:
+        conn.close()
+    day = datetime.date.fromisoformat(date)
+    week_start = day - datetime.timedelta(days=day.weekday())
+    return {
+        "date": date,
+        "customer_id": customer_id,
+        "week_start": week_start.isoformat(),
+        "week_end": (week_start + datetime.timedelta(days=6)).isoformat(),
+        "month_start": month_start,
+        "month_end": date[:8] + "31",
+        "cursor": tuple(cursor),
+    }
+
+
+def pin_schema_version(path):
+    """
+    Marks the database at `path` as fully migrated, whatever schema it has.
+
+    The connection pool migrates every database it opens to the latest version, which
+    would turn the "before" database into the "after" one.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(f"PRAGMA user_version = {LATEST_VERSION}")
+    finally:
+        conn.close()
+
+
+def capture_runtime_statements(path):
+    """
+    Runs every RUNTIME_CALLS entry on the database at `path` and records the SQL it executed.
+
+    Returns:
+        dict: (module, function) -> list of (variant, sql), with the bound values inlined.
+    """
+    sample = _sample(path)
+    traced = []
+
+    def trace(conn):
+        conn.set_trace_callback(traced.append)
+
+    db.configure_pool(path)
+    with db.get_db_connection():
+        pass  # Open (and migrate) a connection before tracing
+    db.get_pool().close_all()
+    db.register_connection_hook(trace)
+    captured = {}
+    try:
+        for module, function, variant, call in _runtime_calls(sample):
+            del traced[:]
+            with db.get_db_connection() as conn:
+                call(conn)
+            captured.setdefault((module, function), []).extend(
+                (variant, sql) for sql in traced if _is_audited(sql, AUDITED_KEYWORDS)
+            )
+    finally:
+        db.unregister_connection_hook(trace)
+        db.configure_pool(db.DB_PATH)  # Also closes the traced connections
+    return captured
+
+# ============================
+# Plans
+# ============================
+
+def explain(conn, sql):
+    """Returns the EXPLAIN QUERY PLAN details of `sql`, binding NULL to every placeholder."""
+    placeholders = re.sub(r"'[^']*'", "", sql).count("?")
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, [None] * placeholders)]
+
+
+def plan_findings(plan):
+    """Full table scans and temp B-trees in a plan."""
+    findings = []
+    for detail in plan:
+        if re.fullmatch(r"SCAN \w+( AS \w+)?", detail):
+            findings.append(f"full scan: {detail}")
+        elif "USE TEMP B-TREE" in detail:
+            findings.append(f"temp b-tree: {detail}")
+    return findings
+
+
+def unindexed_foreign_keys(conn):
+    """(table, column, parent) for foreign keys whose child column does not lead any index."""
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    missing = []
+    for table in tables:
+        # Partial indexes count too: "WHERE column IS NOT NULL" still serves the "column = ?" lookups
+        leading = set()
+        for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+            columns = conn.execute(f"PRAGMA index_info({index[1]})").fetchall()
+            if columns:
+                leading.add(columns[0][2])
+        for fk in conn.execute(f"PRAGMA foreign_key_list({table})"):
+            if fk[3] not in leading:
+                missing.append((table, fk[3], fk[2]))
+    return missing
+
+
+def _explain_and_report(conn, where, sql, module, function, show_plans):
+    """Explains one statement and prints its findings. Returns the number of unexpected ones."""
+    try:
+        plan = explain(conn, sql)
+    except sqlite3.Error as e:
+        print(f"  error       {where}: {e}")
+        return 0
+    unexpected = 0
+    reason = EXPECTED_FINDINGS.get((module, function))
+    for finding in plan_findings(plan):
+        if reason:
+            print(f"  expected    {where}: {finding} ({reason})")
+        else:
+            print(f"  FLAG        {where}: {finding}")
+            unexpected += 1
+    if show_plans:
+        print(f"  plan        {where}")
+        for detail in plan:
+            print(f"                {detail}")
+    return unexpected
+
+
+def audit(conn, statements, runtime_statements=None, show_plans=False):
+    """
+    Explains every statement on `conn` and prints the findings.
+
+    Statements built at runtime are explained in the variants captured by
+    `capture_runtime_statements`, and reported as skipped if there are none.
+
+    Returns:
+        int: The number of findings that are not expected.
+    """
+    unexpected = 0
+    for module, line, function, sql in statements:
+        if sql is not None and _is_audited(sql, SETUP_KEYWORDS):
+            conn.execute(sql)
+    for module, line, function, sql in statements:
+        where = f"{module}.py:{line} {function}"
+        if sql is not None and _is_audited(sql, SETUP_KEYWORDS):
+            continue
+        if sql is None:
+            variants = (runtime_statements or {}).get((module, function))
+            if not variants:
+                print(f"  skipped     {where} (built at runtime, not in RUNTIME_CALLS)")
+            for variant, traced_sql in variants or ():
+                print(f"  runtime     {where} [{variant}]")
+                unexpected += _explain_and_report(conn, f"{where} [{variant}]", traced_sql, module, function, show_plans)
+            continue
+        unexpected += _explain_and_report(conn, where, sql, module, function, show_plans)
+
+    for table, column, parent in unindexed_foreign_keys(conn):
+        reason = EXPECTED_UNINDEXED_FKS.get((table, column))
+        if reason:
+            print(f"  expected    unindexed foreign key {table}.{column} -> {parent} ({reason})")
+        else:
+            print(f"  FLAG        unindexed foreign key {table}.{column} -> {parent}")
+            unexpected += 1
+    return unexpected
+
+# ============================
+# Timings
+# ============================
+
+def time_calls(func, args_list):
+    """Calls `func(*args)` for each entry and returns the median latency in milliseconds."""
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def run_timings(path, seed=7):
+    """
+    Times the hot lookups on the database at `path`. Returns {name: median ms}.
+
+    Deletes DELETES customers, so later rounds on the same file pick from the ones that are left.
+    """
+    from components.appointment import get_appointment_by_date, get_appointments_in_range, get_customer_appointments
+    from components.combo import get_customer_combos
+    from components.customer import delete_customer
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM appointments")]
+    customer_ids = [row[0] for row in conn.execute("SELECT id FROM customers")]
+    conn.close()
+    customers = [(rng.choice(customer_ids),) for _ in range(LOOKUPS)]
+    days = [(rng.choice(dates),) for _ in range(LOOKUPS)]
+    ranges = [(day, day[:8] + "28") for (day,) in days]
+    doomed = [(customer_id,) for customer_id in rng.sample(customer_ids, DELETES)]
+
+    db.configure_pool(path)
+    try:
+        return {
+            "get_customer_combos": time_calls(get_customer_combos, customers),
+            "get_customer_appointments": time_calls(get_customer_appointments, customers),
+            "get_appointment_by_date": time_calls(get_appointment_by_date, days),
+            "get_appointments_in_range": time_calls(get_appointments_in_range, ranges),
+            "delete_customer": time_calls(delete_customer, doomed),
+        }
+    finally:
+        db.configure_pool(db.DB_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--plans", action="store_true", help="print every query plan")
+    parser.add_argument("--audit-only", action="store_true", help="skip the before/after timings")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help=f"timing rounds per schema (default: {ROUNDS})")
+    args = parser.parse_args()
+
+    statements = collect_statements()
+    print(f"{len(statements)} statements in {COMPONENTS_DIR}/")
+    unexpected = 0
+    schemas = (("before", LATEST_VERSION - 1), ("after", LATEST_VERSION))
+    timings = {label: [] for label, _ in schemas}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for label, version in schemas:
+            path = paths[label] = os.path.join(tmp, f"{label}.db")
+            build_database(path, CUSTOMERS, appointment_count=APPOINTMENTS, schema_version=version)
+            pin_schema_version(path)
+            runtime_statements = capture_runtime_statements(path)
+
+            print(f"\nSchema version {version} ({label}):")
+            conn = sqlite3.connect(path)
+            try:
+                unexpected = audit(conn, statements, runtime_statements, args.plans)
+            finally:
+                conn.close()
+
+        if not args.audit_only:
+            # Alternate the schemas, so drift (caches, CPU frequency) hits both alike
+            for round_number in range(args.rounds):
+                for label, _ in schemas:
+                    timings[label].append(run_timings(paths[label], seed=7 + round_number))
+
+    if not args.audit_only:
+        print(f"\nMedian latency per round, {CUSTOMERS} customers and {APPOINTMENTS} appointments "
+              f"({args.rounds} rounds; before/after ratio range across rounds):")
+        for name in timings["after"][0]:
+            before = [result[name] for result in timings["before"]]
+            after = [result[name] for result in timings["after"]]
+            ratios = [b / a for b, a in zip(before, after)]
+            print(f"  {name:<26} before={statistics.median(before):8.3f} ms after={statistics.median(after):8.3f} ms  "
+                  f"x{min(ratios):.1f}..x{max(ratios):.1f}")
+
+    if unexpected:
+        print(f"\nFAIL: {unexpected} unexpected findings on the current schema.")
+        return 1
+    print("\nOK: no unexpected full scans, temp B-trees or unindexed foreign keys.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
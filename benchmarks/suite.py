@@ -0,0 +1,269 @@
+"""
+Benchmark suite for the hot entry points in components/.
+
+Generates synthetic salon databases (see benchmarks/synthetic.py), times each
+entry point on them and writes latency percentiles, SQL statements per call and
+connections opened to a JSON file, so runs can be compared over time.
+
+Run from the repository root:
+    python -m benchmarks.suite                          # 1k, 10k and 100k customers
+    python -m benchmarks.suite --sizes 1k,10k --compare benchmarks/results/<earlier run>.json
+    python -m benchmarks.suite --data-dir /tmp/salon    # keep generated databases for later runs
+
+Each size runs on its own copy of the generated database. Read-only entry points
+run first, then `book_appointment` and `delete_appointment`.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import build_database
+from components import db
+from components.appointment import book_appointment, delete_appointment, get_appointment_by_date
+from components.customer import get_all_customers, get_customer_by_phone
+from components.export import export_data
+from components.log import configure_logging
+from components.migrations import LATEST_VERSION
+
+SIZES = {"1k": 1000, "10k": 10000, "100k": 100000}
+APPOINTMENTS_PER_CUSTOMER = 6  # Over the generated history, about two visits a year
+RESULTS_DIR = os.path.join("benchmarks", "results")
+SEED = 42
+WARMUP_CALLS = 1
+
+# Calls per entry point; the full listings get fewer because they grow with the data
+CALLS = {
+    "get_customer_by_phone": 200,
+    "get_all_customers": 5,
+    "export_data": 5,
+    "get_appointment_by_date": 200,
+    "book_appointment": 200,
+    "delete_appointment": 200,
+}
+
+# ============================
+# Measuring
+# ============================
+
+class _StatementCounter:
+    """Connection hook that counts the SQL statements run on every pooled connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn):
+        conn.set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        self.count += 1
+
+
+def percentiles(latencies):
+    """Summarizes latencies in milliseconds."""
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "min": min(latencies),
+        "p50": cuts[49],
+        "p90": cuts[89],
+        "p99": cuts[98],
+        "max": max(latencies),
+        "mean": statistics.fmean(latencies),
+    }
+
+
+def measure(func, args_list, counter):
+    """
+    Calls `func(*args)` for each entry after WARMUP_CALLS untimed calls.
+
+    Returns:
+        dict: "calls", "latency_ms" percentiles, "queries_per_call" and "connections_opened".
+    """
+    pool = db.get_pool()
+    for args in args_list[:WARMUP_CALLS]:
+        func(*args)
+    measured = args_list[WARMUP_CALLS:]
+    counter.count = 0
+    opened_before = pool.connections_opened
+    latencies = []
+    for args in measured:
+        start = time.perf_counter()
+        func(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "calls": len(measured),
+        "latency_ms": percentiles(latencies),
+        "queries_per_call": counter.count / len(measured),
+        "connections_opened": pool.connections_opened - opened_before,
+    }
+
+
+def _call_arguments(path, rng):
+    """Arguments for every entry point, drawn from the generated data before anything is timed."""
+    conn = sqlite3.connect(path)
+    try:
+        phones = [row[0] for row in conn.execute("SELECT phone FROM customers")]
+        customer_ids = [row[0] for row in conn.execute("SELECT id FROM customers")]
+        dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM appointments")]
+        appointment_ids = [row[0] for row in conn.execute("SELECT id FROM appointments")]
+    finally:
+        conn.close()
+
+    def draw(name, make):
+        return [make() for _ in range(CALLS[name] + WARMUP_CALLS)]
+
+    today = datetime.date.today()
+    return {
+        "get_customer_by_phone": draw("get_customer_by_phone", lambda: (rng.choice(phones),)),
+        "get_all_customers": draw("get_all_customers", tuple),
+        "export_data": draw("export_data", tuple),
+        "get_appointment_by_date": draw("get_appointment_by_date", lambda: (rng.choice(dates),)),
+        "book_appointment": draw("book_appointment", lambda: (
+            rng.choice(customer_ids), rng.randint(1, 30),
+            (today + datetime.timedelta(days=rng.randint(1, 60))).isoformat(),
+        )),
+        # Distinct IDs: each appointment can only be deleted once
+        "delete_appointment": [(appointment_id,) for appointment_id in
+                               rng.sample(appointment_ids, CALLS["delete_appointment"] + WARMUP_CALLS)],
+    }
+
+
+ENTRY_POINTS = (
+    ("get_customer_by_phone", get_customer_by_phone),
+    ("get_all_customers", get_all_customers),
+    ("export_data", export_data),
+    ("get_appointment_by_date", get_appointment_by_date),
+    ("book_appointment", book_appointment),
+    ("delete_appointment", delete_appointment),
+)
+
+
+def run_size(label, customer_count, source_path, work_dir, seed=SEED):
+    """Times every entry point on a copy of `source_path`. Returns one result dict per entry point."""
+    path = os.path.join(work_dir, f"run_{label}.db")
+    shutil.copyfile(source_path, path)
+    arguments = _call_arguments(path, random.Random(seed))
+
+    counter = _StatementCounter()
+    db.register_connection_hook(counter)
+    db.configure_pool(path)
+    results = []
+    try:
+        for name, func in ENTRY_POINTS:
+            result = measure(func, arguments[name], counter)
+            results.append({"size": label, "customers": customer_count, "entry_point": name, **result})
+            latency = result["latency_ms"]
+            print(f"  {name:<26} p50={latency['p50']:9.3f} ms p90={latency['p90']:9.3f} ms "
+                  f"p99={latency['p99']:9.3f} ms queries/call={result['queries_per_call']:5.1f} "
+                  f"connections={result['connections_opened']}")
+    finally:
+        db.unregister_connection_hook(counter)
+        db.configure_pool(db.DB_PATH)
+    return results
+
+# ============================
+# Databases and Reports
+# ============================
+
+def prepare_database(data_dir, label, customer_count, seed=SEED):
+    """Returns the path of the generated database for a size, building it unless `data_dir` has it already."""
+    path = os.path.join(data_dir, f"salon_{label}_seed{seed}_v{LATEST_VERSION}.db")
+    if not os.path.exists(path):
+        print(f"Generating {label} database ({customer_count} customers)...")
+        start = time.perf_counter()
+        partial = path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        build_database(partial, customer_count, seed=seed,
+                       appointment_count=customer_count * APPOINTMENTS_PER_CUSTOMER)
+        os.replace(partial, path)
+        print(f"  done in {time.perf_counter() - start:.1f} s")
+    return path
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """What a run needs to be compared with another one."""
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "schema_version": LATEST_VERSION,
+        "seed": SEED,
+        "warmup_calls": WARMUP_CALLS,
+    }
+
+
+def compare(previous, current):
+    """Prints the p50 change per entry point and size against an earlier run."""
+    earlier = {(row["size"], row["entry_point"]): row for row in previous["results"]}
+    print(f"\nCompared with {previous['environment'].get('git_commit')} ({previous['environment']['timestamp']}):")
+    for row in current["results"]:
+        before = earlier.get((row["size"], row["entry_point"]))
+        if before is None:
+            continue
+        old, new = before["latency_ms"]["p50"], row["latency_ms"]["p50"]
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"  {row['size']:>5} {row['entry_point']:<26} p50 {old:9.3f} -> {new:9.3f} ms ({change:+6.1f}%)  "
+              f"queries/call {before['queries_per_call']:.1f} -> {row['queries_per_call']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the hot component entry points on synthetic data.")
+    parser.add_argument("--sizes", default=",".join(SIZES), help=f"comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument("--output", help=f"JSON report path (default: {RESULTS_DIR}/<timestamp>.json)")
+    parser.add_argument("--compare", help="an earlier JSON report to compare with")
+    parser.add_argument("--data-dir", help="keep generated databases here and reuse them")
+    args = parser.parse_args()
+
+    labels = [label.strip() for label in args.sizes.split(",") if label.strip()]
+    unknown = [label for label in labels if label not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+
+    # Runs happen outside the repository, where the email templates are missing
+    configure_logging(level="ERROR")
+
+    report = {"environment": environment(), "results": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        for label in labels:
+            source = prepare_database(data_dir, label, SIZES[label])
+            print(f"{label} customers:")
+            report["results"].extend(run_size(label, SIZES[label], source, tmp))
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d_%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Synthetic salon databases for the benchmarks.
+
+Databases start from database/schema.sql (migration 1), get their customers,
+combos and appointment history inserted in bulk, and are then migrated to the
+requested version, so later steps (e.g. the ledger's opening balances) run on
+the generated data just like on a real upgrade. The same seed always produces
+the same database.
+"""
+import datetime
+import random
+import sqlite3
+
+from components.migrations import LATEST_VERSION, migrate
+
+FIRST_NAMES = (
+    "Aarav", "Aisha", "Ana", "Ani", "Carlos", "Chen", "Deepa", "Elena", "Fatima", "Grace",
+    "Hana", "Isabel", "Jasmine", "Kavya", "Leila", "Maria", "Meera", "Nadia", "Olivia", "Priya",
+    "Rosa", "Sara", "Sofia", "Tara", "Yuki", "Zara",
+)
+LAST_NAMES = (
+    "Ahmed", "Brown", "Chen", "Das", "Garcia", "Gupta", "Haddad", "Iyer", "Johnson", "Khan",
+    "Kim", "Lopez", "Martin", "Mehta", "Nguyen", "Patel", "Rao", "Reddy", "Sharma", "Singh",
+    "Smith", "Tanaka", "Williams",
+)
+EMAIL_DOMAINS = ("example.com", "example.net", "example.org")
+
+EMAIL_RATIO = 0.8           # Customers with an email address (the rest are reached by phone)
+HISTORY_YEARS = 3           # Appointment history before today
+UPCOMING_DAYS = 30          # Appointments are also booked this far ahead
+COMBO_APPOINTMENT_RATIO = 0.3  # Appointments of combo holders that use one of their combos
+
+
+def _customer_rows(rng, customer_count):
+    for i in range(1, customer_count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        phone = f"555-{i // 10000:03d}-{i % 10000:04d}"  # Unique for up to 10 million customers
+        email = f"{first}.{last}.{i}@{rng.choice(EMAIL_DOMAINS)}".lower() if rng.random() < EMAIL_RATIO else None
+        yield i, f"{first} {last}", phone, email
+
+
+def build_database(path, customer_count, seed=42, appointment_count=0, schema_version=LATEST_VERSION):
+    """
+    Creates a database with `customer_count` customers and 0-3 combos each, then migrates it.
+
+    Args:
+        path (str): Where to create the database file.
+        customer_count (int): Number of customers.
+        seed (int): Random seed; the same seed gives the same data.
+        appointment_count (int): Appointments spread over HISTORY_YEARS before today and
+            UPCOMING_DAYS after it; some of them use one of the customer's combos.
+        schema_version (int): The version to migrate to after the data is in.
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    migrate(conn, target=1)
+    combo_types = conn.execute("SELECT id, total_uses FROM combo_types").fetchall()
+    service_count = conn.execute("SELECT COUNT(*) FROM services").fetchone()[0]
+
+    conn.executemany("INSERT INTO customers (id, name, phone, email) VALUES (?, ?, ?, ?)",
+                     _customer_rows(rng, customer_count))
+
+    combos = []
+    for customer_id in range(1, customer_count + 1):
+        for _ in range(rng.choice((0, 0, 1, 1, 2, 3))):
+            combo_type_id, total_uses = rng.choice(combo_types)
+            combos.append((customer_id, combo_type_id, rng.randint(0, total_uses)))
+    conn.executemany("INSERT INTO combos (customer_id, combo_type_id, remaining_uses) VALUES (?, ?, ?)", combos)
+    combos_by_customer = {}
+    for combo_id, customer_id in conn.execute("SELECT id, customer_id FROM combos"):
+        combos_by_customer.setdefault(customer_id, []).append(combo_id)
+
+    first_day = datetime.date.today() - datetime.timedelta(days=HISTORY_YEARS * 365)
+    day_count = HISTORY_YEARS * 365 + UPCOMING_DAYS
+
+    def appointment_rows():
+        for _ in range(appointment_count):
+            # Regulars come back often: a third of the customers get most of the bookings
+            customer_id = rng.randint(1, customer_count) if rng.random() < 0.4 else rng.randint(1, max(1, customer_count // 3))
+            owned = combos_by_customer.get(customer_id)
+            combo_id = rng.choice(owned) if owned and rng.random() < COMBO_APPOINTMENT_RATIO else None
+            date = (first_day + datetime.timedelta(days=rng.randrange(day_count))).isoformat()
+            yield customer_id, rng.randint(1, service_count), date, combo_id
+
+    conn.executemany("INSERT INTO appointments (customer_id, service_id, date, combo_id) VALUES (?, ?, ?, ?)",
+                     appointment_rows())
+    conn.commit()
+    # The later steps run on the generated data, so the ledger gets opening balances
+    migrate(conn, target=schema_version)
+    conn.close()
@@ -0,0 +1,198 @@
+"""
+Server CPU per UI interaction.
+
+Drives app.py with Streamlit's AppTest on a synthetic database and measures, per
+interaction, the CPU time used by the server process (all threads), the wall time
+and the SQL statements run for the interaction:
+
+    search     typing a phone number in Customer Management's search box and pressing Search
+    typeahead  typing part of a phone number in the booking form (Appointment Management)
+    delete     deleting one appointment from the View Appointments list
+
+In a browser session, a widget inside an `st.fragment` reruns only that fragment.
+AppTest always reruns the whole script, so when the widget belongs to a fragment the
+benchmark requests the fragment rerun itself, as the browser would.
+
+Run from the repository root:
+    python -m benchmarks.ui_interactions
+    git show <rev>:app.py > /tmp/app_before.py
+    python -m benchmarks.ui_interactions --app /tmp/app_before.py    # an earlier, single-script app.py
+
+The app runs in a temporary directory, so its background jobs (snapshots, reminders)
+do not touch database/.
+"""
+import argparse
+import dataclasses
+import inspect
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import build_database
+from components import db
+from components.instrumentation import get_rerun_stats
+
+CUSTOMERS = 10000
+APPOINTMENTS = 60000
+REPEATS = 20
+IDLE_WAIT = 2.0  # Seconds for the background jobs started by the app to settle before measuring
+
+# Page of each interaction: (menu entry in the single-script app, page script with st.navigation)
+PAGES = {
+    "search": ("Customer Management", "views/customers.py"),
+    "typeahead": ("Appointment Management", "views/appointments.py"),
+    "delete": ("View Appointments", "views/view_appointments.py"),
+}
+
+# The st.fragment function holding each interaction's widgets, if the app has one
+FRAGMENTS = {"search": "customer_search", "typeahead": "booking_form", "delete": "appointment_list"}
+
+# ============================
+# AppTest Helpers
+# ============================
+
+def _fragment_script_runner():
+    """An AppTest script runner that can rerun one fragment instead of the whole script."""
+    from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    class FragmentScriptRunner(LocalScriptRunner):
+        fragment_id = None  # Set to rerun only this fragment
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            if FragmentScriptRunner.fragment_id is not None:
+                # Drop the full rerun queued on creation; it would absorb the fragment rerun
+                self._requests = ScriptRequests()
+
+        def request_rerun(self, rerun_data):
+            if FragmentScriptRunner.fragment_id is not None:
+                rerun_data = dataclasses.replace(rerun_data, fragment_id_queue=[FragmentScriptRunner.fragment_id])
+            return super().request_rerun(rerun_data)
+
+    return FragmentScriptRunner
+
+
+def _fragment_id(at, function_name):
+    """The id of the registered fragment running `function_name`, or None."""
+    # AppTest keeps the fragments registered by the last run; each wraps the decorated function
+    for fragment_id, fragment in at._fragment_storage._fragments.items():
+        closure = inspect.getclosurevars(fragment).nonlocals.values()
+        if any(inspect.isfunction(value) and value.__name__ == function_name for value in closure):
+            return fragment_id
+    return None
+
+
+def _widget(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def open_page(at, interaction):
+    """Shows the interaction's page, through the sidebar menu or st.navigation."""
+    menu_entry, page_script = PAGES[interaction]
+    menus = [widget for widget in at.sidebar.selectbox if widget.label == "Menu"]
+    if menus:
+        menus[0].select(menu_entry)
+    else:
+        at.switch_page(page_script)
+    at.run()
+
+# ============================
+# Interactions
+# ============================
+
+def search(at, state):
+    phone = state["phones"].pop()
+    _widget(at.text_input, "Enter Customer Phone Number").set_value(phone)
+    _widget(at.button, "Search").click()
+
+
+def typeahead(at, state):
+    phone = state["phones"].pop()
+    _widget(at.text_input, "Customer Phone Number (for appointment)").set_value(phone[:-2])
+
+
+def delete(at, state):
+    next(button for button in at.button if button.label.startswith("Delete Appointment")).click()
+
+
+INTERACTIONS = {"search": search, "typeahead": typeahead, "delete": delete}
+
+
+def measure(at, runner, name, state, repeats):
+    """Performs an interaction `repeats` times. Returns its medians and how it reran."""
+    open_page(at, name)
+    fragment_id = _fragment_id(at, FRAGMENTS[name])
+    cpu, wall, queries = [], [], []
+    for _ in range(repeats):
+        INTERACTIONS[name](at, state)
+        last_rerun = get_rerun_stats(limit=1)
+        last_id = last_rerun[0]["id"] if last_rerun else 0
+        runner.fragment_id = fragment_id
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        try:
+            at.run()
+        finally:
+            runner.fragment_id = None
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+        queries.append(sum(rerun["queries"] for rerun in get_rerun_stats() if rerun["id"] > last_id))
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].value}")
+    return {
+        "interaction": name,
+        "rerun": "fragment" if fragment_id else "full script",
+        "cpu_ms": statistics.median(cpu),
+        "wall_ms": statistics.median(wall),
+        "queries": statistics.median(queries),
+    }
+
+# ============================
+# Main
+# ============================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--app", default="app.py", help="the app script to drive (default: app.py)")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="measured repetitions per interaction")
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1 import app_test as app_test_module
+
+    runner = _fragment_script_runner()
+    app_test_module.LocalScriptRunner = runner
+    app_path = os.path.abspath(args.app)
+    os.environ.setdefault("SALON_LOG_LEVEL", "ERROR")  # No template warnings from the temporary directory
+
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "salon.db")
+        print(f"Generating {CUSTOMERS} customers and {APPOINTMENTS} appointments...")
+        build_database(path, CUSTOMERS, appointment_count=APPOINTMENTS)
+        db.configure_pool(path)
+        os.chdir(tmp)
+        try:
+            at = AppTest.from_file(app_path, default_timeout=60)
+            at.run()
+            # Warm up every page (imports, catalog cache) before the background jobs settle
+            for name in INTERACTIONS:
+                open_page(at, name)
+            time.sleep(IDLE_WAIT)
+
+            state = {"phones": [f"555-{i // 10000:03d}-{i % 10000:04d}" for i in range(1, CUSTOMERS + 1)]}
+            print(f"\n{args.app}, median of {args.repeats} interactions:")
+            for name in INTERACTIONS:
+                result = measure(at, runner, name, state, args.repeats)
+                print(f"  {name:<10} {result['rerun']:<12} cpu={result['cpu_ms']:8.2f} ms "
+                      f"wall={result['wall_ms']:8.2f} ms queries={result['queries']:g}")
+        finally:
+            os.chdir(original_cwd)
+            db.configure_pool(db.DB_PATH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
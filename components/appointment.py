@@ -1,63 +1,98 @@
-import sqlite3
-from components.combo import update_combo_usage, get_customer_combos, get_db_connection
-from components.customer import get_customer_by_phone
-from components.notifications import send_appointment_confirmation, send_appointment_cancellation
+import logging
+from components.combo import get_customer_combos, redeem_combo_use, restore_combo_use
+from components.db import get_db_connection, immediate_transaction
+from components.customer import invalidate_customer_cache, iter_customers_with_combos
+from components.schedule import (
+    commit_slot, release_slot, reserve_slot, schedule_index, to_time_text
+)
+from components.notifications import send_appointment_cancellation
+
+logger = logging.getLogger(__name__)
 
 # ============================
 # Appointment Management
 # ============================
 
-def book_appointment(customer_id, service_id, date, use_combo=False, combo_id=None):
-    """Books an appointment for a customer and optionally links it to a combo."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Ensure the combo is valid if using it
-        if use_combo and combo_id:
-            cursor.execute("SELECT remaining_uses FROM combos WHERE id = ? AND remaining_uses > 0", (combo_id,))
-            combo = cursor.fetchone()
-            if not combo:
-                print(f"Error: Combo ID {combo_id} is not valid or has no remaining uses.")
-                return False
+def book_appointment(customer_id, service_id, date, use_combo=False, combo_id=None, stylist_id=None, start_time=None):
+    """
+    Books an appointment for a customer and optionally links it to a combo.
 
-        # Insert appointment into the database
-        cursor.execute(
-            "INSERT INTO appointments (customer_id, service_id, date, combo_id) VALUES (?, ?, ?, ?)",
-            (customer_id, service_id, date, combo_id if use_combo else None)
-        )
-
-        # If using a combo, decrement remaining uses using the **same** connection
-        if use_combo and combo_id:
-            update_combo_usage(combo_id, conn)  # Pass the same connection
-
-        # Fetch updated remaining uses AFTER updating combo
-        remaining_uses = None
-        if use_combo and combo_id:
-            cursor.execute("SELECT remaining_uses FROM combos WHERE id = ?", (combo_id,))
-            updated_combo = cursor.fetchone()
-            remaining_uses = updated_combo["remaining_uses"] if updated_combo else None
-
-        # Fetch customer details
-        customer = get_customer_by_phone(customer_id)
-
-        conn.commit()
-
-        if customer and customer["Email"]:  # Ensure email exists before sending
-            send_appointment_confirmation(
-                customer["Name"],
-                customer["Email"],
-                service_id,
-                date,
-                remaining_uses
-            )
+    Everything happens in one transaction on one connection, and the refreshed
+    customer data is returned so callers (e.g. the confirmation email) don't
+    need to query it again. When a stylist and start time are given, the slot is
+    checked for conflicts inside the same (immediate) transaction.
+
+    Args:
+        stylist_id (int, optional): The stylist doing the service. Requires `start_time`.
+        start_time (str, optional): Start time in 'HH:MM' format; the end time follows
+            from the service duration. Requires `stylist_id`.
 
-        print(f"Appointment booked for Customer ID {customer_id} on {date} (Service ID {service_id}).")
-        return True
-    except Exception as e:
-        print(f"Error booking appointment: {e}")
+    Returns:
+        dict: {"AppointmentID": int, "Customer": dict, "Combos": list} on success
+            (the customer dict has the same shape as `get_customer_by_phone`),
+            False otherwise.
+    """
+    timed = stylist_id is not None
+    if timed != bool(start_time):
+        # Half a slot can't be checked for conflicts, so don't book it untimed
+        logger.warning("A stylist and a start time must be given together (stylist ID %s, start time %s).",
+                       stylist_id, start_time)
         return False
-    finally:
-        conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # One immediate transaction: nobody else can redeem the same combo use or claim
+            # the same slot between our checks and our writes
+            with immediate_transaction(conn):
+                slot = None
+                if timed:
+                    slot = reserve_slot(conn, stylist_id, date, start_time, service_id)
+                    if slot is None:
+                        logger.warning("%s on %s is not available for stylist ID %s.", start_time, date, stylist_id)
+                        conn.rollback()
+                        return False
+
+                # Insert appointment into the database
+                if timed:
+                    cursor.execute(
+                        """INSERT INTO appointments (customer_id, service_id, date, combo_id, stylist_id, start_time, end_time)
+                           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                        (customer_id, service_id, date, combo_id if use_combo else None,
+                         stylist_id, to_time_text(slot[0]), to_time_text(slot[1]))
+                    )
+                else:
+                    cursor.execute(
+                        "INSERT INTO appointments (customer_id, service_id, date, combo_id) VALUES (?, ?, ?, ?)",
+                        (customer_id, service_id, date, combo_id if use_combo else None)
+                    )
+                appointment_id = cursor.lastrowid
+
+                # Redeem one combo use; the conditional UPDATE doubles as the validity check
+                if use_combo and combo_id and redeem_combo_use(conn, combo_id, appointment_id) is None:
+                    logger.warning("Combo ID %s is not valid or has no remaining uses.", combo_id)
+                    conn.rollback()
+                    return False
+
+                # Customer details and refreshed combos in one query
+                customer = next(iter_customers_with_combos(conn, customer_id=customer_id), None)
+                if customer is None:
+                    logger.warning("Customer ID %s does not exist.", customer_id)
+                    conn.rollback()
+                    return False
+
+            invalidate_customer_cache(customer_id)  # Combo balance changed
+            if timed:
+                commit_slot(stylist_id, date, slot[0], slot[1], appointment_id)
+
+            logger.info("Appointment booked for Customer ID %s on %s (Service ID %s).", customer_id, date, service_id)
+            return {
+                "AppointmentID": appointment_id,
+                "Customer": customer,
+                "Combos": customer["Combos"]
+            }
+        except Exception as e:
+            logger.error("Error booking appointment: %s", e)
+            return False
 
 
 def get_customer_appointments(customer_id):
@@ -70,29 +105,27 @@ def get_customer_appointments(customer_id):
     Returns:
         list: List of structured appointments.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """SELECT a.id, c.name, c.phone, s.name AS service, a.date, a.combo_id
-               FROM appointments a
-               JOIN customers c ON a.customer_id = c.id
-               JOIN services s ON a.service_id = s.id
-               WHERE a.customer_id = ? 
-               ORDER BY a.date""",
-            (customer_id,)
-        )
-        appointments = cursor.fetchall()
-        return [
-            {"ID": appt["id"], "Name": appt["name"], "Phone": appt["phone"],
-             "Service": appt["service"], "Date": appt["date"], "Combo ID": appt["combo_id"]}
-            for appt in appointments
-        ]
-    except Exception as e:
-        print(f"Error retrieving appointments: {e}")
-        return []
-    finally:
-        conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """SELECT a.id, c.name, c.phone, s.name AS service, a.date, a.combo_id
+                   FROM appointments a
+                   JOIN customers c ON a.customer_id = c.id
+                   JOIN services s ON a.service_id = s.id
+                   WHERE a.customer_id = ? 
+                   ORDER BY a.date""",
+                (customer_id,)
+            )
+            appointments = cursor.fetchall()
+            return [
+                {"ID": appt["id"], "Name": appt["name"], "Phone": appt["phone"],
+                 "Service": appt["service"], "Date": appt["date"], "Combo ID": appt["combo_id"]}
+                for appt in appointments
+            ]
+        except Exception as e:
+            logger.error("Error retrieving appointments: %s", e)
+            return []
 
 def get_appointment_by_date(date):
     """
@@ -104,96 +137,178 @@ def get_appointment_by_date(date):
     Returns:
         list: List of structured appointments.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """SELECT a.id, c.name, c.phone, s.name AS service, a.date, a.combo_id
-               FROM appointments a
-               JOIN customers c ON a.customer_id = c.id
-               JOIN services s ON a.service_id = s.id
-               WHERE a.date = ?
-               ORDER BY a.date""",
-            (date,)
-        )
-        appointments = cursor.fetchall()
-        return [
-            {"ID": appt["id"], "Name": appt["name"], "Phone": appt["phone"],
-             "Service": appt["service"], "Date": appt["date"], "Combo ID": appt["combo_id"]}
-            for appt in appointments
-        ]
-    except Exception as e:
-        print(f"Error retrieving appointments by date: {e}")
-        return []
-    finally:
-        conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """SELECT a.id, c.name, c.phone, s.name AS service, a.date, a.combo_id
+                   FROM appointments a
+                   JOIN customers c ON a.customer_id = c.id
+                   JOIN services s ON a.service_id = s.id
+                   WHERE a.date = ?
+                   ORDER BY a.date""",
+                (date,)
+            )
+            appointments = cursor.fetchall()
+            return [
+                {"ID": appt["id"], "Name": appt["name"], "Phone": appt["phone"],
+                 "Service": appt["service"], "Date": appt["date"], "Combo ID": appt["combo_id"]}
+                for appt in appointments
+            ]
+        except Exception as e:
+            logger.error("Error retrieving appointments by date: %s", e)
+            return []
+
+def get_appointments_in_range(start_date, end_date, service_id=None, customer_id=None, after=None, limit=50):
+    """
+    Retrieves one page of appointments between two dates (inclusive), oldest first.
+
+    Pages are keyed on (date, id), so fetching page N costs the same as page 1:
+    pass the returned "NextCursor" as `after` to continue.
+
+    Args:
+        start_date (str): First date in 'YYYY-MM-DD' format.
+        end_date (str): Last date in 'YYYY-MM-DD' format.
+        service_id (int, optional): Only appointments for this service.
+        customer_id (int, optional): Only appointments for this customer.
+        after (tuple, optional): (date, id) of the last appointment on the previous page.
+        limit (int): Page size.
+
+    Returns:
+        dict: {"Appointments": list, "NextCursor": (date, id) or None}. Appointments have
+            the same keys as `get_appointment_by_date`.
+    """
+    conditions = ["a.date BETWEEN ? AND ?"]
+    params = [start_date, end_date]
+    if service_id is not None:
+        conditions.append("a.service_id = ?")
+        params.append(service_id)
+    if customer_id is not None:
+        conditions.append("a.customer_id = ?")
+        params.append(customer_id)
+    if after is not None:
+        conditions.append("(a.date, a.id) > (?, ?)")
+        params.extend(after)
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Fetch one extra row to know whether there is a next page
+            cursor.execute(
+                f"""SELECT a.id, c.name, c.phone, s.name AS service, a.date, a.combo_id
+                    FROM appointments a
+                    JOIN customers c ON a.customer_id = c.id
+                    JOIN services s ON a.service_id = s.id
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY a.date, a.id
+                    LIMIT ?""",
+                (*params, limit + 1)
+            )
+            rows = cursor.fetchall()
+            appointments = [
+                {"ID": appt["id"], "Name": appt["name"], "Phone": appt["phone"],
+                 "Service": appt["service"], "Date": appt["date"], "Combo ID": appt["combo_id"]}
+                for appt in rows[:limit]
+            ]
+            next_cursor = None
+            if len(rows) > limit:
+                last = appointments[-1]
+                next_cursor = (last["Date"], last["ID"])
+            return {"Appointments": appointments, "NextCursor": next_cursor}
+        except Exception as e:
+            logger.error("Error retrieving appointments in range: %s", e)
+            return {"Appointments": [], "NextCursor": None}
+
+def count_appointments_by_day(start_date, end_date, service_id=None):
+    """
+    Counts appointments per day between two dates (inclusive) with one range scan.
+
+    Returns:
+        dict: {'YYYY-MM-DD': count} for the days that have appointments.
+    """
+    query = "SELECT date, COUNT(*) AS total FROM appointments WHERE date BETWEEN ? AND ?"
+    params = [start_date, end_date]
+    if service_id is not None:
+        query += " AND service_id = ?"
+        params.append(service_id)
+    query += " GROUP BY date"
+
+    with get_db_connection() as conn:
+        try:
+            return {row["date"]: row["total"] for row in conn.execute(query, params).fetchall()}
+        except Exception as e:
+            logger.error("Error counting appointments: %s", e)
+            return {}
 
 def delete_appointment(appointment_id):
     """Deletes an appointment by its ID, restores combo usage if applicable, and sends a cancellation email."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Retrieve combo_id, customer_id, service name, and appointment date before deleting the appointment
-        cursor.execute("""
-            SELECT a.customer_id, c.name, c.email, s.name AS service, a.date, a.combo_id 
-            FROM appointments a
-            JOIN customers c ON a.customer_id = c.id
-            JOIN services s ON a.service_id = s.id
-            WHERE a.id = ?
-        """, (appointment_id,)
-        )
-
-        result = cursor.fetchone()
-
-        if not result:
-            print(f"Error: Appointment ID {appointment_id} not found.")
-            return False
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Delete and restore in one transaction, so a failure can't leave the use lost
+            with immediate_transaction(conn):
+                # Retrieve combo_id, customer_id, service name, and appointment date before deleting the appointment
+                cursor.execute("""
+                    SELECT a.customer_id, c.name, c.email, c.phone, s.name AS service, a.date, a.combo_id, a.stylist_id
+                    FROM appointments a
+                    JOIN customers c ON a.customer_id = c.id
+                    JOIN services s ON a.service_id = s.id
+                    WHERE a.id = ?
+                """, (appointment_id,)
+                )
 
-        combo_id = result["combo_id"]
-        customer_id = result["customer_id"]
-        customer_name = result["name"]
-        customer_email = result["email"]
-        service = result["service"]
-        date = result["date"]
+                result = cursor.fetchone()
 
-        print(f"Debug: Attempting to Delete Combo ID {appointment_id}")
+                if not result:
+                    logger.warning("Appointment ID %s not found.", appointment_id)
+                    return False
 
-        # Delete the appointment
-        cursor.execute("DELETE FROM appointments WHERE id = ?", (appointment_id,))
-        if cursor.rowcount == 0:
-            print(f"Error: Failed to Delte Appointment {appointment_id}")
-            return False
-        conn.commit()
+                combo_id = result["combo_id"]
+                customer_id = result["customer_id"]
+                customer_name = result["name"]
+                customer_email = result["email"]
+                customer_phone = result["phone"]
+                service = result["service"]
+                date = result["date"]
 
-        print(f"Debug: Appointment ID {appointment_id} deleted successfully")
+                logger.debug("Deleting appointment ID %s", appointment_id)
 
-        # Restore combo usage if applicable
-        remaining_uses = None
-        if combo_id:
-            cursor.execute("UPDATE combos SET remaining_uses = remaining_uses + 1 WHERE id = ?", (combo_id,))
-            conn.commit()
+                # Delete the appointment
+                cursor.execute("DELETE FROM appointments WHERE id = ?", (appointment_id,))
+                if cursor.rowcount == 0:
+                    logger.warning("Failed to delete appointment ID %s", appointment_id)
+                    conn.rollback()
+                    return False
 
-            # Fetch updated remaining uses
-            cursor.execute("SELECT remaining_uses FROM combos WHERE id = ?", (combo_id,))
-            updated_combo = cursor.fetchone()
-            remaining_uses = updated_combo["remaining_uses"] if updated_combo else None
-
-        # Send cancellation email AFTER appointment deletion
-        if customer_email and combo_id:
-            send_appointment_cancellation(
-                customer_id=customer_id,
-                customer_name=customer_name,
-                customer_email=customer_email,
-                service=service,
-                date=date
-            )
+                # Restore combo usage if applicable
+                if combo_id:
+                    restore_combo_use(conn, combo_id, appointment_id)
 
-        return True
-    except Exception as e:
-        print(f"Error deleting appointment: {e}")
-        return False
-    finally:
-        conn.close()
+                # Combos for the cancellation email, read before the lock is released
+                combos = get_customer_combos(customer_id, conn) if customer_email and combo_id else None
+
+            logger.debug("Appointment ID %s deleted successfully", appointment_id)
+            if result["stylist_id"] is not None:
+                release_slot(result["stylist_id"], date, appointment_id)
+            if combo_id:
+                invalidate_customer_cache(customer_id)
+
+            # Send cancellation email (or SMS without an email) AFTER appointment deletion
+            if (customer_email or customer_phone) and combo_id:
+                send_appointment_cancellation(
+                    customer_id=customer_id,
+                    customer_name=customer_name,
+                    customer_email=customer_email,
+                    service=service,
+                    date=date,
+                    combos=combos,
+                    customer_phone=customer_phone
+                )
+
+            return True
+        except Exception as e:
+            logger.error("Error deleting appointment: %s", e)
+            return False
 
 
 #function not used as of now, considered for future development
@@ -209,23 +324,22 @@ def edit_appointment(appointment_id, new_date, new_service_id):
     Returns:
         bool: True if successfully updated, False otherwise.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Update the appointment
-        cursor.execute(
-            "UPDATE appointments SET date = ?, service_id = ? WHERE id = ?",
-            (new_date, new_service_id, appointment_id)
-        )
-        conn.commit()
-        if cursor.rowcount > 0:
-            print(f"Appointment ID {appointment_id} updated to new date {new_date} and service ID {new_service_id}.")
-            return True
-        else:
-            print(f"No appointment found with ID {appointment_id}.")
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Update the appointment
+            cursor.execute(
+                "UPDATE appointments SET date = ?, service_id = ? WHERE id = ?",
+                (new_date, new_service_id, appointment_id)
+            )
+            conn.commit()
+            schedule_index.forget()  # The appointment may have moved to another day
+            if cursor.rowcount > 0:
+                logger.info("Appointment ID %s updated to new date %s and service ID %s.", appointment_id, new_date, new_service_id)
+                return True
+            else:
+                logger.warning("No appointment found with ID %s.", appointment_id)
+                return False
+        except Exception as e:
+            logger.error("Error updating appointment: %s", e)
             return False
-    except Exception as e:
-        print(f"Error updating appointment: {e}")
-        return False
-    finally:
-        conn.close()
@@ -0,0 +1,322 @@
+import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from components.db import get_db_connection, get_pool, notify_database_replaced
+from components.migrations import LATEST_VERSION, get_schema_version
+
+logger = logging.getLogger(__name__)
+
+# Where scheduled snapshots and their manifest are kept
+BACKUP_DIR = "database/backups"
+MANIFEST_NAME = "manifest.json"
+
+# Tables a backup must contain to be restorable
+REQUIRED_TABLES = ("customers", "services", "combo_types", "combo_services", "combos", "appointments")
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+GZIP_HEADER = b"\x1f\x8b"
+
+# Backup tuning
+PAGES_PER_STEP = 256            # Pages copied before the source is released again (1 MB with 4 KB pages)
+STEP_SLEEP = 0.005              # Seconds to pause between steps so writers can get in
+SNAPSHOT_INTERVAL = 24 * 60 * 60  # Seconds between scheduled snapshots
+SNAPSHOTS_KEPT = 7              # Older snapshots are deleted after each new one
+
+_manifest_lock = threading.Lock()
+
+# ============================
+# Backup Primitives
+# ============================
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def backup_to_file(dest_path, pages=PAGES_PER_STEP, progress=None):
+    """
+    Copies the live database into `dest_path` with the SQLite online backup API.
+
+    The copy runs `pages` pages at a time and pauses between steps, so bookings keep
+    going while it runs, and the result is always a consistent snapshot.
+
+    Args:
+        dest_path (str): The file to write. It is replaced if it exists.
+        pages (int): Pages copied per step.
+        progress (callable, optional): `progress(status, remaining, total)` from `sqlite3.Connection.backup`.
+    """
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+    dest = sqlite3.connect(dest_path)
+    try:
+        with get_db_connection() as source:
+            source.backup(dest, pages=pages, progress=progress, sleep=STEP_SLEEP)
+        # A self-contained file, no -wal sidecar needed to open it
+        dest.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dest.close()
+
+
+def _compress_file(path):
+    """Gzips `path` into `path + '.gz'`, removes the original and returns the new path."""
+    with open(path, "rb") as src, gzip.open(path + ".gz", "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.remove(path)
+    return path + ".gz"
+
+
+def backup_to_bytes(compress=False):
+    """
+    Builds a consistent backup for download and returns it as bytes.
+
+    Args:
+        compress (bool): Gzip the backup.
+
+    Returns:
+        dict: "data", "file_name", "mime" and "sha256", ready for `st.download_button`.
+    """
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"business_backup_{stamp}.db")
+        backup_to_file(path)
+        if compress:
+            path = _compress_file(path)
+        with open(path, "rb") as f:
+            data = f.read()
+    return {
+        "data": data,
+        "file_name": os.path.basename(path),
+        "mime": "application/gzip" if compress else "application/octet-stream",
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+# ============================
+# Rotating Snapshots
+# ============================
+
+def read_manifest(backup_dir=BACKUP_DIR):
+    """Returns the snapshot entries recorded in the manifest, newest first."""
+    try:
+        with open(os.path.join(backup_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)["snapshots"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return []
+
+
+def _write_manifest(snapshots, backup_dir):
+    path = os.path.join(backup_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"snapshots": snapshots}, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def create_snapshot(compress=True, keep=SNAPSHOTS_KEPT, backup_dir=BACKUP_DIR):
+    """
+    Writes a new snapshot into `backup_dir`, records its checksum in the manifest
+    and deletes snapshots beyond the newest `keep`.
+
+    Returns:
+        dict: The manifest entry of the new snapshot.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    created_at = time.time()
+    stamp = datetime.datetime.fromtimestamp(created_at).strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(backup_dir, f"business_{stamp}.db")
+
+    # Written under a temporary name so a half-written snapshot is never listed
+    partial = path + ".partial"
+    backup_to_file(partial)
+    os.replace(partial, path)
+    if compress:
+        path = _compress_file(path)
+
+    entry = {
+        "file": os.path.basename(path),
+        "created_at": created_at,
+        "size": os.path.getsize(path),
+        "sha256": _file_sha256(path),
+        "compressed": compress,
+    }
+    with _manifest_lock:
+        snapshots = [entry] + [s for s in read_manifest(backup_dir) if s["file"] != entry["file"]]
+        for old in snapshots[keep:]:
+            try:
+                os.remove(os.path.join(backup_dir, old["file"]))
+            except FileNotFoundError:
+                pass
+        _write_manifest(snapshots[:keep], backup_dir)
+    return entry
+
+
+def verify_snapshot(entry, backup_dir=BACKUP_DIR):
+    """Returns True if the snapshot file still matches the checksum in its manifest entry."""
+    try:
+        return _file_sha256(os.path.join(backup_dir, entry["file"])) == entry["sha256"]
+    except FileNotFoundError:
+        return False
+
+
+class BackupScheduler(threading.Thread):
+    """
+    Daemon thread that takes a snapshot every `interval` seconds.
+
+    The first snapshot is timed from the newest one in the manifest, so restarting
+    the app does not take an extra backup.
+    """
+
+    def __init__(self, interval=SNAPSHOT_INTERVAL, keep=SNAPSHOTS_KEPT, compress=True, backup_dir=BACKUP_DIR):
+        super().__init__(name="backup-scheduler", daemon=True)
+        self.interval = interval
+        self.keep = keep
+        self.compress = compress
+        self.backup_dir = backup_dir
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def seconds_until_due(self):
+        snapshots = read_manifest(self.backup_dir)
+        if not snapshots:
+            return 0
+        return max(0, snapshots[0]["created_at"] + self.interval - time.time())
+
+    def run(self):
+        while not self._stop_event.wait(self.seconds_until_due()):
+            try:
+                create_snapshot(self.compress, self.keep, self.backup_dir)
+            except Exception as e:
+                logger.error("Error creating database snapshot: %s", e)
+                # Try again later rather than spinning on a persistent error
+                self._stop_event.wait(min(self.interval, 15 * 60))
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_backup_scheduler(interval=SNAPSHOT_INTERVAL, keep=SNAPSHOTS_KEPT, compress=True):
+    """Starts the process-wide snapshot scheduler if it is not running yet."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            _scheduler = BackupScheduler(interval, keep, compress)
+            _scheduler.start()
+        return _scheduler
+
+# ============================
+# Restore
+# ============================
+
+def stage_upload(upload, staging_dir=None):
+    """
+    Streams an uploaded backup (plain or gzipped) into a staging file next to the live database.
+
+    Args:
+        upload: A binary file-like object, e.g. a Streamlit upload.
+        staging_dir (str, optional): Defaults to the database directory, so the staging
+            file sits on the same filesystem as the live database.
+
+    Returns:
+        str: The path of the staging file. The caller removes it.
+    """
+    staging_dir = staging_dir or os.path.dirname(os.path.abspath(get_pool().db_path))
+    upload.seek(0)
+    compressed = upload.read(2) == GZIP_HEADER
+    upload.seek(0)
+    source = gzip.GzipFile(fileobj=upload, mode="rb") if compressed else upload
+
+    fd, path = tempfile.mkstemp(prefix="restore_", suffix=".db", dir=staging_dir)
+    with os.fdopen(fd, "wb") as staging:
+        shutil.copyfileobj(source, staging, 1024 * 1024)
+    return path
+
+
+def validate_backup(path):
+    """
+    Checks that a staged file is a healthy database this app can use.
+
+    Returns:
+        list: Problems found; empty if the backup can be restored.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+            return ["The file is not a SQLite database."]
+
+    conn = sqlite3.connect(path)
+    try:
+        problems = []
+        integrity = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        if integrity != ["ok"]:
+            problems.append("Integrity check failed: " + "; ".join(integrity[:5]))
+
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        missing = [table for table in REQUIRED_TABLES if table not in tables]
+        if missing:
+            problems.append(f"Missing tables: {', '.join(missing)}")
+
+        # Older backups are fine, they are migrated when the pool reopens
+        backup_version = get_schema_version(conn)
+        if backup_version > LATEST_VERSION:
+            problems.append(f"The backup has schema version {backup_version}, newer than this app's {LATEST_VERSION}.")
+        return problems
+    finally:
+        conn.close()
+
+
+def restore_database(upload, snapshot_first=True):
+    """
+    Replaces the live database with an uploaded backup, without restarting the app.
+
+    The upload is staged and validated first. The swap copies the staged pages into
+    the live database with the backup API in a single step, so other sessions see
+    either the old or the new data, never a mix. Afterwards pooled connections are
+    recycled and process-wide caches are dropped.
+
+    Args:
+        upload: A binary file-like object holding a backup (plain or gzipped).
+        snapshot_first (bool): Take a snapshot of the current database before swapping.
+
+    Returns:
+        tuple: (success, message)
+    """
+    path = stage_upload(upload)
+    try:
+        problems = validate_backup(path)
+        if problems:
+            return False, " ".join(problems)
+
+        if snapshot_first:
+            create_snapshot()
+
+        staged = sqlite3.connect(path)
+        try:
+            with get_db_connection() as live:
+                live_page_size = live.execute("PRAGMA page_size").fetchone()[0]
+                if staged.execute("PRAGMA page_size").fetchone()[0] != live_page_size:
+                    # A WAL database only accepts a backup with its own page size
+                    staged.execute("PRAGMA journal_mode = DELETE")
+                    staged.execute(f"PRAGMA page_size = {live_page_size}")
+                    staged.execute("VACUUM")
+                staged.backup(live)
+        finally:
+            staged.close()
+
+        notify_database_replaced()
+        return True, "Database restored successfully."
+    except Exception as e:
+        logger.error("Error restoring database: %s", e)
+        return False, f"Error restoring database: {e}"
+    finally:
+        os.remove(path)
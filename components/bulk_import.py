@@ -0,0 +1,303 @@
+import csv
+import io
+import logging
+import os
+import re
+from components.combo import get_combo_types, get_services_for_combo
+from components.combo_ledger import record_combo_events
+from components.customer import invalidate_customer_cache, normalize_phone
+from components.db import get_db_connection, immediate_transaction
+from components.schedule import schedule_index
+
+logger = logging.getLogger(__name__)
+
+# Rows read, validated and inserted per transaction
+IMPORT_CHUNK_SIZE = 5000
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Readable file types; Excel needs openpyxl (legacy .xls files are not supported)
+CSV_EXTENSIONS = (".csv",)
+EXCEL_EXTENSIONS = (".xlsx",)
+
+# Expected columns per import kind (matched case-insensitively); the rest are optional
+REQUIRED_COLUMNS = {
+    "customers": ("name", "phone"),
+    "appointments": ("phone", "service", "date"),
+}
+
+# ============================
+# Reading
+# ============================
+
+def _clean(value):
+    """Turns pandas' NaN/None into '' and everything else into a stripped string."""
+    if value is None or value != value:  # NaN is the only value not equal to itself
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Phones read as numbers would otherwise end in '.0'
+    return str(value).strip()
+
+
+def iter_source_chunks(source, file_name, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Reads a CSV or Excel (.xlsx) file with pandas and yields lists of row dicts, one chunk at a time.
+
+    Args:
+        source: A path or a binary file-like object (e.g. a Streamlit upload).
+        file_name (str): Used to pick the reader from the extension.
+        chunk_size (int): Rows per chunk.
+
+    Yields:
+        list: Dicts mapping lower-cased column names to cleaned string values.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    import pandas as pd
+
+    extension = os.path.splitext(file_name.lower())[1]
+    if extension in EXCEL_EXTENSIONS:
+        # Excel can't be read incrementally, slice the frame instead
+        frame = pd.read_excel(source, dtype=str, engine="openpyxl")
+        frames = (frame.iloc[i:i + chunk_size] for i in range(0, len(frame), chunk_size))
+    elif extension in CSV_EXTENSIONS:
+        frames = pd.read_csv(source, dtype=str, chunksize=chunk_size, keep_default_na=False)
+    else:
+        raise ValueError(f"Unsupported file type '{extension or file_name}'. Upload a CSV or XLSX file.")
+
+    for frame in frames:
+        frame.columns = [str(column).strip().lower() for column in frame.columns]
+        yield [{key: _clean(value) for key, value in record.items()} for record in frame.to_dict("records")]
+
+# ============================
+# Importers
+# ============================
+
+class ImportResult:
+    """Counters and rejected rows collected while importing."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.inserted = 0
+        self.combos_added = 0
+        self.rejected = []  # {"row": int, "reason": str, **original values}
+        self.error = None  # Why the import stopped early, if it did (earlier chunks stay imported)
+
+    def reject(self, row_number, row, reason):
+        self.rejected.append({"row": row_number, "reason": reason, **row})
+
+    def summary(self):
+        return {
+            "rows_read": self.rows_read,
+            "inserted": self.inserted,
+            "combos_added": self.combos_added,
+            "rejected": len(self.rejected),
+        }
+
+    def rejected_csv(self):
+        """Returns the rejected rows as CSV bytes, ready for a download button or a file."""
+        if not self.rejected:
+            return b""
+        columns = list(dict.fromkeys(key for row in self.rejected for key in row))
+        text = io.StringIO()
+        writer = csv.DictWriter(text, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(self.rejected)
+        return text.getvalue().encode("utf-8")
+
+
+def _missing_columns(kind, row):
+    return [column for column in REQUIRED_COLUMNS[kind] if column not in row]
+
+
+def import_customers(chunks, progress=None, result=None):
+    """
+    Bulk-loads customers (and optionally one combo each) from row chunks.
+
+    Columns: name, phone, email (optional), combo (combo type name, optional),
+    remaining_uses (optional, defaults to the combo type's total uses).
+    Phones and emails are validated and de-duplicated in memory, against the file
+    itself and against the database, before anything is written.
+
+    Args:
+        chunks (iterable): Lists of row dicts, e.g. from `iter_source_chunks`.
+        progress (callable, optional): Called as `progress(rows_read, inserted)` after each chunk.
+        result (ImportResult, optional): Collects the counters, so they survive a failure midway.
+
+    Returns:
+        ImportResult: Counters and the rejected rows.
+    """
+    result = result or ImportResult()
+    combo_types = {combo["name"].lower(): combo for combo in get_combo_types()}
+
+    with get_db_connection() as conn:
+        # Everything the duplicate checks need, loaded once
+        existing_phones = {row["phone"] for row in conn.execute("SELECT phone FROM customers")}
+        existing_emails = {row["email"].lower() for row in conn.execute("SELECT email FROM customers WHERE email IS NOT NULL")}
+
+        for chunk in chunks:
+            customers, combos = [], []
+            for offset, row in enumerate(chunk):
+                row_number = result.rows_read + offset + 2  # +1 for the header, +1 for 1-based rows
+                missing = _missing_columns("customers", row)
+                if missing:
+                    raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+                name, phone = row["name"], normalize_phone(row["phone"])
+                email = row.get("email", "").lower() or None
+                if not name or not phone:
+                    result.reject(row_number, row, "Name and phone are required")
+                    continue
+                if phone in existing_phones:
+                    result.reject(row_number, row, "Duplicate phone")
+                    continue
+                if email and not EMAIL_PATTERN.match(email):
+                    result.reject(row_number, row, "Invalid email")
+                    continue
+                if email and email in existing_emails:
+                    result.reject(row_number, row, "Duplicate email")
+                    continue
+
+                combo_name = row.get("combo", "")
+                if combo_name:
+                    combo_type = combo_types.get(combo_name.lower())
+                    if combo_type is None:
+                        result.reject(row_number, row, f"Unknown combo '{combo_name}'")
+                        continue
+                    remaining = row.get("remaining_uses", "")
+                    if remaining and not remaining.isdigit():
+                        result.reject(row_number, row, "remaining_uses must be a whole number")
+                        continue
+                    combos.append((phone, combo_type["id"], int(remaining) if remaining else combo_type["total_uses"]))
+
+                existing_phones.add(phone)
+                if email:
+                    existing_emails.add(email)
+                customers.append((name, phone, email))
+
+            with immediate_transaction(conn):
+                conn.executemany("INSERT INTO customers (name, phone, email) VALUES (?, ?, ?)", customers)
+                if combos:
+                    # Resolve the new IDs by phone; the temp table keeps this to one statement per chunk
+                    conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_combos (phone TEXT, combo_type_id INTEGER, remaining_uses INTEGER)")
+                    conn.execute("DELETE FROM import_combos")
+                    conn.executemany("INSERT INTO import_combos VALUES (?, ?, ?)", combos)
+                    granted = conn.execute(
+                        """INSERT INTO combos (customer_id, combo_type_id, remaining_uses)
+                           SELECT c.id, i.combo_type_id, i.remaining_uses
+                           FROM import_combos i JOIN customers c ON c.phone = i.phone
+                           RETURNING id, customer_id, combo_type_id, remaining_uses"""
+                    ).fetchall()
+                    record_combo_events(conn, (
+                        (row["id"], row["customer_id"], row["combo_type_id"], "grant",
+                         row["remaining_uses"], row["remaining_uses"], None, "Imported")
+                        for row in granted
+                    ))
+
+            result.rows_read += len(chunk)
+            result.inserted += len(customers)
+            result.combos_added += len(combos)
+            if progress:
+                progress(result.rows_read, result.inserted)
+
+    invalidate_customer_cache()
+    return result
+
+
+def _normalize_date(text):
+    """Accepts common date spellings and returns 'YYYY-MM-DD', or None if it can't be parsed."""
+    import pandas as pd
+
+    try:
+        return pd.to_datetime(text).strftime("%Y-%m-%d")
+    except (ValueError, TypeError):
+        return None
+
+
+def import_appointments(chunks, progress=None, result=None):
+    """
+    Bulk-loads historical appointments from row chunks.
+
+    Columns: phone (of an existing customer), service (service name), date.
+    Historical appointments are not linked to combos and don't change combo balances.
+
+    Args:
+        chunks (iterable): Lists of row dicts, e.g. from `iter_source_chunks`.
+        progress (callable, optional): Called as `progress(rows_read, inserted)` after each chunk.
+        result (ImportResult, optional): Collects the counters, so they survive a failure midway.
+
+    Returns:
+        ImportResult: Counters and the rejected rows.
+    """
+    result = result or ImportResult()
+    services = {service["name"].lower(): service["id"] for service in get_services_for_combo(None)}
+
+    with get_db_connection() as conn:
+        customer_ids = {row["phone"]: row["id"] for row in conn.execute("SELECT id, phone FROM customers")}
+        parsed_dates = {}  # Historical files repeat the same dates a lot
+
+        for chunk in chunks:
+            appointments = []
+            for offset, row in enumerate(chunk):
+                row_number = result.rows_read + offset + 2
+                missing = _missing_columns("appointments", row)
+                if missing:
+                    raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+                customer_id = customer_ids.get(normalize_phone(row["phone"]))
+                if customer_id is None:
+                    result.reject(row_number, row, "Unknown customer phone")
+                    continue
+                service_id = services.get(row["service"].lower())
+                if service_id is None:
+                    result.reject(row_number, row, f"Unknown service '{row['service']}'")
+                    continue
+                if row["date"] not in parsed_dates:
+                    parsed_dates[row["date"]] = _normalize_date(row["date"])
+                date = parsed_dates[row["date"]]
+                if date is None:
+                    result.reject(row_number, row, "Invalid date")
+                    continue
+                appointments.append((customer_id, service_id, date))
+
+            with immediate_transaction(conn):
+                conn.executemany("INSERT INTO appointments (customer_id, service_id, date) VALUES (?, ?, ?)", appointments)
+            schedule_index.forget()  # Cached stylist days must not outlive appointments written here
+
+            result.rows_read += len(chunk)
+            result.inserted += len(appointments)
+            if progress:
+                progress(result.rows_read, result.inserted)
+
+    return result
+
+
+IMPORTERS = {
+    "customers": import_customers,
+    "appointments": import_appointments,
+}
+
+
+def import_file(kind, source, file_name, progress=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Imports a CSV or Excel (.xlsx) file of customers or appointments.
+
+    Args:
+        kind (str): "customers" or "appointments".
+        source: A path or binary file-like object.
+        file_name (str): The file name (its extension picks the reader).
+        progress (callable, optional): Called as `progress(rows_read, inserted)` after each chunk.
+        chunk_size (int): Rows per chunk and transaction.
+
+    Returns:
+        ImportResult: Counters and rejected rows. If the import failed, `error` holds the
+        reason (e.g. a missing column or an unreadable file); chunks committed before that stay.
+    """
+    result = ImportResult()
+    try:
+        IMPORTERS[kind](iter_source_chunks(source, file_name, chunk_size), progress, result)
+    except Exception as e:
+        logger.error("Error importing %s: %s", kind, e)
+        result.error = str(e)
+    return result
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Sustained messages per second and burst size allowed per provider
+PROVIDER_RATE_LIMITS = {
+    "smtp": (5.0, 20),
+    "twilio": (1.0, 5),
+    "fake": (100.0, 100),
+}
+DEFAULT_RATE_LIMIT = (1.0, 1)
+
+SMS_MAX_WORKERS = 4      # Concurrent SMS requests per channel
+SMS_MAX_LENGTH = 480     # Three concatenated SMS segments
+
+# ============================
+# Rate Limiting
+# ============================
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `capacity` saved up.
+
+    `acquire` blocks until a token is available, so bursts up to `capacity` go out
+    immediately and anything beyond that is paced at `rate`.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """Takes one token, waiting up to `timeout` seconds (forever if None). Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider):
+    """Returns the process-wide token bucket for a provider, shared by every channel using it."""
+    with _rate_limiters_lock:
+        if provider not in _rate_limiters:
+            _rate_limiters[provider] = TokenBucket(*PROVIDER_RATE_LIMITS.get(provider, DEFAULT_RATE_LIMIT))
+        return _rate_limiters[provider]
+
+# ============================
+# SMS Transports
+# ============================
+
+class TwilioTransport:
+    """Sends SMS through Twilio's REST API. The client is created on first use."""
+
+    provider = "twilio"
+
+    def __init__(self, account_sid, auth_token, from_number):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_number = from_number
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                from twilio.rest import Client  # Only needed when SMS is actually sent
+                self._client = Client(self.account_sid, self.auth_token)
+            return self._client
+
+    def send(self, to_number, text):
+        self._get_client().messages.create(to=to_number, from_=self.from_number, body=text)
+
+
+class FakeSMSTransport:
+    """Keeps SMS in memory instead of sending them, for development and checks."""
+
+    provider = "fake"
+
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, to_number, text):
+        with self._lock:
+            self.sent.append((to_number, text))
+
+# ============================
+# Channels
+# ============================
+
+class EmailChannel:
+    """
+    Delivers outbox messages as email.
+
+    Args:
+        send_batch (callable): `send_batch([(subject, to_email, body), ...])` returning one
+            bool per message, e.g. `notifications.send_emails` (one SMTP session per batch).
+    """
+
+    name = "email"
+    provider = "smtp"
+
+    def __init__(self, send_batch):
+        self.send_batch = send_batch
+        self.rate_limiter = get_rate_limiter(self.provider)
+
+    def send_many(self, messages):
+        for _ in messages:
+            self.rate_limiter.acquire()
+        return self.send_batch(messages)
+
+
+class SMSChannel:
+    """
+    Delivers outbox messages as SMS through `transport`.
+
+    Messages go out concurrently on a bounded worker pool, each one paced by the
+    provider's token bucket. The subject is not sent; the body is the SMS text.
+    """
+
+    name = "sms"
+
+    def __init__(self, transport, max_workers=SMS_MAX_WORKERS):
+        self.transport = transport
+        self.rate_limiter = get_rate_limiter(transport.provider)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sms")
+
+    def _send_one(self, message):
+        subject, to_number, text = message
+        self.rate_limiter.acquire()
+        try:
+            self.transport.send(to_number, text[:SMS_MAX_LENGTH])
+            return True
+        except Exception as e:
+            logger.error("Error sending SMS to %s: %s", to_number, e)
+            return False
+
+    def send_many(self, messages):
+        return list(self._pool.map(self._send_one, messages))
@@ -1,17 +1,57 @@
-import sqlite3
+import logging
+import threading
+from components.db import get_db_connection, immediate_transaction, register_reset_hook
+from components.combo_ledger import record_combo_event, revoke_combo_type_combos
 
-# Path to the SQLite database file
-DB_PATH = 'database/business.db'
+logger = logging.getLogger(__name__)
 
 # ============================
-# Helper Function
+# Catalog Cache
 # ============================
 
-def get_db_connection():
-    """Provides a single database connection with timeout."""
-    conn = sqlite3.connect(DB_PATH, timeout=30)
-    conn.row_factory = sqlite3.Row  # Makes query results more readable
-    return conn
+# Combo types and services change rarely but are read on almost every rerun,
+# so they are cached once per server process and shared by all sessions.
+_catalog_cache = {}
+_catalog_version = 0
+_catalog_lock = threading.Lock()
+_catalog_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _read_through_catalog(key, loader):
+    """Returns a copy of the cached catalog entry for `key`, loading it with `loader()` on a miss."""
+    with _catalog_lock:
+        cached = _catalog_cache.get(key)
+        if cached is not None:
+            _catalog_stats["hits"] += 1
+            return [dict(item) for item in cached]
+        _catalog_stats["misses"] += 1
+        version = _catalog_version
+
+    value = loader()
+
+    with _catalog_lock:
+        # Don't store data read before a concurrent write invalidated the cache
+        if version == _catalog_version:
+            _catalog_cache[key] = value
+    return [dict(item) for item in value]
+
+
+def invalidate_catalog_cache():
+    """Drops every cached combo type and service list. Called after catalog writes."""
+    global _catalog_version
+    with _catalog_lock:
+        _catalog_cache.clear()
+        _catalog_version += 1
+        _catalog_stats["invalidations"] += 1
+
+
+register_reset_hook(invalidate_catalog_cache)
+
+
+def get_catalog_cache_stats():
+    """Returns the catalog cache hit/miss/invalidation counters and the number of cached entries."""
+    with _catalog_lock:
+        return dict(_catalog_stats, entries=len(_catalog_cache), version=_catalog_version)
 
 # ============================
 # Combo Types Management
@@ -19,62 +59,58 @@ def get_db_connection():
 
 def add_combo_type(name, services, total_uses):
     """Adds a new combo type and associates it with selected services."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Check if the combo already exists
-        cursor.execute("SELECT id FROM combo_types WHERE name = ?", (name,))
-        existing_combo = cursor.fetchone()
-        if existing_combo:
-            print(f"Error: Combo type '{name}' already exists.")
-            return False
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Check if the combo already exists
+            cursor.execute("SELECT id FROM combo_types WHERE name = ?", (name,))
+            existing_combo = cursor.fetchone()
+            if existing_combo:
+                logger.warning("Combo type '%s' already exists.", name)
+                return False
 
-        # Insert the combo type
-        cursor.execute(
-            "INSERT INTO combo_types (name, total_uses) VALUES (?, ?)",
-            (name, total_uses)
-        )
-        combo_type_id = cursor.lastrowid
-
-        # Insert the services linked to the combo
-        for service_id in services:
+            # Insert the combo type
             cursor.execute(
-                "INSERT INTO combo_services (combo_type_id, service_id) VALUES (?, ?)",
-                (combo_type_id, service_id)
+                "INSERT INTO combo_types (name, total_uses) VALUES (?, ?)",
+                (name, total_uses)
             )
+            combo_type_id = cursor.lastrowid
 
-        conn.commit()
-        print(f"Combo type '{name}' added successfully!")
-        return True
-    except Exception as e:
-        print(f"Error adding combo type: {e}")
-        return False
-    finally:
-        conn.close()
+            # Insert the services linked to the combo
+            for service_id in services:
+                cursor.execute(
+                    "INSERT INTO combo_services (combo_type_id, service_id) VALUES (?, ?)",
+                    (combo_type_id, service_id)
+                )
 
-def get_combo_types():
-    """Retrieves all available combo types."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM combo_types")
-        combo_types = cursor.fetchall()
+            conn.commit()
+            invalidate_catalog_cache()
+            logger.info("Combo type '%s' added successfully!", name)
+            return True
+        except Exception as e:
+            logger.error("Error adding combo type: %s", e)
+            return False
 
+def _load_combo_types():
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM combo_types")
         return [
             {"id": combo["id"], "name": combo["name"], "total_uses": combo["total_uses"]}
-            for combo in combo_types
+            for combo in cursor.fetchall()
         ]
+
+def get_combo_types():
+    """Retrieves all available combo types (served from the catalog cache)."""
+    try:
+        return _read_through_catalog(("combo_types",), _load_combo_types)
     except Exception as e:
-        print(f"Error retrieving combo types: {e}")
+        logger.error("Error retrieving combo types: %s", e)
         return []
-    finally:
-        conn.close()
 
-def get_services_for_combo(combo_type_id=None):
-    """Retrieves all services or services linked to a specific combo type."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
+def _load_services(combo_type_id):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         if combo_type_id:
             cursor.execute(
                 """SELECT s.id, s.name FROM services s
@@ -84,33 +120,44 @@ def get_services_for_combo(combo_type_id=None):
             )
         else:
             cursor.execute("SELECT id, name FROM services")
-        
-        services = [{"id": row["id"], "name": row["name"]} for row in cursor.fetchall()]
-        return services
+        return [{"id": row["id"], "name": row["name"]} for row in cursor.fetchall()]
+
+def get_services_for_combo(combo_type_id=None):
+    """Retrieves all services or services linked to a specific combo type (served from the catalog cache)."""
+    try:
+        return _read_through_catalog(("services", combo_type_id or None), lambda: _load_services(combo_type_id))
     except Exception as e:
-        print(f"Error retrieving services for combo: {e}")
+        logger.error("Error retrieving services for combo: %s", e)
         return []
-    finally:
-        conn.close()
         
 def delete_combo_type(combo_type_id):
-    """Deletes a combo type from the system, including its service mappings."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Delete services mapped to this combo
-        cursor.execute("DELETE FROM combo_services WHERE combo_type_id = ?", (combo_type_id,))
-
-        # Delete the combo type
-        cursor.execute("DELETE FROM combo_types WHERE id = ?", (combo_type_id,))
-        conn.commit()
-        print(f"Combo type ID {combo_type_id} deleted successfully!")
-        return True
-    except Exception as e:
-        print(f"Error deleting combo type: {e}")
-        return False
-    finally:
-        conn.close()
+    """
+    Deletes a combo type from the system, including its service mappings.
+
+    Customers' combos of this type are deleted with it (ON DELETE CASCADE); their
+    remaining uses are revoked in the ledger in the same transaction.
+    """
+    with get_db_connection() as conn:
+        try:
+            with immediate_transaction(conn):
+                customer_ids = revoke_combo_type_combos(conn, combo_type_id, note="Combo type deleted")
+
+                # Delete services mapped to this combo
+                conn.execute("DELETE FROM combo_services WHERE combo_type_id = ?", (combo_type_id,))
+
+                # Delete the combo type
+                conn.execute("DELETE FROM combo_types WHERE id = ?", (combo_type_id,))
+            invalidate_catalog_cache()
+            if customer_ids:
+                from components.customer import invalidate_customer_cache  # components.customer imports this module
+
+                invalidate_customer_cache()  # Possibly many customers, drop every cached lookup
+            logger.info("Combo type ID %s deleted successfully! Revoked the combos of %s customers.",
+                        combo_type_id, len(customer_ids))
+            return True
+        except Exception as e:
+            logger.error("Error deleting combo type: %s", e)
+            return False
 
 # ============================
 # Customer Combo Management
@@ -118,83 +165,118 @@ def delete_combo_type(combo_type_id):
 
 def add_combo(customer_id, combo_type_id, conn=None):
     """Assigns a combo to a customer using a shared connection if provided."""
-    should_close_connection = False
-    if conn is None:
-        conn = get_db_connection()
-        should_close_connection = True
+    with get_db_connection(conn) as conn:
+        cursor = conn.cursor()
+        try:
+            # Retrieve total uses from the combo_types table
+            cursor.execute("SELECT total_uses FROM combo_types WHERE id = ?", (combo_type_id,))
+            result = cursor.fetchone()
+            if not result:
+                logger.warning("Combo type ID %s does not exist.", combo_type_id)
+                return False
+            total_uses = result["total_uses"]
 
-    cursor = conn.cursor()
-    try:
-        # Retrieve total uses from the combo_types table
-        cursor.execute("SELECT total_uses FROM combo_types WHERE id = ?", (combo_type_id,))
-        result = cursor.fetchone()
-        if not result:
-            print(f"Error: Combo type ID {combo_type_id} does not exist.")
+            # Add combo to the combos table
+            cursor.execute(
+                "INSERT INTO combos (customer_id, combo_type_id, remaining_uses) VALUES (?, ?, ?)",
+                (customer_id, combo_type_id, total_uses)
+            )
+            record_combo_event(conn, cursor.lastrowid, customer_id, "grant", total_uses, total_uses,
+                               combo_type_id=combo_type_id)
+            conn.commit()
+            logger.info("Combo for customer ID %s added successfully!", customer_id)
+            return True
+        except Exception as e:
+            logger.error("Error adding combo: %s", e)
             return False
-        total_uses = result["total_uses"]
-
-        # Add combo to the combos table
-        cursor.execute(
-            "INSERT INTO combos (customer_id, combo_type_id, remaining_uses) VALUES (?, ?, ?)",
-            (customer_id, combo_type_id, total_uses)
-        )
-        conn.commit()
-        print(f"Combo for customer ID {customer_id} added successfully!")
-        return True
-    except Exception as e:
-        print(f"Error adding combo: {e}")
-        return False
-    finally:
-        if should_close_connection:
-            conn.close()
 
-def get_customer_combos(customer_id):
+def get_customer_combos(customer_id, conn=None):
     """Retrieves all active combos for a specific customer (remaining uses > 0)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT c.id, ct.name, c.remaining_uses, ct.total_uses
-            FROM combos c
-            JOIN combo_types ct ON c.combo_type_id = ct.id
-            WHERE c.customer_id = ? AND c.remaining_uses > 0
-        """, (customer_id,))
+    with get_db_connection(conn) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT c.id, ct.name, c.remaining_uses, ct.total_uses
+                FROM combos c
+                JOIN combo_types ct ON c.combo_type_id = ct.id
+                WHERE c.customer_id = ? AND c.remaining_uses > 0
+                ORDER BY c.id
+            """, (customer_id,))
         
-        combos = cursor.fetchall()
-        return [
-            {"id": combo["id"], "name": combo["name"], "remaining_uses": combo["remaining_uses"], "total_uses": combo["total_uses"]}
-            for combo in combos
-        ]
-    except Exception as e:
-        print(f"Error retrieving customer combos: {e}")
-        return []
-    finally:
-        conn.close()
+            combos = cursor.fetchall()
+            return [
+                {"id": combo["id"], "name": combo["name"], "remaining_uses": combo["remaining_uses"], "total_uses": combo["total_uses"]}
+                for combo in combos
+            ]
+        except Exception as e:
+            logger.error("Error retrieving customer combos: %s", e)
+            return []
+
+def redeem_combo_use(conn, combo_id, appointment_id=None):
+    """
+    Takes one use from a combo with a single conditional UPDATE and records a "redeem" in the ledger.
+
+    Must run inside the caller's transaction (see `immediate_transaction`); nothing is committed here.
+
+    Returns:
+        int: The remaining uses after redemption, or None if the combo does not exist or is used up.
+    """
+    row = conn.execute(
+        """UPDATE combos SET remaining_uses = remaining_uses - 1 WHERE id = ? AND remaining_uses > 0
+           RETURNING remaining_uses, customer_id, combo_type_id""",
+        (combo_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    record_combo_event(conn, combo_id, row["customer_id"], "redeem", -1, row["remaining_uses"],
+                       combo_type_id=row["combo_type_id"], appointment_id=appointment_id)
+    return row["remaining_uses"]
+
+def restore_combo_use(conn, combo_id, appointment_id=None):
+    """
+    Gives one use back to a combo, never going above the combo type's total uses, and records a "refund".
+
+    Must run inside the caller's transaction; nothing is committed here. A refund that would
+    exceed the total uses (or hits a missing combo) changes nothing and is logged as a warning.
+
+    Returns:
+        int: The remaining uses after the restore, or None if nothing was restored.
+    """
+    row = conn.execute(
+        """UPDATE combos SET remaining_uses = remaining_uses + 1
+           WHERE id = ?
+             AND remaining_uses < (SELECT total_uses FROM combo_types WHERE id = combos.combo_type_id)
+           RETURNING remaining_uses, customer_id, combo_type_id""",
+        (combo_id,)
+    ).fetchone()
+    if row is None:
+        logger.warning("Combo ID %s was not refunded for appointment ID %s: it does not exist or has all its uses.",
+                       combo_id, appointment_id)
+        return None
+    record_combo_event(conn, combo_id, row["customer_id"], "refund", 1, row["remaining_uses"],
+                       combo_type_id=row["combo_type_id"], appointment_id=appointment_id)
+    return row["remaining_uses"]
 
 def update_combo_usage(combo_id, conn=None):
-    """Decreases the remaining uses of a combo by 1."""
-    should_close_connection = False
-    if conn is None:
-        conn = get_db_connection()
-        should_close_connection = True
+    """
+    Decreases the remaining uses of a combo by 1.
 
-    cursor = conn.cursor()
+    With a shared connection the change joins the caller's transaction; otherwise it is
+    committed in its own immediate transaction.
+    """
     try:
-        cursor.execute(
-            "UPDATE combos SET remaining_uses = remaining_uses - 1 WHERE id = ? AND remaining_uses > 0",
-            (combo_id,)
-        )
-        conn.commit()
-
-        if cursor.rowcount > 0:
-            print(f"Debug: Combo ID {combo_id} usage updated successfully!")
+        if conn is not None:
+            remaining_uses = redeem_combo_use(conn, combo_id)
+        else:
+            with get_db_connection() as conn, immediate_transaction(conn):
+                remaining_uses = redeem_combo_use(conn, combo_id)
+
+        if remaining_uses is not None:
+            logger.debug("Combo ID %s usage updated successfully!", combo_id)
             return True
         else:
-            print(f"Error: Combo ID {combo_id} has no remaining uses or does not exist.")
+            logger.warning("Combo ID %s has no remaining uses or does not exist.", combo_id)
             return False
     except Exception as e:
-        print(f"Error updating combo usage: {e}")
+        logger.error("Error updating combo usage: %s", e)
         return False
-    finally:
-        if should_close_connection:
-            conn.close()
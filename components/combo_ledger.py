@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+from components.db import get_db_connection, immediate_transaction
+
+logger = logging.getLogger(__name__)
+
+# Event kinds: grants and refunds add uses, redemptions and revocations remove them
+LEDGER_EVENTS = ("grant", "redeem", "refund", "revoke")
+
+RECONCILE_INTERVAL = 6 * 60 * 60  # Seconds between scheduled balance checks
+
+# ============================
+# Ledger Storage
+# ============================
+
+def record_combo_event(conn, combo_id, customer_id, event, delta, balance_after,
+                       combo_type_id=None, appointment_id=None, note=None):
+    """
+    Appends one event to the ledger. Must run in the same transaction as the balance change.
+
+    Args:
+        conn (sqlite3.Connection): The connection holding the caller's transaction.
+        combo_id (int): The combo whose balance changed.
+        customer_id (int): The combo's owner.
+        event (str): One of LEDGER_EVENTS.
+        delta (int): The change in remaining uses (negative for redeem and revoke).
+        balance_after (int): The combo's remaining uses after the change.
+        combo_type_id (int, optional): Kept so the history can name combos that were deleted later.
+        appointment_id (int, optional): The appointment behind a redeem or refund.
+        note (str, optional): Free text for audits.
+    """
+    record_combo_events(conn, [(combo_id, customer_id, combo_type_id, event, delta, balance_after, appointment_id, note)])
+
+
+def record_combo_events(conn, events):
+    """
+    Appends many events with one `executemany` (e.g. for bulk imports).
+
+    Args:
+        conn (sqlite3.Connection): The connection holding the caller's transaction.
+        events (iterable): Tuples of (combo_id, customer_id, combo_type_id, event, delta,
+            balance_after, appointment_id, note).
+    """
+    now = time.time()
+    conn.executemany(
+        """INSERT INTO combo_ledger
+               (combo_id, customer_id, combo_type_id, event, delta, balance_after, appointment_id, note, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (tuple(event) + (now,) for event in events)
+    )
+
+
+def revoke_customer_combos(conn, customer_id, combo_id=None, note=None):
+    """
+    Records a "revoke" for the remaining uses of a customer's combos (or one combo) before they are deleted.
+
+    Must run in the caller's transaction, before the DELETE.
+    """
+    query = "SELECT id, combo_type_id, remaining_uses FROM combos WHERE customer_id = ?"
+    params = (customer_id,)
+    if combo_id is not None:
+        query += " AND id = ?"
+        params += (combo_id,)
+    for combo in conn.execute(query, params).fetchall():
+        record_combo_event(conn, combo["id"], customer_id, "revoke", -combo["remaining_uses"], 0,
+                           combo_type_id=combo["combo_type_id"], note=note)
+
+
+def revoke_combo_type_combos(conn, combo_type_id, note=None):
+    """
+    Records a "revoke" for every customer combo of a combo type before the type is deleted
+    (deleting it cascades to those combos).
+
+    Must run in the caller's transaction, before the DELETE.
+
+    Returns:
+        list: The IDs of the customers whose combos were revoked.
+    """
+    combos = conn.execute(
+        "SELECT id, customer_id, remaining_uses FROM combos WHERE combo_type_id = ?", (combo_type_id,)
+    ).fetchall()
+    record_combo_events(conn, (
+        (combo["id"], combo["customer_id"], combo_type_id, "revoke", -combo["remaining_uses"], 0, None, note)
+        for combo in combos
+    ))
+    return list(dict.fromkeys(combo["customer_id"] for combo in combos))
+
+# ============================
+# Queries
+# ============================
+
+def get_customer_combo_history(customer_id, limit=50, before_id=None):
+    """
+    Returns a customer's combo events, newest first, served from `idx_combo_ledger_customer`.
+
+    Args:
+        customer_id (int): The customer.
+        limit (int): Events per page.
+        before_id (int, optional): Only events older than this ledger ID (for paging).
+
+    Returns:
+        list: Dicts with "id", "combo_id", "combo_name", "event", "delta", "balance_after",
+            "appointment_id", "note" and "created_at".
+    """
+    with get_db_connection() as conn:
+        try:
+            rows = conn.execute(
+                """SELECT l.id, l.combo_id, ct.name AS combo_name, l.event, l.delta, l.balance_after,
+                          l.appointment_id, l.note, l.created_at
+                   FROM combo_ledger l
+                   LEFT JOIN combo_types ct ON ct.id = l.combo_type_id
+                   WHERE l.customer_id = ? AND l.id < ?
+                   ORDER BY l.id DESC
+                   LIMIT ?""",
+                (customer_id, before_id if before_id is not None else 2 ** 63 - 1, limit)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error("Error retrieving combo history: %s", e)
+            return []
+
+# ============================
+# Reconciliation
+# ============================
+
+def reconcile_combo_balances(repair=False):
+    """
+    Compares every combo's materialized balance with the sum of its ledger events.
+
+    The comparison reads a snapshot without blocking writers; only a repair takes the
+    write lock, and only for the combos that differ.
+
+    Args:
+        repair (bool): Reset mismatched balances to the ledger's value.
+
+    Returns:
+        list: One dict per mismatch with "combo_id", "customer_id", "remaining_uses" and "ledger_balance".
+    """
+    with get_db_connection() as conn:
+        # One statement reads one snapshot (WAL), and every writer changes a balance and
+        # its ledger in the same transaction, so a mismatch here is real
+        mismatches = [dict(row) for row in conn.execute(
+            """SELECT c.id AS combo_id, c.customer_id, c.remaining_uses,
+                      COALESCE(SUM(l.delta), 0) AS ledger_balance
+               FROM combos c
+               LEFT JOIN combo_ledger l ON l.combo_id = c.id
+               GROUP BY c.id
+               HAVING c.remaining_uses != COALESCE(SUM(l.delta), 0)"""
+        )]
+        if repair and mismatches:
+            with immediate_transaction(conn):
+                # Recomputed under the lock: the combo may have been redeemed since the scan
+                conn.executemany(
+                    """UPDATE combos
+                       SET remaining_uses = (SELECT COALESCE(SUM(delta), 0) FROM combo_ledger WHERE combo_id = combos.id)
+                       WHERE id = ?""",
+                    [(row["combo_id"],) for row in mismatches]
+                )
+    for row in mismatches:
+        logger.warning("Combo ID %s balance %s does not match its ledger (%s).%s", row["combo_id"],
+                       row["remaining_uses"], row["ledger_balance"], " Repaired." if repair else "")
+    return mismatches
+
+
+class ReconciliationJob(threading.Thread):
+    """Daemon thread that checks the combo balances against the ledger every `interval` seconds."""
+
+    def __init__(self, interval=RECONCILE_INTERVAL, repair=False):
+        super().__init__(name="combo-reconciliation", daemon=True)
+        self.interval = interval
+        self.repair = repair
+        self._stop_event = threading.Event()
+        self.last_result = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.last_result = reconcile_combo_balances(self.repair)
+            except Exception as e:
+                logger.error("Error reconciling combo balances: %s", e)
+            self._stop_event.wait(self.interval)
+
+
+_job = None
+_job_lock = threading.Lock()
+
+
+def start_reconciliation_job(interval=RECONCILE_INTERVAL, repair=False):
+    """Starts the process-wide reconciliation job if it is not running yet."""
+    global _job
+    with _job_lock:
+        if _job is None or not _job.is_alive():
+            _job = ReconciliationJob(interval, repair)
+            _job.start()
+        return _job
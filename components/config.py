@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+
+# Settings are looked up in this order, first match wins:
+#   1. environment variables
+#   2. Streamlit secrets (st.secrets when running in the app, else the same secrets.toml files)
+#   3. a dotenv file
+# Nothing is read until a setting is first asked for, so components import without Streamlit or secrets.
+DOTENV_PATH = ".env"
+SECRETS_PATHS = (  # Read in this order, later files override earlier ones (as Streamlit does)
+    os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml"),
+    os.path.join(".streamlit", "secrets.toml"),
+)
+
+_MISSING = object()
+
+_settings = {}  # name -> resolved value (or _MISSING)
+_sources = {}   # "secrets" / "dotenv" -> their key/value dicts, loaded on first use
+_lock = threading.RLock()
+
+# ============================
+# Sources
+# ============================
+
+def _load_secrets():
+    """Streamlit secrets, from st.secrets if Streamlit is already loaded, else from the TOML files."""
+    if "streamlit" in sys.modules:
+        import streamlit as st
+        try:
+            return {key: st.secrets[key] for key in st.secrets}
+        except FileNotFoundError:  # No secrets file
+            return {}
+
+    import tomllib  # Avoids importing Streamlit just to read its secrets file
+    secrets = {}
+    for path in SECRETS_PATHS:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                secrets.update(tomllib.load(f))
+    return secrets
+
+
+def _load_dotenv():
+    if not os.path.exists(DOTENV_PATH):
+        return {}
+    from dotenv import dotenv_values
+    return dotenv_values(DOTENV_PATH)
+
+
+_LOADERS = {"secrets": _load_secrets, "dotenv": _load_dotenv}
+
+
+def _source(name):
+    values = _sources.get(name)
+    if values is None:
+        values = _sources[name] = _LOADERS[name]()
+    return values
+
+# ============================
+# Settings
+# ============================
+
+def get_setting(name, default=None):
+    """
+    Returns a setting from the environment, Streamlit secrets or the dotenv file.
+
+    The value is resolved on first use and cached for the process.
+
+    Args:
+        name (str): The setting name, e.g. "EMAIL_HOST".
+        default: Returned when no source has the setting.
+
+    Returns:
+        The value as stored: a string from the environment or dotenv file, any TOML type from secrets.
+    """
+    value = _settings.get(name, _MISSING)
+    if value is _MISSING and name not in _settings:
+        with _lock:
+            value = os.environ.get(name, _MISSING)
+            for source in ("secrets", "dotenv"):
+                if value is _MISSING:
+                    value = _source(source).get(name, _MISSING)
+            _settings[name] = value
+    return default if value is _MISSING else value
+
+
+def get_bool_setting(name, default=False):
+    """A setting read as a flag: "false", "0", "no" and "off" are False (case-insensitive)."""
+    value = get_setting(name)
+    if value is None:
+        return default
+    return str(value).strip().lower() not in ("false", "0", "no", "off")
+
+
+def reload_settings():
+    """Forgets the resolved settings, so the next lookups read the sources again."""
+    with _lock:
+        _settings.clear()
+        _sources.clear()
@@ -1,7 +1,16 @@
 import sqlite3
-import csv
-import os
-from components.combo import add_combo, get_customer_combos, get_db_connection
+import copy
+import logging
+import threading
+import time
+from itertools import chain, groupby
+from components.combo import add_combo, get_customer_combos
+from components.combo_ledger import revoke_customer_combos
+from components.db import get_db_connection, register_reset_hook
+from components.log import HIGH_FREQUENCY
+from components.schedule import schedule_index
+
+logger = logging.getLogger(__name__)
 
 # ============================
 # Customer Management
@@ -9,281 +18,371 @@ from components.combo import add_combo, get_customer_combos, get_db_connection
 
 def add_customer(name, phone, email, combo_type_id):
     """Adds a new customer and assigns an initial combo to them."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Add customer to the database
-        cursor.execute("INSERT INTO customers (name, phone, email) VALUES (?, ?, ?)", (name, phone, email))
-        customer_id = cursor.lastrowid  # Get the new customer ID
-
-        print(f"Debug: Customer '{name}' added with ID {customer_id}")
-
-        # Assign the initial combo
-        if not add_combo(customer_id, combo_type_id, conn):
-            raise Exception("Failed to add combo for the customer.")
-
-        conn.commit()
-        print(f"Customer '{name}' added successfully with combo type ID {combo_type_id}!")
-        return True
-    except sqlite3.IntegrityError:
-        print(f"Error: Customer with phone number '{phone}' or email '{email}' already exists.")
-        return False
-    except Exception as e:
-        print(f"Error adding customer: {e}")
-        return False
-    finally:
-        conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Add customer to the database
+            cursor.execute("INSERT INTO customers (name, phone, email) VALUES (?, ?, ?)", (name, phone, email))
+            customer_id = cursor.lastrowid  # Get the new customer ID
+
+            logger.debug("Customer '%s' added with ID %s", name, customer_id)
+
+            # Assign the initial combo
+            if not add_combo(customer_id, combo_type_id, conn):
+                raise Exception("Failed to add combo for the customer.")
+
+            conn.commit()
+            invalidate_customer_cache(phone=phone)  # Forget a cached "not found"
+            logger.info("Customer '%s' added successfully with combo type ID %s!", name, combo_type_id)
+            return True
+        except sqlite3.IntegrityError:
+            logger.warning("Customer with phone number '%s' or email '%s' already exists.", phone, email)
+            return False
+        except Exception as e:
+            logger.error("Error adding customer: %s", e)
+            return False
 
-def get_customer_by_phone(phone):
-    """Retrieves a customer's information using their phone number only."""
-    conn = get_db_connection()
+def _fetch_customer_by_phone(conn, phone):
     cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM customers WHERE phone = ?", (phone,))
-        customer = cursor.fetchone()
-        
-        if not customer:
-            print(f"Debug: No customer found for phone number '{phone}'")
-            return None  # No customer found
+    cursor.execute("SELECT * FROM customers WHERE phone = ?", (phone,))
+    customer = cursor.fetchone()
 
-        customer_id = customer["id"]
-        customer_combos = get_customer_combos(customer_id)
+    if not customer:
+        logger.debug("No customer found for phone number '%s'", phone, extra=HIGH_FREQUENCY)
+        return None  # No customer found
 
-        print(f"Debug: Retrieved Customer {customer_id}: {customer}")
-        print(f"Debug: Customer {customer_id} Combos: {customer_combos}")
+    customer_id = customer["id"]
+    customer_combos = get_customer_combos(customer_id, conn)
 
-        return {
-            "ID": customer_id,
-            "Name": customer["name"],
-            "Phone": customer["phone"],
-            "Email": customer["email"],
-            "Combos": customer_combos  # List of active combos
-        }
-    except Exception as e:
-        print(f"Error retrieving customer: {e}")
-        return None
-    finally:
-        conn.close()
+    if logger.isEnabledFor(logging.DEBUG):  # dict() copies the row, so only when it is written
+        logger.debug("Retrieved customer %s: %s, combos: %s", customer_id, dict(customer), customer_combos,
+                     extra=HIGH_FREQUENCY)
 
-def get_all_customers():
-    """Retrieves all customers and their assigned combos."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM customers")
-        customers = cursor.fetchall()
-
-        print(f"Debug: Retrieved Customers from DB: {customers}")
-
-        customer_list = []
-        for customer in customers:
-            customer_id = customer["id"]
-            customer_combos = get_customer_combos(customer_id)
-
-            customer_list.append({
-                "ID": customer_id,
-                "Name": customer["name"],
-                "Phone": customer["phone"],
-                "Email": customer["email"],
-                "Combos": customer_combos
-            })
-
-        return customer_list
-    except Exception as e:
-        print(f"Error retrieving customers: {e}")
-        return []
-    finally:
-        conn.close()
+    return {
+        "ID": customer_id,
+        "Name": customer["name"],
+        "Phone": customer["phone"],
+        "Email": customer["email"],
+        "Combos": customer_combos  # List of active combos
+    }
 
-def edit_customer(customer_id, new_name, new_email):
-    """Edits a customer's name and updates their Email Address, but keeps phone number fixed."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Ensure customer exists
-        cursor.execute("SELECT name FROM customers WHERE id = ?", (customer_id,))
-        customer = cursor.fetchone()
+def get_customer_by_phone(phone):
+    """Retrieves a customer's information using their phone number only."""
+    with get_db_connection() as conn:
+        try:
+            return _fetch_customer_by_phone(conn, phone)
+        except Exception as e:
+            logger.error("Error retrieving customer: %s", e)
+            return None
 
-        if not customer:
-            print(f"Error: Customer ID {customer_id} not found.")
-            return False
-        
-        #check if email already exisits in the system
-        cursor.execute("SELECT id FROM customers WHERE email = ? and id != ?", (new_email, customer_id))
-        existing_customer = cursor.fetchone()
-
-        if existing_customer:
-            print(f"Error: Email '{new_email} is already in use by another customer")
-            return "email_exists"
-
-        # Perform the update (phone number is NOT updated)
-        cursor.execute(
-            """UPDATE customers 
-               SET name = ?, email = ? 
-               WHERE id = ?""",
-            (new_name, new_email, customer_id)
-        )
-
-        conn.commit()
-        print(f"Customer ID {customer_id} updated successfully!")
-        return True
-
-    except Exception as e:
-        print(f"Error updating customer: {e}")
-        return False
-    finally:
-        conn.close()
+# ============================
+# Customer Lookup Cache
+# ============================
 
-def delete_customer(customer_id):
-    """Deletes a customer and all related records (appointments, combos)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Ensure customer exists
-        cursor.execute("SELECT id FROM customers WHERE id = ?", (customer_id,))
-        customer = cursor.fetchone()
-        if not customer:
-            print(f"Error: Customer ID {customer_id} does not exist.")
-            return False
+# How long a phone lookup (including "not found") is reused
+CUSTOMER_CACHE_TTL = 30  # seconds
+CUSTOMER_CACHE_MAX_ENTRIES = 1024
 
-        # Delete all appointments associated with the customer
-        cursor.execute("DELETE FROM appointments WHERE customer_id = ?", (customer_id,))
-        print(f"Deleted all appointments for Customer ID {customer_id}.")
+_customer_cache = {}  # phone as entered (trimmed) -> (expires_at, customer dict or None)
+_customer_cache_version = 0  # Bumped by every invalidation
+_customer_cache_lock = threading.Lock()
 
-        # Delete all combos associated with the customer
-        cursor.execute("DELETE FROM combos WHERE customer_id = ?", (customer_id,))
-        print(f"Deleted all combos for Customer ID {customer_id}.")
 
-        # Delete customer from the database
-        cursor.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
-        conn.commit()
+def normalize_phone(phone):
+    """
+    Normalizes a phone number for lookups by trimming surrounding whitespace.
 
-        print(f"Customer ID {customer_id} deleted successfully!")
-        return True
+    Punctuation is kept: phone numbers are stored and matched exactly as entered, so
+    "555-123-4567" and "5551234567" are different lookups (and cache keys).
+    """
+    return (phone or "").strip()
 
-    except Exception as e:
-        print(f"Error deleting customer: {e}")
-        return False
-    finally:
-        conn.close()
 
-def remove_customer_if_combos_used_up(customer_id):
-    """Checks if a customer has any remaining combos and deletes them if all combos are used up."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "SELECT COUNT(*) FROM combos WHERE customer_id = ? AND remaining_uses > 0",
-            (customer_id,)
-        )
-        active_combos_count = cursor.fetchone()[0]
-        if active_combos_count == 0:
-            return delete_customer(customer_id)  # Now this checks for active combos before deletion
-        return False
-    except Exception as e:
-        print(f"Error checking customer combos: {e}")
-        return False
-    finally:
-        conn.close()
+def get_customer_by_phone_cached(phone):
+    """
+    Same as `get_customer_by_phone`, but reuses results for CUSTOMER_CACHE_TTL seconds.
 
+    Meant for widgets that rerun often (e.g. the appointment phone field). Writes that
+    change a customer or their combos invalidate the cached entry.
+    """
+    phone = normalize_phone(phone)
+    if not phone:
+        return None
 
-def add_combo_to_existing_customer(customer_id, combo_type_id):
-    """Adds a new combo to an existing customer."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Ensure customer exists
-        cursor.execute("SELECT id FROM customers WHERE id = ?", (customer_id,))
-        customer = cursor.fetchone()
-        if not customer:
-            print(f"Error: Customer ID {customer_id} does not exist.")
-            return False
+    now = time.monotonic()
+    with _customer_cache_lock:
+        cached = _customer_cache.get(phone)
+        version = _customer_cache_version
+    if cached and cached[0] > now:
+        return copy.deepcopy(cached[1])
+
+    with get_db_connection() as conn:
+        try:
+            customer = _fetch_customer_by_phone(conn, phone)
+        except Exception as e:
+            logger.error("Error retrieving customer: %s", e)
+            return None
 
-        # Add the new combo
-        if not add_combo(customer_id, combo_type_id, conn):
-            raise Exception("Failed to add the new combo.")
+    with _customer_cache_lock:
+        # Don't store data read before a concurrent write invalidated the cache
+        if version != _customer_cache_version:
+            return customer
+        if len(_customer_cache) >= CUSTOMER_CACHE_MAX_ENTRIES:
+            # Drop expired entries first, then everything if that was not enough
+            for key in [key for key, (expires_at, _) in _customer_cache.items() if expires_at <= now]:
+                del _customer_cache[key]
+            if len(_customer_cache) >= CUSTOMER_CACHE_MAX_ENTRIES:
+                _customer_cache.clear()
+        _customer_cache[phone] = (now + CUSTOMER_CACHE_TTL, customer)
+    return copy.deepcopy(customer)
+
+
+def invalidate_customer_cache(customer_id=None, phone=None):
+    """
+    Removes cached lookups for a customer (by ID and/or phone). Without arguments the whole cache is cleared.
+    """
+    global _customer_cache_version
+    with _customer_cache_lock:
+        _customer_cache_version += 1
+        if customer_id is None and phone is None:
+            _customer_cache.clear()
+            return
+        if phone is not None:
+            _customer_cache.pop(normalize_phone(phone), None)
+        if customer_id is not None:
+            for key in [key for key, (_, customer) in _customer_cache.items()
+                        if customer and customer["ID"] == customer_id]:
+                del _customer_cache[key]
 
-        conn.commit()
-        print(f"New combo (ID {combo_type_id}) added for Customer ID {customer_id} successfully!")
-        return True
-    except Exception as e:
-        print(f"Error adding combo: {e}")
-        return False
-    finally:
-        conn.close()
 
+register_reset_hook(invalidate_customer_cache)
 
-def remove_combo_from_customer(customer_id, combo_id):
-    """Removes a specific combo from a customer's profile."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        # Ensure combo exists for the customer
-        cursor.execute("SELECT id FROM combos WHERE id = ? AND customer_id = ?", (combo_id, customer_id))
-        combo = cursor.fetchone()
-        if not combo:
-            print(f"Error: Combo ID {combo_id} not found for Customer ID {customer_id}.")
-            return False
 
-        # Delete the combo
-        cursor.execute("DELETE FROM combos WHERE id = ?", (combo_id,))
-        conn.commit()
-        print(f"Combo ID {combo_id} removed from Customer ID {customer_id}.")
-        return True
-    except Exception as e:
-        print(f"Error removing combo: {e}")
-        return False
-    finally:
-        conn.close()
+def search_customers_by_phone_prefix(prefix, limit=10):
+    """
+    Returns up to `limit` customers whose phone number starts with `prefix`.
 
+    Uses a range scan on the phone index, so it stays cheap enough to run on every rerun.
+
+    Args:
+        prefix (str): The beginning of the phone number.
+        limit (int): Maximum number of matches.
 
-def export_customers_to_csv():
-    """
-    Exports all customer data into a CSV file and returns the file path.
-    
     Returns:
-        str: Path of the exported CSV file.
+        list: Dictionaries with "ID", "Name" and "Phone", ordered by phone.
+    """
+    prefix = normalize_phone(prefix)
+    if not prefix:
+        return []
+    # Every string starting with `prefix` sorts between prefix and prefix with its last character bumped
+    upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+    with get_db_connection() as conn:
+        try:
+            cursor = conn.execute(
+                "SELECT id, name, phone FROM customers WHERE phone >= ? AND phone < ? ORDER BY phone LIMIT ?",
+                (prefix, upper_bound, limit)
+            )
+            return [{"ID": row["id"], "Name": row["name"], "Phone": row["phone"]} for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error("Error searching customers: %s", e)
+            return []
+
+def iter_customers_with_combos(conn, batch_size=500, customer_id=None):
+    """
+    Streams every customer together with their active combos using a single query.
+
+    Rows are fetched in batches and grouped per customer as they arrive, so the cost
+    grows with the number of rows instead of one combo query per customer.
+
+    Args:
+        conn (sqlite3.Connection): The connection to read from.
+        batch_size (int): Number of joined rows fetched per round-trip.
+        customer_id (int, optional): Only return this customer.
+
+    Yields:
+        dict: Customer dictionaries in the same shape as `get_customer_by_phone`.
     """
-    conn = get_db_connection()
+    where, params = ("", ()) if customer_id is None else ("WHERE cu.id = ?", (customer_id,))
     cursor = conn.cursor()
-    try:
-        # Retrieve all customers and their assigned combos
-        cursor.execute("SELECT id, name, email, phone FROM customers")
-        customers = cursor.fetchall()
+    # Flat LEFT JOINs: a parenthesized join is materialized by a scan of every combo,
+    # even when only one customer is asked for. Combos always have a type (ON DELETE CASCADE).
+    cursor.execute(f"""
+        SELECT cu.id, cu.name, cu.phone, cu.email,
+               c.id AS combo_id, ct.name AS combo_name, c.remaining_uses, ct.total_uses
+        FROM customers cu
+        LEFT JOIN combos c ON c.customer_id = cu.id AND c.remaining_uses > 0
+        LEFT JOIN combo_types ct ON ct.id = c.combo_type_id
+        {where}
+        ORDER BY cu.id, c.id
+    """, params)
+
+    def rows():
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield from batch
+
+    for customer_id, customer_rows in groupby(rows(), key=lambda row: row["id"]):
+        first = next(customer_rows)
+        combos = []
+        for row in chain((first,), customer_rows):
+            if row["combo_id"] is not None:
+                combos.append({"id": row["combo_id"], "name": row["combo_name"],
+                               "remaining_uses": row["remaining_uses"], "total_uses": row["total_uses"]})
+        yield {
+            "ID": customer_id,
+            "Name": first["name"],
+            "Phone": first["phone"],
+            "Email": first["email"],
+            "Combos": combos
+        }
 
-        if not customers:
-            print("No customers found for export.")
-            return None
+def get_all_customers():
+    """Retrieves all customers and their assigned combos."""
+    with get_db_connection() as conn:
+        try:
+            return list(iter_customers_with_combos(conn))
+        except Exception as e:
+            logger.error("Error retrieving customers: %s", e)
+            return []
 
-        csv_filename = "customers_data.csv"
-        csv_filepath = os.path.join(os.getcwd(), csv_filename)
+def edit_customer(customer_id, new_name, new_email):
+    """Edits a customer's name and updates their Email Address, but keeps phone number fixed."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Ensure customer exists
+            cursor.execute("SELECT name FROM customers WHERE id = ?", (customer_id,))
+            customer = cursor.fetchone()
+
+            if not customer:
+                logger.warning("Customer ID %s not found.", customer_id)
+                return False
+        
+            #check if email already exisits in the system
+            cursor.execute("SELECT id FROM customers WHERE email = ? and id != ?", (new_email, customer_id))
+            existing_customer = cursor.fetchone()
+
+            if existing_customer:
+                logger.warning("Email '%s' is already in use by another customer.", new_email)
+                return "email_exists"
+
+            # Perform the update (phone number is NOT updated)
+            cursor.execute(
+                """UPDATE customers 
+                   SET name = ?, email = ? 
+                   WHERE id = ?""",
+                (new_name, new_email, customer_id)
+            )
+
+            conn.commit()
+            invalidate_customer_cache(customer_id)
+            logger.info("Customer ID %s updated successfully!", customer_id)
+            return True
+
+        except Exception as e:
+            logger.error("Error updating customer: %s", e)
+            return False
 
-        with open(csv_filepath, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(["Customer ID", "Customer Name", "Email", "Ph.no", "Combos for the customer", "Remaining uses"])
+def delete_customer(customer_id):
+    """Deletes a customer and all related records (appointments, combos)."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Ensure customer exists
+            cursor.execute("SELECT id FROM customers WHERE id = ?", (customer_id,))
+            customer = cursor.fetchone()
+            if not customer:
+                logger.warning("Customer ID %s does not exist.", customer_id)
+                return False
+
+            # Delete all appointments associated with the customer
+            cursor.execute("DELETE FROM appointments WHERE customer_id = ?", (customer_id,))
+            logger.info("Deleted all appointments for Customer ID %s.", customer_id)
+
+            # Delete all combos associated with the customer
+            revoke_customer_combos(conn, customer_id, note="Customer deleted")
+            cursor.execute("DELETE FROM combos WHERE customer_id = ?", (customer_id,))
+            logger.info("Deleted all combos for Customer ID %s.", customer_id)
+
+            # Delete customer from the database
+            cursor.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
+            conn.commit()
+            invalidate_customer_cache(customer_id)
+            schedule_index.forget()  # Their timed appointments no longer block any slot
+
+            logger.info("Customer ID %s deleted successfully!", customer_id)
+            return True
+
+        except Exception as e:
+            logger.error("Error deleting customer: %s", e)
+            return False
 
-            for customer in customers:
-                customer_id = customer["id"]
-                name = customer["name"]
-                email = customer["email"]
-                phone = customer["phone"]
+def remove_customer_if_combos_used_up(customer_id):
+    """Checks if a customer has any remaining combos and deletes them if all combos are used up."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT COUNT(*) FROM combos WHERE customer_id = ? AND remaining_uses > 0",
+                (customer_id,)
+            )
+            active_combos_count = cursor.fetchone()[0]
+            if active_combos_count == 0:
+                return delete_customer(customer_id)  # Now this checks for active combos before deletion
+            return False
+        except Exception as e:
+            logger.error("Error checking customer combos: %s", e)
+            return False
 
-                # Fetch combos for the customer
-                customer_combos = get_customer_combos(customer_id)
-                if customer_combos:
-                    combo_names = ", ".join([combo["name"] for combo in customer_combos])
-                    remaining_uses = ", ".join([str(combo["remaining_uses"]) for combo in customer_combos])
-                else:
-                    combo_names = "No combos"
-                    remaining_uses = "N/A"
 
-                writer.writerow([customer_id, name, email, phone, combo_names, remaining_uses])
+def add_combo_to_existing_customer(customer_id, combo_type_id):
+    """Adds a new combo to an existing customer."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Ensure customer exists
+            cursor.execute("SELECT id FROM customers WHERE id = ?", (customer_id,))
+            customer = cursor.fetchone()
+            if not customer:
+                logger.warning("Customer ID %s does not exist.", customer_id)
+                return False
+
+            # Add the new combo
+            if not add_combo(customer_id, combo_type_id, conn):
+                raise Exception("Failed to add the new combo.")
+
+            conn.commit()
+            invalidate_customer_cache(customer_id)
+            logger.info("New combo (ID %s) added for Customer ID %s successfully!", combo_type_id, customer_id)
+            return True
+        except Exception as e:
+            logger.error("Error adding combo: %s", e)
+            return False
 
-        print(f"Customer data exported successfully: {csv_filepath}")
-        return csv_filepath
 
-    except Exception as e:
-        print(f"Error exporting customers to CSV: {e}")
-        return None
-    finally:
-        conn.close()
\ No newline at end of file
+def remove_combo_from_customer(customer_id, combo_id):
+    """Removes a specific combo from a customer's profile."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Ensure combo exists for the customer
+            cursor.execute("SELECT id FROM combos WHERE id = ? AND customer_id = ?", (combo_id, customer_id))
+            combo = cursor.fetchone()
+            if not combo:
+                logger.warning("Combo ID %s not found for Customer ID %s.", combo_id, customer_id)
+                return False
+
+            # Delete the combo
+            revoke_customer_combos(conn, customer_id, combo_id, note="Combo removed")
+            cursor.execute("DELETE FROM combos WHERE id = ?", (combo_id,))
+            conn.commit()
+            invalidate_customer_cache(customer_id)
+            logger.info("Combo ID %s removed from Customer ID %s.", combo_id, customer_id)
+            return True
+        except Exception as e:
+            logger.error("Error removing combo: %s", e)
+            return False
+
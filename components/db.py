@@ -0,0 +1,267 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from components.instrumentation import InstrumentedConnection
+from components.migrations import migrate
+
+# Path to the SQLite database file
+DB_PATH = 'database/business.db'
+
+# Pool and connection tuning
+POOL_SIZE = 8                 # Max connections held open per server process
+BUSY_TIMEOUT = 30             # Seconds to wait on a locked database (same as before)
+CACHED_STATEMENTS = 256       # Prepared statements kept per connection
+CACHE_SIZE_KB = 16384         # Page cache per connection (16 MB)
+MMAP_SIZE = 128 * 1024 * 1024  # Memory-mapped I/O window (128 MB)
+
+# ============================
+# Connection Pool
+# ============================
+
+class ConnectionPool:
+    """
+    A thread-safe pool of long-lived, pre-tuned SQLite connections.
+
+    Connections are opened lazily up to `max_size` and handed back to the pool
+    when the borrower is done, so a Streamlit rerun no longer pays the
+    open/close cost for every query.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_size=POOL_SIZE, timeout=BUSY_TIMEOUT):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._generation = 0
+        self._generations = {}  # connection -> generation it was opened in
+        self._migrated_generation = None
+        self._migrate_lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _open(self):
+        """Opens a new connection and applies the per-connection PRAGMAs."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,  # Connections move between Streamlit threads, one borrower at a time
+            cached_statements=CACHED_STATEMENTS,
+            factory=InstrumentedConnection,  # Statement timings for the admin panel
+        )
+        conn.row_factory = sqlite3.Row  # Makes query results more readable
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        for hook in _connection_hooks:
+            hook(conn)
+        self.connections_opened += 1
+        with self._lock:
+            generation = self._generations[conn] = self._generation
+        try:
+            self._migrate(conn, generation)
+        except Exception:
+            conn.close()
+            with self._lock:
+                self._generations.pop(conn, None)
+            raise
+        return conn
+
+    def _migrate(self, conn, generation):
+        """Applies pending schema migrations once per generation (at startup and after a restore)."""
+        if self._migrated_generation == generation:
+            return
+        with self._migrate_lock:
+            if self._migrated_generation != generation:
+                migrate(conn)
+                self._migrated_generation = generation
+
+    def acquire(self):
+        """Borrows a connection, opening a new one if the pool is not full yet."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._size < self.max_size
+            if can_open:
+                self._size += 1
+
+        if can_open:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                raise
+
+        # Pool is full, wait for another borrower to hand a connection back
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Timed out waiting for a database connection from the pool.")
+
+    def release(self, conn):
+        """Returns a borrowed connection to the pool, discarding any uncommitted work."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # The connection is unusable, drop it instead of returning it
+            self._discard(conn)
+            return
+        with self._lock:
+            stale = self._generations.get(conn) != self._generation
+        if stale:
+            # Opened before `recycle()`, don't hand it out again
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._size -= 1
+            self._generations.pop(conn, None)
+
+    def recycle(self):
+        """
+        Retires every current connection: idle ones are closed now, borrowed ones when
+        they are returned. Connections handed out afterwards are freshly opened.
+        """
+        with self._lock:
+            self._generation += 1
+        self.close_all()
+
+    def close_all(self):
+        """Closes every idle connection. Borrowed connections are closed when returned."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that borrows a connection and always hands it back."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        """Returns a snapshot of the pool's size and usage counters."""
+        return {
+            "db_path": self.db_path,
+            "max_size": self.max_size,
+            "open": self._size,
+            "idle": self._idle.qsize(),
+            "connections_opened": self.connections_opened,
+        }
+
+
+# Callables run against every newly opened connection (e.g. tracing)
+_connection_hooks = []
+
+
+def register_connection_hook(hook):
+    """Registers a callable that receives each new pooled connection right after it is opened."""
+    if hook not in _connection_hooks:
+        _connection_hooks.append(hook)
+
+
+def unregister_connection_hook(hook):
+    """Removes a hook added with `register_connection_hook`."""
+    if hook in _connection_hooks:
+        _connection_hooks.remove(hook)
+
+
+# Callables run after the database file's contents were replaced (e.g. a restore)
+_reset_hooks = []
+
+
+def register_reset_hook(hook):
+    """Registers a callable that drops process-wide state derived from the database (caches, schema flags)."""
+    if hook not in _reset_hooks:
+        _reset_hooks.append(hook)
+
+
+def notify_database_replaced():
+    """Recycles the pooled connections and runs every reset hook, so nothing stale survives a restore."""
+    get_pool().recycle()
+    for hook in _reset_hooks:
+        hook()
+
+
+# One pool per server process, created on first use
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def configure_pool(db_path=DB_PATH, max_size=POOL_SIZE, timeout=BUSY_TIMEOUT):
+    """Replaces the process-wide pool, e.g. to point the components at another database file."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = ConnectionPool(db_path, max_size=max_size, timeout=timeout)
+    return _pool
+
+
+@contextmanager
+def get_db_connection(conn=None):
+    """
+    Borrows a pooled database connection for the duration of a `with` block.
+
+    Args:
+        conn (sqlite3.Connection, optional): A connection already borrowed by the caller.
+            When given it is reused as-is and not returned to the pool here.
+
+    Yields:
+        sqlite3.Connection: A connection with `sqlite3.Row` rows.
+    """
+    if conn is not None:
+        yield conn
+        return
+
+    with get_pool().connection() as pooled_conn:
+        yield pooled_conn
+
+
+@contextmanager
+def immediate_transaction(conn):
+    """
+    Runs the `with` block in a BEGIN IMMEDIATE transaction on `conn`.
+
+    The write lock is taken up front, so read-then-write sequences inside the block
+    cannot interleave with another writer. Commits on success, rolls back on error.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        if conn.in_transaction:
+            conn.commit()
@@ -0,0 +1,124 @@
+import html
+import os
+import re
+import threading
+
+# Directory holding the HTML email templates
+TEMPLATE_DIR = "templates"
+
+# Placeholders look like {{CUSTOMER_NAME}}
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+# ============================
+# Compiled Templates
+# ============================
+
+class Raw(str):
+    """Marks a placeholder value as trusted HTML that must be inserted without escaping."""
+
+
+class CompiledTemplate:
+    """
+    A template split once into literal text and placeholder slots.
+
+    Rendering fills the slots and joins the pieces in a single pass, instead of
+    running one full-string replace per placeholder.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._parts = []   # Literal text, with None where a slot goes
+        self._slots = []   # (index in _parts, placeholder name)
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self._parts.append(source[position:match.start()])
+            self._slots.append((len(self._parts), match.group(1)))
+            self._parts.append(None)
+            position = match.end()
+        self._parts.append(source[position:])
+
+    @property
+    def placeholders(self):
+        return [name for _, name in self._slots]
+
+    def render(self, values, raw_keys=()):
+        """
+        Fills the placeholders and returns the rendered text.
+
+        Args:
+            values (dict): Placeholder names mapped to values. Values are HTML-escaped
+                unless they are `Raw` or their name is listed in `raw_keys`.
+            raw_keys (iterable): Placeholder names whose values are inserted as-is.
+
+        Returns:
+            str: The rendered template. Unknown placeholders are left untouched.
+        """
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            if name not in values:
+                parts[index] = "{{" + name + "}}"
+                continue
+            value = values[name]
+            if isinstance(value, Raw) or name in raw_keys:
+                parts[index] = str(value)
+            else:
+                parts[index] = html.escape(str(value))
+        return "".join(parts)
+
+# ============================
+# Template Cache
+# ============================
+
+_cache = {}  # template path -> (mtime_ns, CompiledTemplate)
+_cache_lock = threading.Lock()
+
+
+def get_template(template_name, template_dir=TEMPLATE_DIR):
+    """
+    Returns the compiled template, recompiling only when the file changed on disk.
+
+    Args:
+        template_name (str): The name of the template file.
+        template_dir (str): The directory containing the templates.
+
+    Returns:
+        CompiledTemplate: The compiled template, or None if the file does not exist.
+    """
+    template_path = os.path.join(template_dir, template_name)
+    try:
+        mtime = os.stat(template_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    cached = _cache.get(template_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(template_path, "r", encoding="utf-8") as file:
+        compiled = CompiledTemplate(file.read())
+    with _cache_lock:
+        _cache[template_path] = (mtime, compiled)
+    return compiled
+
+
+def render_template(template_name, placeholders, raw_keys=()):
+    """
+    Renders a template from the cache.
+
+    Args:
+        template_name (str): The name of the template file.
+        placeholders (dict): A dictionary of placeholder keys and values.
+        raw_keys (iterable): Placeholder names holding trusted HTML (not escaped).
+
+    Returns:
+        str: The rendered content, or None if the template does not exist.
+    """
+    template = get_template(template_name)
+    if template is None:
+        return None
+    return template.render(placeholders, raw_keys)
+
+
+def clear_template_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,217 @@
+import csv
+import io
+import logging
+import zipfile
+from components.customer import iter_customers_with_combos
+from components.db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Rows pulled from SQLite (and written out) per chunk
+CHUNK_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "csv": {"extension": "csv", "mime": "text/csv"},
+    "parquet": {"extension": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+
+# ============================
+# Table Sources
+# ============================
+
+CUSTOMER_COLUMNS = ["Customer ID", "Customer Name", "Email", "Ph.no", "Combos for the customer", "Remaining uses"]
+
+APPOINTMENTS_QUERY = """
+    SELECT a.id AS "Appointment ID", a.date AS "Date", c.id AS "Customer ID",
+           c.name AS "Customer Name", c.phone AS "Ph.no", s.name AS "Service", a.combo_id AS "Combo ID"
+    FROM appointments a
+    JOIN customers c ON a.customer_id = c.id
+    JOIN services s ON a.service_id = s.id
+    ORDER BY a.date, a.id
+"""
+
+COMBO_HISTORY_QUERY = """
+    SELECT c.id AS "Combo ID", cu.id AS "Customer ID", cu.name AS "Customer Name", cu.phone AS "Ph.no",
+           ct.name AS "Combo", ct.total_uses AS "Total uses", c.remaining_uses AS "Remaining uses",
+           ct.total_uses - c.remaining_uses AS "Used"
+    FROM combos c
+    JOIN customers cu ON c.customer_id = cu.id
+    JOIN combo_types ct ON c.combo_type_id = ct.id
+    ORDER BY cu.id, c.id
+"""
+
+
+def _iter_customer_chunks(conn, chunk_size):
+    """Yields the customer table (same layout as the old CSV export) in chunks of rows."""
+    chunk = []
+    for customer in iter_customers_with_combos(conn, batch_size=chunk_size):
+        combos = customer["Combos"]
+        if combos:
+            combo_names = ", ".join([combo["name"] for combo in combos])
+            remaining_uses = ", ".join([str(combo["remaining_uses"]) for combo in combos])
+        else:
+            combo_names = "No combos"
+            remaining_uses = "N/A"
+        chunk.append((customer["ID"], customer["Name"], customer["Email"], customer["Phone"], combo_names, remaining_uses))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_query_chunks(conn, query, chunk_size):
+    """Yields the rows of `query` in chunks using fetchmany."""
+    cursor = conn.cursor()
+    cursor.execute(query)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield [tuple(row) for row in rows]
+
+
+def _query_columns(conn, query):
+    cursor = conn.execute(query + " LIMIT 0")
+    return [column[0] for column in cursor.description]
+
+
+TABLE_QUERIES = {
+    "appointments": APPOINTMENTS_QUERY,
+    "combo_history": COMBO_HISTORY_QUERY,
+}
+
+
+def _open_table(conn, table, chunk_size):
+    """Returns the header columns and a chunk iterator for one export table."""
+    if table == "customers":
+        return CUSTOMER_COLUMNS, _iter_customer_chunks(conn, chunk_size)
+    query = TABLE_QUERIES[table]
+    return _query_columns(conn, query), _iter_query_chunks(conn, query, chunk_size)
+
+# ============================
+# Writers
+# ============================
+
+def iter_csv_chunks(columns, chunks):
+    """
+    Encodes row chunks as CSV, yielding UTF-8 bytes one chunk at a time.
+
+    Args:
+        columns (list): The header row.
+        chunks (iterable): An iterable of lists of row tuples.
+
+    Yields:
+        bytes: CSV-encoded data.
+    """
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield text.getvalue().encode("utf-8")
+        text.seek(0)
+        text.truncate(0)
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
+
+
+def _write_csv(columns, chunks, output):
+    for data in iter_csv_chunks(columns, chunks):
+        output.write(data)
+
+
+def _write_parquet(columns, chunks, output):
+    """Writes row chunks into a single Parquet file, one row group per chunk."""
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Parquet needs a seekable sink, zip entries are not
+    sink = io.BytesIO()
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(pd.DataFrame.from_records(chunk, columns=columns), preserve_index=False)
+            if writer is None:
+                # Columns that are all NULL in the first chunk would otherwise be typed as null forever
+                schema = pa.schema([
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ])
+                writer = pq.ParquetWriter(sink, schema)
+            table = table.cast(writer.schema, safe=False)
+            writer.write_table(table)
+        if writer is None:
+            # No rows, still produce a valid file with the header columns
+            empty = pa.Table.from_pandas(pd.DataFrame(columns=columns), preserve_index=False)
+            pq.write_table(empty, sink)
+    finally:
+        if writer is not None:
+            writer.close()
+    output.write(sink.getvalue())
+
+
+WRITERS = {
+    "csv": _write_csv,
+    "parquet": _write_parquet,
+}
+
+# ============================
+# Export Engine
+# ============================
+
+def export_data(export_format="csv", include_appointments=False, include_combo_history=False, chunk_size=CHUNK_SIZE):
+    """
+    Builds a data export entirely in memory, streaming rows from the database in chunks.
+
+    A single table is returned as a plain CSV/Parquet file. When appointments or combo
+    history are included, every table is written to its own file inside a ZIP archive.
+
+    Args:
+        export_format (str): "csv" or "parquet".
+        include_appointments (bool): Also export the appointments table.
+        include_combo_history (bool): Also export every combo (including used up ones).
+        chunk_size (int): Rows fetched and written per chunk.
+
+    Returns:
+        dict: {"data": bytes, "file_name": str, "mime": str}, or None if the export failed.
+    """
+    if export_format not in EXPORT_FORMATS:
+        logger.warning("Unsupported export format '%s'.", export_format)
+        return None
+
+    tables = ["customers"]
+    if include_appointments:
+        tables.append("appointments")
+    if include_combo_history:
+        tables.append("combo_history")
+
+    extension = EXPORT_FORMATS[export_format]["extension"]
+    write = WRITERS[export_format]
+
+    with get_db_connection() as conn:
+        try:
+            buffer = io.BytesIO()
+            if len(tables) == 1:
+                columns, chunks = _open_table(conn, "customers", chunk_size)
+                write(columns, chunks, buffer)
+                return {
+                    "data": buffer.getvalue(),
+                    "file_name": f"customers_data.{extension}",
+                    "mime": EXPORT_FORMATS[export_format]["mime"],
+                }
+
+            with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for table in tables:
+                    columns, chunks = _open_table(conn, table, chunk_size)
+                    with archive.open(f"{table}.{extension}", mode="w") as entry:
+                        write(columns, chunks, entry)
+            return {
+                "data": buffer.getvalue(),
+                "file_name": f"business_data_{export_format}.zip",
+                "mime": "application/zip",
+            }
+        except Exception as e:
+            logger.error("Error exporting data: %s", e)
+            return None
@@ -0,0 +1,329 @@
+import collections
+import contextlib
+import itertools
+import logging
+import sqlite3
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Slow-query log settings
+SLOW_QUERY_THRESHOLD_MS = 100  # Statements at least this slow go to the slow-query log
+SLOW_LOG_SIZE = 200            # Slow queries kept, oldest dropped first
+RERUN_HISTORY = 50             # Streamlit reruns kept
+STATEMENT_PREVIEW = 300        # Characters of SQL shown per statement
+MAX_STATEMENTS = 1000          # Distinct statements tracked; the rest are pooled
+
+# Modules whose frames are not counted as the calling component function
+_PLUMBING_MODULES = {"components.db", "components.instrumentation"}
+
+
+class _ThreadState(threading.local):
+    rerun = None  # The rerun the thread's statements belong to
+
+
+_lock = threading.Lock()
+_local = _ThreadState()
+_rerun_ids = itertools.count(1)
+_slow_threshold_ms = SLOW_QUERY_THRESHOLD_MS
+
+# ============================
+# Aggregates
+# ============================
+
+class _Totals:
+    """Calls, time and rows for one function or statement."""
+
+    __slots__ = ("calls", "total_ms", "max_ms", "rows")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+    def as_dict(self):
+        return {"calls": self.calls, "total_ms": self.total_ms, "max_ms": self.max_ms,
+                "avg_ms": self.total_ms / self.calls if self.calls else 0.0, "rows": self.rows}
+
+
+class QueryRecord:
+    """One executed statement. Time and rows grow while its cursor is being read."""
+
+    __slots__ = ("statement", "function", "rerun", "started_at", "duration_ms", "rows", "slow", "totals")
+
+    def __init__(self, statement, function, rerun, totals):
+        self.statement = statement
+        self.function = function
+        self.rerun = rerun
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.rows = 0
+        self.slow = False
+        self.totals = totals  # Every aggregate this statement counts towards
+
+
+class RerunStats:
+    """The statements issued by one Streamlit script run, per component function."""
+
+    def __init__(self, label):
+        self.id = next(_rerun_ids)
+        self.label = label
+        self.started_at = time.time()
+        self.totals = _Totals()
+        self.functions = collections.defaultdict(_Totals)
+
+
+_functions = collections.defaultdict(_Totals)
+_statements = collections.defaultdict(_Totals)
+_reruns = collections.deque(maxlen=RERUN_HISTORY)
+_slow_log = collections.deque(maxlen=SLOW_LOG_SIZE)
+
+
+_code_names = {}   # code object -> "module.function", or None outside the components
+_normalized = {}   # SQL text -> whitespace-collapsed text
+
+
+def _calling_function():
+    """The component function that ran the statement, e.g. "customer.iter_customers_with_combos"."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        name = _code_names.get(code, False)
+        if name is False:
+            module = frame.f_globals.get("__name__", "")
+            name = None
+            if module.startswith("components.") and module not in _PLUMBING_MODULES:
+                name = f"{module[len('components.'):]}.{code.co_name}"
+            _code_names[code] = name
+        if name:
+            return name
+        frame = frame.f_back
+    return "other"
+
+
+def _start(sql):
+    statement = _normalized.get(sql)
+    if statement is None:
+        statement = " ".join(sql.split())
+        if len(_normalized) < MAX_STATEMENTS:
+            _normalized[sql] = statement
+    function = _calling_function()
+    rerun = _local.rerun
+    with _lock:
+        if statement not in _statements and len(_statements) >= MAX_STATEMENTS:
+            statement_key = "(other statements)"
+        else:
+            statement_key = statement
+        totals = [_functions[function], _statements[statement_key]]
+        if rerun is not None:
+            totals += [rerun.totals, rerun.functions[function]]
+    return QueryRecord(statement, function, rerun, totals)
+
+
+def _add(record, elapsed_ms, rows, new_call=False):
+    """Adds time and rows to a record and to every aggregate it belongs to."""
+    with _lock:
+        record.duration_ms += elapsed_ms
+        record.rows += rows
+        for totals in record.totals:
+            totals.calls += new_call
+            totals.total_ms += elapsed_ms
+            totals.rows += rows
+            if record.duration_ms > totals.max_ms:
+                totals.max_ms = record.duration_ms
+        slow = not record.slow and record.duration_ms >= _slow_threshold_ms
+        if slow:
+            record.slow = True
+            _slow_log.append(record)
+    if slow:
+        # Rows may still be fetched; the log entry keeps the final duration
+        logger.warning("Slow query (over %g ms) in %s: %s", _slow_threshold_ms, record.function,
+                       record.statement[:STATEMENT_PREVIEW])
+
+# ============================
+# Instrumented Connections
+# ============================
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times each statement, including the time spent fetching its rows."""
+
+    _record = None
+
+    def _run(self, method, sql, parameters):
+        self._record = record = _start(sql)
+        start = time.perf_counter()
+        try:
+            return method(sql, parameters)
+        finally:
+            # Statements returning rows (queries, RETURNING) are counted as they are fetched
+            rows = max(self.rowcount, 0) if self.description is None else 0
+            _add(record, (time.perf_counter() - start) * 1000, rows, new_call=True)
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(super().executemany, sql, seq_of_parameters)
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        if self._record is not None:
+            rows = len(result) if isinstance(result, list) else int(result is not None)
+            _add(self._record, (time.perf_counter() - start) * 1000, rows)
+        return result
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def __next__(self):
+        start = time.perf_counter()
+        row = super().__next__()  # StopIteration ends the statement
+        if self._record is not None:
+            _add(self._record, (time.perf_counter() - start) * 1000, 1)
+        return row
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    Connection whose statements are recorded by this module.
+
+    Pass it as `factory` to `sqlite3.connect`. The shortcut methods are overridden
+    because `Connection.execute` does not go through `cursor()`.
+    """
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# ============================
+# Reruns and Settings
+# ============================
+
+def begin_rerun(label):
+    """
+    Attributes the statements of the calling thread to a new rerun, until the next call.
+
+    Call it at the top of the Streamlit script; statements from background threads are
+    not part of any rerun.
+    """
+    rerun = RerunStats(label)
+    with _lock:
+        _reruns.append(rerun)
+    _local.rerun = rerun
+    return rerun
+
+
+def get_current_rerun_id():
+    """The ID of the rerun the calling thread's statements count towards, or None."""
+    rerun = _local.rerun
+    return rerun.id if rerun is not None else None
+
+
+@contextlib.contextmanager
+def rerun_section(label):
+    """
+    Attributes the statements inside the block to a rerun of their own, then returns to the
+    enclosing one.
+
+    Meant for `st.fragment` bodies: they run as part of the full script, but also on their own
+    when one of their widgets changes, without the script's `begin_rerun` call.
+    """
+    previous = _local.rerun
+    begin_rerun(label)
+    try:
+        yield
+    finally:
+        _local.rerun = previous
+
+
+def set_slow_query_threshold(threshold_ms):
+    global _slow_threshold_ms
+    _slow_threshold_ms = threshold_ms
+
+
+def get_slow_query_threshold():
+    return _slow_threshold_ms
+
+
+def reset_stats():
+    """Forgets all statistics (the current reruns keep counting from zero)."""
+    with _lock:
+        _functions.clear()
+        _statements.clear()
+        _slow_log.clear()
+        for rerun in _reruns:
+            rerun.totals = _Totals()
+            rerun.functions.clear()
+
+# ============================
+# Reports
+# ============================
+
+def _sorted_totals(totals, key_name, limit=None):
+    rows = [{key_name: key, **value.as_dict()} for key, value in totals.items()]
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows[:limit]
+
+
+def get_function_stats():
+    """Statements per component function since start (or the last reset), most time first."""
+    with _lock:
+        return _sorted_totals(_functions, "function")
+
+
+def get_statement_stats(limit=20):
+    """The statements that took the most time in total."""
+    with _lock:
+        rows = _sorted_totals(_statements, "statement", limit)
+    for row in rows:
+        row["statement"] = row["statement"][:STATEMENT_PREVIEW]
+    return rows
+
+
+def get_rerun_stats(limit=RERUN_HISTORY):
+    """
+    Recent Streamlit reruns, newest first.
+
+    Returns:
+        list: Dicts with "id", "label", "started_at", "queries", "total_ms", "rows" and
+            "functions" (per component function, most time first).
+    """
+    with _lock:
+        reruns = list(_reruns)[::-1][:limit]
+        return [{
+            "id": rerun.id,
+            "label": rerun.label,
+            "started_at": rerun.started_at,
+            "queries": rerun.totals.calls,
+            "total_ms": rerun.totals.total_ms,
+            "rows": rerun.totals.rows,
+            "functions": _sorted_totals(rerun.functions, "function"),
+        } for rerun in reruns]
+
+
+def get_slow_queries():
+    """The slow-query log, newest first."""
+    with _lock:
+        return [{
+            "started_at": record.started_at,
+            "duration_ms": record.duration_ms,
+            "rows": record.rows,
+            "function": record.function,
+            "rerun": record.rerun.label if record.rerun else None,
+            "statement": record.statement[:STATEMENT_PREVIEW],
+        } for record in reversed(_slow_log)]
@@ -0,0 +1,112 @@
+import datetime
+import json
+import logging
+import sys
+import threading
+from components.config import get_setting
+
+# Default log settings, overridden by SALON_LOG_LEVEL, SALON_LOG_FORMAT and SALON_LOG_SAMPLE_EVERY
+# (environment, Streamlit secrets or .env, see components/config.py)
+LOG_LEVEL = "WARNING"  # DEBUG, INFO, WARNING or ERROR
+LOG_FORMAT = "text"    # "json" for one JSON object per line
+SAMPLE_EVERY = 100     # 1 in this many high-frequency events is written
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Pass as `extra` for events logged on every lookup; only 1 in SAMPLE_EVERY of them is written.
+# Records below the logger's level are dropped before sampling, so they cost nothing either way.
+HIGH_FREQUENCY = {"sample_every": SAMPLE_EVERY}
+
+# Every component logs to a child of this logger (logging.getLogger(__name__))
+ROOT_LOGGER = "components"
+
+_handler = None
+_handler_lock = threading.Lock()
+
+# ============================
+# Sampling and Formatting
+# ============================
+
+class SamplingFilter(logging.Filter):
+    """Passes 1 in `sample_every` records of each call site (logger and message template)."""
+
+    def __init__(self):
+        super().__init__()
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        every = getattr(record, "sample_every", 1)
+        if every <= 1:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % every == 0
+
+
+class TextFormatter(logging.Formatter):
+    """The standard text format, noting when a line stands for a sample of events."""
+
+    def format(self, record):
+        line = super().format(record)
+        every = getattr(record, "sample_every", 1)
+        return f"{line} (1 in {every} logged)" if every > 1 else line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log collectors."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc)
+                    .isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        every = getattr(record, "sample_every", 1)
+        if every > 1:
+            entry["sample_every"] = every
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+# ============================
+# Configuration
+# ============================
+
+def configure_logging(level=None, json_output=None, stream=None):
+    """
+    Sends the components' log records to `stream` (stderr by default).
+
+    Safe to call on every Streamlit rerun: the handler is installed once and only its
+    level and format are updated. Without this call, warnings and errors still reach
+    stderr through Python's last-resort handler.
+
+    Args:
+        level (str | int): Minimum level; defaults to SALON_LOG_LEVEL.
+        json_output (bool): JSON lines instead of text; defaults to SALON_LOG_FORMAT == "json".
+        stream: File-like object to write to.
+    """
+    global _handler
+    level = level or get_setting("SALON_LOG_LEVEL", LOG_LEVEL)
+    if isinstance(level, str):
+        level = level.upper()
+    if json_output is None:
+        json_output = str(get_setting("SALON_LOG_FORMAT", LOG_FORMAT)).lower() == "json"
+    HIGH_FREQUENCY["sample_every"] = int(get_setting("SALON_LOG_SAMPLE_EVERY", SAMPLE_EVERY))
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    with _handler_lock:
+        if _handler is None:
+            _handler = logging.StreamHandler(stream or sys.stderr)
+            _handler.addFilter(SamplingFilter())
+            logger.addHandler(_handler)
+            logger.propagate = False  # Not written twice if the root logger is configured too
+        elif stream is not None:
+            _handler.setStream(stream)
+        _handler.setFormatter(JsonFormatter() if json_output else TextFormatter(TEXT_FORMAT))
+        logger.setLevel(level)
+    return logger
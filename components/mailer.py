@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Reuse an authenticated connection for this long after its last message.
+# Gmail drops idle SMTP sessions after a few minutes, so stay well below that.
+IDLE_TIMEOUT = 60
+
+# ============================
+# SMTP Session Manager
+# ============================
+
+class SMTPSession:
+    """
+    Keeps one authenticated SMTP connection alive and sends many messages over it.
+
+    The connection is opened on the first send, reused while it is busy, closed after
+    `idle_timeout` seconds without traffic and reopened transparently if the server
+    dropped it in the meantime.
+    """
+
+    def __init__(self, host, port, username=None, password=None, use_tls=True, idle_timeout=IDLE_TIMEOUT, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._smtp = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.messages_sent = 0
+
+    def _connect(self):
+        import smtplib  # Loaded on first send; it pulls in ssl
+
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()  # Identify ourselves to the SMTP server
+            if self.use_tls:
+                smtp.starttls()  # Secure the connection
+                smtp.ehlo()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)  # Log in
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self._last_used = time.monotonic()
+        self.connections_opened += 1
+
+    def _disconnect(self):
+        import smtplib
+
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+    def _ensure_connected(self):
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self._disconnect()
+        if self._smtp is None:
+            self._connect()
+
+    def _send_one(self, message):
+        """Sends one message, reconnecting once if the server closed the session."""
+        import smtplib
+
+        self._ensure_connected()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self._smtp = None
+            self._connect()
+            self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+        self.messages_sent += 1
+
+    def send(self, message):
+        """
+        Sends a single `EmailMessage`.
+
+        Returns:
+            bool: True if the message was accepted by the server, False otherwise.
+        """
+        return self.send_many([message])[0]
+
+    def send_many(self, messages):
+        """
+        Sends several `EmailMessage`s over the same authenticated session.
+
+        Args:
+            messages (list): The messages to send.
+
+        Returns:
+            list: One bool per message, True if it was accepted by the server.
+        """
+        import smtplib
+
+        results = []
+        with self._lock:
+            for message in messages:
+                try:
+                    self._ensure_connected()
+                except Exception as e:
+                    # The server or the credentials are the problem, retrying per message would not help
+                    logger.error("Error connecting to SMTP server %s:%s: %s", self.host, self.port, e)
+                    results.extend([False] * (len(messages) - len(results)))
+                    break
+                try:
+                    self._send_one(message)
+                    results.append(True)
+                except smtplib.SMTPRecipientsRefused as e:
+                    # Only this message is bad, the session is still usable
+                    logger.error("Error sending email to %s: %s", message["To"], e)
+                    results.append(False)
+                except Exception as e:
+                    logger.error("Error sending email to %s: %s", message["To"], e)
+                    self._disconnect()
+                    results.append(False)
+        return results
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def stats(self):
+        return {"connections_opened": self.connections_opened, "messages_sent": self.messages_sent}
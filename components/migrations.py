@@ -0,0 +1,219 @@
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# The base schema every database starts from (migration 1)
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "schema.sql")
+
+# ============================
+# Helpers
+# ============================
+
+def split_statements(script):
+    """Splits an SQL script into complete statements (trigger bodies stay in one piece)."""
+    statements, current = [], ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+def _execute_script(conn, script):
+    """Runs every statement of `script` inside the current transaction (unlike `executescript`, which commits)."""
+    for statement in split_statements(script):
+        conn.execute(statement)
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_column(conn, table, column, definition):
+    """Adds a column unless it exists (databases upgraded before migrations may already have it)."""
+    if column not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+# ============================
+# Migrations
+# ============================
+# Steps are append-only: never edit a released step, add a new one instead.
+# Each step must also cope with databases that got the change from the ad-hoc
+# schema checks that existed before this module.
+
+def _base_schema(conn):
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+        _execute_script(conn, f.read())
+
+
+def _outbox(conn):
+    _execute_script(conn, """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            subject TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            body TEXT NOT NULL,
+            channel TEXT NOT NULL DEFAULT 'email',
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            sent_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+    """)
+    _add_column(conn, "outbox", "channel", "TEXT NOT NULL DEFAULT 'email'")
+
+
+def _stylists_and_time_slots(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stylists (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            active INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+    _add_column(conn, "services", "duration_minutes", "INTEGER NOT NULL DEFAULT 30")
+    _add_column(conn, "appointments", "start_time", "TEXT")
+    _add_column(conn, "appointments", "end_time", "TEXT")
+    _add_column(conn, "appointments", "stylist_id", "INTEGER REFERENCES stylists (id) ON DELETE SET NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_appointments_stylist_date ON appointments (stylist_id, date, start_time)")
+
+
+def _combo_ledger(conn):
+    _execute_script(conn, """
+        CREATE TABLE IF NOT EXISTS combo_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            combo_id INTEGER NOT NULL,
+            customer_id INTEGER NOT NULL,
+            combo_type_id INTEGER,
+            event TEXT NOT NULL CHECK (event IN ('grant', 'redeem', 'refund', 'revoke')),
+            delta INTEGER NOT NULL,
+            balance_after INTEGER NOT NULL,
+            appointment_id INTEGER,
+            note TEXT,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_combo_ledger_customer ON combo_ledger (customer_id, id);
+        CREATE INDEX IF NOT EXISTS idx_combo_ledger_combo ON combo_ledger (combo_id);
+        CREATE TRIGGER IF NOT EXISTS combo_ledger_no_update BEFORE UPDATE ON combo_ledger
+        BEGIN SELECT RAISE(ABORT, 'combo_ledger is append-only'); END;
+        CREATE TRIGGER IF NOT EXISTS combo_ledger_no_delete BEFORE DELETE ON combo_ledger
+        BEGIN SELECT RAISE(ABORT, 'combo_ledger is append-only'); END;
+    """)
+    # Opening balances, so existing combos agree with the ledger from the start
+    conn.execute(
+        """INSERT INTO combo_ledger (combo_id, customer_id, combo_type_id, event, delta, balance_after, note, created_at)
+           SELECT c.id, c.customer_id, c.combo_type_id, 'grant', c.remaining_uses, c.remaining_uses, 'Opening balance', ?
+           FROM combos c
+           WHERE NOT EXISTS (SELECT 1 FROM combo_ledger l WHERE l.combo_id = c.id)""",
+        (time.time(),)
+    )
+
+
+def _reminder_log(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reminder_log (
+            appointment_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            outbox_id INTEGER,
+            queued_at REAL NOT NULL,
+            PRIMARY KEY (appointment_id, date)
+        )
+    """)
+
+
+def _query_indexes(conn):
+    # See benchmarks/query_plans.py for the plans these indexes serve
+    _execute_script(conn, """
+        -- Duplicates of the UNIQUE autoindexes on customers.phone and services.name
+        DROP INDEX IF EXISTS idx_customers_phone;
+        DROP INDEX IF EXISTS idx_services_name;
+
+        -- get_customer_combos: seek on the customer, filter on remaining uses and join
+        -- combo_types without touching the table; replaces the customer_id-only index
+        CREATE INDEX IF NOT EXISTS idx_combos_customer_remaining ON combos (customer_id, remaining_uses, combo_type_id);
+        DROP INDEX IF EXISTS idx_combos_customer_id;
+
+        -- Most appointments use no combo; deleting a combo (ON DELETE SET NULL) looks these up
+        CREATE INDEX IF NOT EXISTS idx_appointments_combo_id ON appointments (combo_id) WHERE combo_id IS NOT NULL;
+
+        -- get_appointment_by_date and get_appointments_in_range: covering, and ordered by (date, id)
+        -- so neither the table nor a temp B-tree is needed; replaces the date-only index
+        CREATE INDEX IF NOT EXISTS idx_appointments_date_covering
+            ON appointments (date, id, customer_id, service_id, combo_id);
+        DROP INDEX IF EXISTS idx_appointments_date;
+
+        -- get_customer_appointments: a customer's history comes out already sorted by date
+        CREATE INDEX IF NOT EXISTS idx_appointments_customer_date ON appointments (customer_id, date);
+        DROP INDEX IF EXISTS idx_appointments_customer_id;
+
+        -- get_reminder_status reads one day of a log that only grows
+        CREATE INDEX IF NOT EXISTS idx_reminder_log_date ON reminder_log (date);
+    """)
+
+
+# (version, description, step); versions are consecutive, starting at 1
+MIGRATIONS = [
+    (1, "Base schema", _base_schema),
+    (2, "Outbound message queue", _outbox),
+    (3, "Stylists and appointment time slots", _stylists_and_time_slots),
+    (4, "Combo usage ledger", _combo_ledger),
+    (5, "Appointment reminder log", _reminder_log),
+    (6, "Covering and partial indexes for the hot queries", _query_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# ============================
+# Runner
+# ============================
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=LATEST_VERSION):
+    """
+    Brings the database up to `target`, one step per transaction.
+
+    The version lives in `PRAGMA user_version`, so a current database costs a single
+    PRAGMA read. Each step runs in BEGIN IMMEDIATE and re-checks the version first,
+    so processes starting at the same time apply every step exactly once. A failing
+    step is rolled back and leaves the database at the previous version.
+
+    Args:
+        conn (sqlite3.Connection): A connection that is not inside a transaction.
+        target (int): The version to migrate to.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    version = get_schema_version(conn)
+    if version >= target:
+        return version
+
+    for number, description, step in MIGRATIONS:
+        if number <= version or number > target:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= number:
+                conn.rollback()  # Another process got here first
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        logger.info("Applied migration %s: %s", number, description)
+    return get_schema_version(conn)
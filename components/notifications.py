@@ -1,20 +1,40 @@
-import smtplib
-import streamlit as st
-import os
-from email.message import EmailMessage
+import html
+import logging
+import threading
 from components.combo import get_customer_combos 
+from components.channels import EmailChannel, FakeSMSTransport, SMSChannel, TwilioTransport
+from components.config import get_bool_setting, get_setting
+from components.email_templates import render_template
+from components.mailer import SMTPSession
+from components.outbox import enqueue_email, enqueue_message, start_outbox_worker
 
-# Load secrets from Streamlit's secrets manager
-SMTP_SERVER = st.secrets["EMAIL_HOST"]  # Fetch from Streamlit secrets
-SMTP_PORT = int(st.secrets["EMAIL_PORT"])  # Convert to int
-EMAIL_ADDRESS = st.secrets["EMAIL_USER"]  # Fetch email user
-EMAIL_PASSWORD = st.secrets["EMAIL_PASS"]  # Fetch email password
+logger = logging.getLogger(__name__)
+
+# SMTP settings (EMAIL_HOST, EMAIL_PORT, EMAIL_USER, EMAIL_PASS, EMAIL_USE_TLS) and the SMS
+# settings are read from the environment, Streamlit secrets or .env when first needed
+DEFAULT_SMTP_PORT = 587
+
+# Placeholders that carry HTML built by this module and must not be escaped
+RAW_PLACEHOLDERS = ("COMBO_TABLE",)
+
+# SMS templates live next to the email templates
+SMS_TEMPLATE_DIR = "sms"
+
+# One authenticated SMTP session shared by every sender in this process
+_smtp_session = None
+_smtp_session_lock = threading.Lock()
+
+# Delivery channels, created on first use
+_sms_channel = None
+_channels_lock = threading.Lock()
 
 
 def load_email_template(template_name, placeholders):
     """
     Loads an email template and replaces placeholders with actual values.
 
+    Values are HTML-escaped, except for the pre-rendered COMBO_TABLE.
+
     Args:
         template_name (str): The name of the email template file.
         placeholders (dict): A dictionary of placeholder keys and values.
@@ -22,16 +42,72 @@ def load_email_template(template_name, placeholders):
     Returns:
         str: The formatted email content.
     """
-    template_path = os.path.join("templates", template_name)
-    try:
-        with open(template_path, "r", encoding="utf-8") as file:
-            template = file.read()
-        for key, value in placeholders.items():
-            template = template.replace(f"{{{{{key}}}}}", str(value))
-        return template
-    except FileNotFoundError:
-        print(f"Error: Email template '{template_name}' not found.")
-        return None
+    email_body = render_template(template_name, placeholders, raw_keys=RAW_PLACEHOLDERS)
+    if email_body is None:
+        logger.warning("Email template '%s' not found.", template_name)
+    return email_body
+
+
+def get_email_settings():
+    """
+    Returns the SMTP settings.
+
+    Returns:
+        dict: "host", "port", "user", "password" and "use_tls" (plain SMTP for local test servers).
+    """
+    return {
+        "host": get_setting("EMAIL_HOST"),
+        "port": int(get_setting("EMAIL_PORT", DEFAULT_SMTP_PORT)),
+        "user": get_setting("EMAIL_USER"),
+        "password": get_setting("EMAIL_PASS"),
+        "use_tls": get_bool_setting("EMAIL_USE_TLS", default=True),
+    }
+
+
+def get_smtp_session():
+    """Returns the process-wide SMTP session, creating it on first use."""
+    global _smtp_session
+    with _smtp_session_lock:
+        if _smtp_session is None:
+            settings = get_email_settings()
+            _smtp_session = SMTPSession(settings["host"], settings["port"], settings["user"], settings["password"],
+                                        use_tls=settings["use_tls"])
+    return _smtp_session
+
+
+def build_email(subject, to_email, email_body):
+    """Builds an HTML `EmailMessage` from the configured sender address."""
+    from email.message import EmailMessage  # The email package is only needed once something is sent
+
+    email = EmailMessage()
+    email["From"] = get_setting("EMAIL_USER")
+    email["To"] = to_email
+    email["Subject"] = subject
+    email.set_content(email_body, subtype="html")  # Send HTML email
+    return email
+
+
+def send_emails(emails):
+    """
+    Sends several emails over one authenticated SMTP session.
+
+    Args:
+        emails (list): A list of (subject, to_email, email_body) tuples.
+
+    Returns:
+        list: One bool per email, True if it was sent successfully.
+    """
+    settings = get_email_settings()
+    if not settings["host"] or not settings["user"] or not settings["password"]:
+        logger.error("Email is not configured (EMAIL_HOST, EMAIL_USER and EMAIL_PASS).")
+        return [False] * len(emails)
+
+    messages = [build_email(subject, to_email, email_body) for subject, to_email, email_body in emails]
+    results = get_smtp_session().send_many(messages)
+    for (subject, to_email, email_body), sent in zip(emails, results):
+        if sent:
+            logger.info("Email sent successfully to %s", to_email)
+    return results
 
 
 def send_email(subject, to_email, email_body):
@@ -46,45 +122,129 @@ def send_email(subject, to_email, email_body):
     Returns:
         bool: True if email is sent successfully, False otherwise.
     """
-    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
-        print("Error: Email credentials not set in environment variables.")
-        return False
+    return send_emails([(subject, to_email, email_body)])[0]
+
+
+def get_sms_channel():
+    """
+    Returns the process-wide SMS channel, or None if SMS is not configured.
+
+    Set SMS_TRANSPORT to "twilio" (with TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN and
+    TWILIO_FROM_NUMBER) or to "fake" to keep messages in memory during development,
+    in the environment, Streamlit secrets or .env.
+    """
+    global _sms_channel
+    with _channels_lock:
+        if _sms_channel is None:
+            transport_name = str(get_setting("SMS_TRANSPORT", "")).lower()
+            if transport_name == "twilio":
+                transport = TwilioTransport(
+                    get_setting("TWILIO_ACCOUNT_SID"), get_setting("TWILIO_AUTH_TOKEN"), get_setting("TWILIO_FROM_NUMBER")
+                )
+            elif transport_name == "fake":
+                transport = FakeSMSTransport()
+            else:
+                return None
+            _sms_channel = SMSChannel(transport)
+        return _sms_channel
+
 
-    try:
-        # Construct the email
-        email = EmailMessage()
-        email["From"] = EMAIL_ADDRESS
-        email["To"] = to_email
-        email["Subject"] = subject
-        email.set_content(email_body, subtype="html")  # Send HTML email
-
-        # Connect to Gmail SMTP Server
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as smtp:
-            smtp.ehlo()  # Identify ourselves to the SMTP server
-            smtp.starttls()  # Secure the connection
-            smtp.login(EMAIL_ADDRESS, EMAIL_PASSWORD)  # Log in
-            smtp.send_message(email)  # Send the email
-
-        print(f"Email sent successfully to {to_email}")
-        return True
-
-    except Exception as e:
-        print(f"Error sending email: {e}")
+def get_channel_senders():
+    """Maps each configured channel name to its batch sender, for the outbox worker."""
+    senders = {"email": EmailChannel(send_emails).send_many}
+    sms_channel = get_sms_channel()
+    if sms_channel is not None:
+        senders["sms"] = sms_channel.send_many
+    return senders
+
+
+def start_email_worker():
+    """Starts the background worker that sends queued emails and SMS (safe to call on every rerun)."""
+    return start_outbox_worker(get_channel_senders())
+
+
+def queue_email(subject, to_email, email_body):
+    """
+    Queues an email for the background worker instead of sending it inline.
+
+    Args:
+        subject (str): The email subject.
+        to_email (str): The recipient's email address.
+        email_body (str): The email body (HTML format).
+
+    Returns:
+        bool: True if the email was queued, False otherwise.
+    """
+    message_id = enqueue_email(subject, to_email, email_body)
+    start_email_worker()
+    return message_id is not None
+
+
+def queue_sms(to_phone, text):
+    """
+    Queues an SMS for the background worker.
+
+    Args:
+        to_phone (str): The recipient's phone number.
+        text (str): The message text.
+
+    Returns:
+        bool: True if the SMS was queued, False otherwise (e.g. SMS is not configured).
+    """
+    if get_sms_channel() is None:
+        logger.warning("SMS is not configured, cannot notify %s.", to_phone)
         return False
+    message_id = enqueue_message("sms", to_phone, text)
+    start_email_worker()
+    return message_id is not None
+
 
+def load_sms_template(template_name, placeholders):
+    """Renders a plain-text SMS template (values are not HTML-escaped)."""
+    text = render_template(f"{SMS_TEMPLATE_DIR}/{template_name}", placeholders, raw_keys=placeholders.keys())
+    if text is None:
+        logger.warning("SMS template '%s' not found.", template_name)
+    return text.strip() if text else text
 
-def format_combo_table(customer_id):
+
+def notify_customer(customer_email, customer_phone, subject, template_name, placeholders):
     """
-    Fetches the customer's combos and formats them as an HTML table.
+    Queues an email, or an SMS when the customer has no email address.
+
+    Args:
+        customer_email (str): The customer's email address, may be empty.
+        customer_phone (str): The customer's phone number, used as the fallback.
+        subject (str): The email subject.
+        template_name (str): The template name without extension; the email uses
+            `<name>.html` and the SMS `sms/<name>.txt`.
+        placeholders (dict): Placeholder values, including COMBO_TABLE for the email.
+
+    Returns:
+        bool: True if a message was queued.
+    """
+    if customer_email:
+        email_body = load_email_template(f"{template_name}.html", placeholders)
+        return bool(email_body) and queue_email(subject, customer_email, email_body)
+    if customer_phone:
+        text = load_sms_template(f"{template_name}.txt", placeholders)
+        return bool(text) and queue_sms(customer_phone, text)
+    return False
+
+
+def format_combo_table(customer_id, combos=None):
+    """
+    Formats the customer's combos as an HTML table.
 
     Args:
         customer_id (int): The ID of the customer.
-        booked_combo_id (int, optional): The ID of the combo used for booking. Default is None.
+        combos (list, optional): The customer's active combos, if the caller already has them.
+            Fetched from the database when omitted.
 
     Returns:
         str: Formatted HTML table of customer's combos.
     """
-    combos = get_customer_combos(customer_id)
+    if combos is None:
+        combos = get_customer_combos(customer_id)
     if not combos:
         return "No active combos"
 
@@ -99,7 +259,7 @@ def format_combo_table(customer_id):
     for combo in combos:
         table_html += f"""
         <tr>
-            <td>{combo["name"]}</td>
+            <td>{html.escape(combo["name"])}</td>
             <td>{combo["remaining_uses"]}</td>
         </tr>
         """
@@ -108,43 +268,21 @@ def format_combo_table(customer_id):
     return table_html
 
 
-def send_appointment_confirmation(customer_id, customer_name, customer_email, service, date, booked_combo_id):
+def send_appointment_confirmation(customer_id, customer_name, customer_email, service, date, combos=None, customer_phone=None):
     """
-    Sends an appointment confirmation email to the customer.
+    Sends an appointment confirmation email to the customer, or an SMS if they have no email.
 
     Args:
+        customer_id (int): The customer's ID.
         customer_name (str): The customer's name.
         customer_email (str): The customer's email address.
         service (str): The booked service.
         date (str): The appointment date (YYYY-MM-DD).
-        remaining_uses (int): The remaining uses in the combo.
+        combos (list, optional): The customer's combos after booking (e.g. `book_appointment(...)["Combos"]`).
+            Fetched from the database when omitted.
+        customer_phone (str, optional): The customer's phone number, for the SMS fallback.
     """
-    combos = get_customer_combos(customer_id)
-
-    #Apply -1 for remaining uses due to email error (lazy way, need to work in future)
-    for combo in combos:
-        if combo["id"] == booked_combo_id:
-            combo["remaining_uses"] -= 1
-
-    # #Generate Table with updated values
-    # combo_table = """
-    # <table border = "1" cellpadding = "5" cellspacing = "0">
-    #     <tr>
-    #         <th>Combo Name</th>
-    #         <th>Remaining Uses</th>
-    #     </tr>
-    # """
-    # for combo in combos:
-    #     combo_table += f"""
-    #     <tr>
-    #         <td>{combo["name"]}</td>
-    #         <td>{combo["remaining_uses"]}</td>
-    #     </tr>
-    #     """
-    # combo_table += "</table>"
-
-    #get latest combo data
-    combo_table = format_combo_table(customer_id)
+    combo_table = format_combo_table(customer_id, combos) if customer_email else ""
 
     placeholders = {
         "CUSTOMER_NAME": customer_name,
@@ -152,24 +290,25 @@ def send_appointment_confirmation(customer_id, customer_name, customer_email, se
         "DATE": date,
         "COMBO_TABLE": combo_table #insert the table into the email
     }
-    email_body = load_email_template("appointment_confirmation.html", placeholders)
-    if email_body:
-        send_email("Appointment Confirmation - Ani's Threading & Skincare", customer_email, email_body)
+    notify_customer(customer_email, customer_phone, "Appointment Confirmation - Ani's Threading & Skincare",
+                    "appointment_confirmation", placeholders)
 
 
-def send_appointment_cancellation(customer_id, customer_name, customer_email, service, date):
+def send_appointment_cancellation(customer_id, customer_name, customer_email, service, date, combos=None, customer_phone=None):
     """
-    Sends an appointment cancellation email to the customer.
+    Sends an appointment cancellation email to the customer, or an SMS if they have no email.
 
     Args:
+        customer_id (int): The customer's ID.
         customer_name (str): The customer's name.
         customer_email (str): The customer's email address.
         service (str): The cancelled service.
         date (str): The appointment date (YYYY-MM-DD).
-        remaining_uses (int): The restored combo uses.
+        combos (list, optional): The customer's combos after the cancellation.
+            Fetched from the database when omitted.
+        customer_phone (str, optional): The customer's phone number, for the SMS fallback.
     """
-    #get latest combo data
-    combo_table = format_combo_table(customer_id)
+    combo_table = format_combo_table(customer_id, combos) if customer_email else ""
 
     placeholders = {
         "CUSTOMER_NAME": customer_name,
@@ -177,6 +316,5 @@ def send_appointment_cancellation(customer_id, customer_name, customer_email, se
         "DATE": date,
         "COMBO_TABLE": combo_table #insert table in to email
     }
-    email_body = load_email_template("appointment_cancellation.html", placeholders)
-    if email_body:
-        send_email("Appointment Cancellation - Ani's Threading & Skincare", customer_email, email_body)
+    notify_customer(customer_email, customer_phone, "Appointment Cancellation - Ani's Threading & Skincare",
+                    "appointment_cancellation", placeholders)
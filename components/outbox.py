@@ -0,0 +1,215 @@
+import logging
+import threading
+import time
+from components.db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Worker tuning
+POLL_INTERVAL = 5        # Seconds between outbox checks when nothing wakes the worker
+BATCH_SIZE = 20          # Messages claimed per drain
+MAX_ATTEMPTS = 5         # Attempts before a message is marked as failed
+BASE_BACKOFF = 30        # Seconds before the first retry, doubled after each failure
+MAX_BACKOFF = 60 * 60    # Never wait more than an hour between retries
+
+# ============================
+# Outbox Storage
+# ============================
+
+def enqueue_message(channel, recipient, body, subject=None):
+    """
+    Stores a message in the outbox so the background worker can send it.
+
+    Args:
+        channel (str): The delivery channel, "email" or "sms".
+        recipient (str): The email address or phone number, depending on the channel.
+        body (str): The email body (HTML format) or the SMS text.
+        subject (str, optional): The email subject; channels without one ignore it.
+
+    Returns:
+        int: The outbox message ID, or None if it could not be queued.
+    """
+    with get_db_connection() as conn:
+        try:
+            message_id = enqueue_message_in_transaction(conn, channel, recipient, body, subject)
+            conn.commit()
+        except Exception as e:
+            logger.error("Error queueing %s message to %s: %s", channel, recipient, e)
+            return None
+
+    if _worker is not None:
+        _worker.wake()
+    return message_id
+
+
+def enqueue_email(subject, to_email, email_body):
+    """Queues an email; see `enqueue_message`."""
+    return enqueue_message("email", to_email, email_body, subject)
+
+
+def enqueue_message_in_transaction(conn, channel, recipient, body, subject=None):
+    """
+    Stores a message in the outbox as part of the caller's transaction, so it is queued
+    if and only if the caller's other writes commit. Call `wake_outbox_worker` after committing.
+
+    Returns:
+        int: The outbox message ID.
+    """
+    now = time.time()
+    return conn.execute(
+        "INSERT INTO outbox (subject, recipient, body, channel, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (subject or "", recipient, body, channel, now, now)  # The column predates SMS and is NOT NULL
+    ).lastrowid
+
+
+def wake_outbox_worker():
+    """Tells a running worker that new messages are waiting."""
+    if _worker is not None:
+        _worker.wake()
+
+
+def _claim_due_messages(conn, limit):
+    """Marks up to `limit` due messages as 'sending' and returns them."""
+    cursor = conn.execute(
+        """UPDATE outbox SET status = 'sending'
+           WHERE id IN (
+               SELECT id FROM outbox
+               WHERE status = 'pending' AND next_attempt_at <= ?
+               ORDER BY next_attempt_at, id
+               LIMIT ?
+           )
+           RETURNING id, subject, recipient, body, channel, attempts""",
+        (time.time(), limit)
+    )
+    messages = cursor.fetchall()
+    conn.commit()
+    return messages
+
+
+def _mark_sent(conn, message_id):
+    conn.execute("UPDATE outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?",
+                 (time.time(), message_id))
+
+
+def _mark_failed_attempt(conn, message, error):
+    """Schedules a retry with exponential backoff, or gives up after MAX_ATTEMPTS."""
+    attempts = message["attempts"] + 1
+    if attempts >= MAX_ATTEMPTS:
+        status, next_attempt_at = "failed", time.time()
+    else:
+        status = "pending"
+        next_attempt_at = time.time() + min(BASE_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF)
+    conn.execute(
+        "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+        (status, attempts, next_attempt_at, error, message["id"])
+    )
+
+
+def get_outbox_counts():
+    """Returns the number of outbox messages per status."""
+    with get_db_connection() as conn:
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) AS total FROM outbox GROUP BY status").fetchall()
+            return {row["status"]: row["total"] for row in rows}
+        except Exception as e:
+            logger.error("Error reading outbox: %s", e)
+            return {}
+
+# ============================
+# Background Worker
+# ============================
+
+class OutboxWorker(threading.Thread):
+    """
+    Daemon thread that drains the outbox, retrying failed sends with backoff.
+
+    Args:
+        senders (dict): Channel name mapped to `send_batch([(subject, recipient, body), ...])`,
+            which returns one bool per message, True on success. A single callable is taken
+            as the "email" sender. Each claimed batch is handed over per channel at once, so
+            emails can go out over a single SMTP session.
+    """
+
+    def __init__(self, senders, poll_interval=POLL_INTERVAL, batch_size=BATCH_SIZE):
+        super().__init__(name="outbox-worker", daemon=True)
+        self.senders = senders if isinstance(senders, dict) else {"email": senders}
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+
+    def wake(self):
+        """Asks the worker to check the outbox now instead of waiting for the next poll."""
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def recover(self):
+        """Puts messages left in 'sending' by a previous process back in the queue."""
+        with get_db_connection() as conn:
+            conn.execute("UPDATE outbox SET status = 'pending' WHERE status = 'sending'")
+            conn.commit()
+
+    def drain_once(self):
+        """Sends every message that is currently due. Returns the number of messages processed."""
+        processed = 0
+        while not self._stop_event.is_set():
+            with get_db_connection() as conn:
+                messages = _claim_due_messages(conn, self.batch_size)
+            if not messages:
+                break
+
+            # Send without holding a pooled connection, SMTP and SMS APIs can be slow
+            results = []
+            for channel in dict.fromkeys(m["channel"] for m in messages):
+                batch = [m for m in messages if m["channel"] == channel]
+                send_batch = self.senders.get(channel)
+                if send_batch is None:
+                    outcomes, error = [False] * len(batch), f"No sender for channel '{channel}'"
+                else:
+                    try:
+                        outcomes = send_batch([(m["subject"], m["recipient"], m["body"]) for m in batch])
+                        error = "Sender reported failure"
+                    except Exception as e:
+                        outcomes, error = [False] * len(batch), str(e)
+                results.extend((message, sent, error) for message, sent in zip(batch, outcomes))
+
+            with get_db_connection() as conn:
+                for message, sent, error in results:
+                    if sent:
+                        _mark_sent(conn, message["id"])
+                    else:
+                        _mark_failed_attempt(conn, message, error)
+                conn.commit()
+            processed += len(messages)
+        return processed
+
+    def run(self):
+        try:
+            self.recover()
+        except Exception as e:
+            logger.error("Error recovering outbox: %s", e)
+
+        while not self._stop_event.is_set():
+            try:
+                self.drain_once()
+            except Exception as e:
+                logger.error("Error draining outbox: %s", e)
+            self._wake_event.wait(self.poll_interval)
+            self._wake_event.clear()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_outbox_worker(senders):
+    """Starts the process-wide outbox worker if it is not running yet (see `OutboxWorker` for `senders`)."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = OutboxWorker(senders)
+            _worker.start()
+    return _worker
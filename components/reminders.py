@@ -0,0 +1,170 @@
+import datetime
+import logging
+import threading
+import time
+from components.db import get_db_connection, immediate_transaction
+from components.email_templates import render_template
+from components.outbox import enqueue_message_in_transaction, wake_outbox_worker
+from components.schedule import CLOSING_TIME, OPENING_TIME
+
+logger = logging.getLogger(__name__)
+
+# Scheduler tuning
+REMINDER_SEND_TIME = "09:00"      # Reminders for tomorrow go out from this time of day on
+REMINDER_CHECK_INTERVAL = 15 * 60  # Seconds between checks (also catches same-evening bookings)
+REMINDER_BATCH_SIZE = 100          # Reminders queued per transaction
+
+REMINDER_TEMPLATE = "appointment_reminder.html"
+REMINDER_SMS_TEMPLATE = "sms/appointment_reminder.txt"
+REMINDER_SUBJECT = "Appointment Reminder - Ani's Threading & Skincare"
+
+# ============================
+# Queueing Reminders
+# ============================
+
+def _fetch_due_reminders(conn, date, limit, sms_enabled):
+    """
+    Appointments on `date` that were not reminded yet and whose customer can be reached
+    (by email, or by phone when SMS is enabled), in one query on `idx_appointments_date_covering`.
+    Moving an appointment to another day makes it due again.
+    """
+    reachable = "c.email != ''" + (" OR c.phone != ''" if sms_enabled else "")
+    return conn.execute(
+        f"""SELECT a.id, a.date, a.start_time, c.name, COALESCE(c.email, '') AS email, c.phone, s.name AS service
+            FROM appointments a
+            JOIN customers c ON c.id = a.customer_id
+            JOIN services s ON s.id = a.service_id
+            LEFT JOIN reminder_log r ON r.appointment_id = a.id AND r.date = a.date
+            WHERE a.date = ? AND ({reachable}) AND r.appointment_id IS NULL
+            ORDER BY a.id
+            LIMIT ?""",
+        (date, limit)
+    ).fetchall()
+
+
+def render_reminder(appointment):
+    """
+    Renders the reminder for one appointment row.
+
+    Returns:
+        tuple: (channel, recipient, body). Customers without an email get an SMS.
+    """
+    placeholders = {
+        "CUSTOMER_NAME": appointment["name"],
+        "SERVICE": appointment["service"],
+        "DATE": appointment["date"],
+        "TIME": appointment["start_time"] or f"Any time between {OPENING_TIME} and {CLOSING_TIME}",
+    }
+    if appointment["email"]:
+        return "email", appointment["email"], render_template(REMINDER_TEMPLATE, placeholders)
+    text = render_template(REMINDER_SMS_TEMPLATE, placeholders, raw_keys=placeholders.keys())
+    return "sms", appointment["phone"], text.strip() if text else text
+
+
+def queue_reminders(date, batch_size=REMINDER_BATCH_SIZE, sms_enabled=False):
+    """
+    Queues a reminder for every appointment on `date` that has not had one yet.
+
+    Each batch is logged in `reminder_log` and written to the outbox in the same
+    transaction, so a restart never queues a reminder twice and never loses one.
+    The outbox worker then delivers them in batches over its shared SMTP session.
+
+    Args:
+        date (str): The appointment date in 'YYYY-MM-DD' format.
+        batch_size (int): Reminders queued per transaction.
+        sms_enabled (bool): Remind customers without an email by SMS.
+
+    Returns:
+        int: The number of reminders queued.
+    """
+    queued = 0
+    with get_db_connection() as conn:
+        while True:
+            with immediate_transaction(conn):
+                appointments = _fetch_due_reminders(conn, date, batch_size, sms_enabled)
+                for appointment in appointments:
+                    channel, recipient, body = render_reminder(appointment)
+                    if body is None:
+                        raise FileNotFoundError(f"Reminder template for {channel} not found.")
+                    outbox_id = enqueue_message_in_transaction(conn, channel, recipient, body, REMINDER_SUBJECT)
+                    conn.execute(
+                        "INSERT INTO reminder_log (appointment_id, date, recipient, outbox_id, queued_at) VALUES (?, ?, ?, ?, ?)",
+                        (appointment["id"], appointment["date"], recipient, outbox_id, time.time())
+                    )
+            queued += len(appointments)
+            if len(appointments) < batch_size:
+                break
+
+    if queued:
+        wake_outbox_worker()
+        logger.info("Queued %s reminders for %s.", queued, date)
+    return queued
+
+
+def get_reminder_status(date):
+    """Returns how many reminders for `date` are queued, sent and failed (from the outbox)."""
+    with get_db_connection() as conn:
+        try:
+            rows = conn.execute(
+                """SELECT COALESCE(o.status, 'unknown') AS status, COUNT(*) AS total
+                   FROM reminder_log r LEFT JOIN outbox o ON o.id = r.outbox_id
+                   WHERE r.date = ?
+                   GROUP BY 1""",
+                (date,)
+            ).fetchall()
+            return {row["status"]: row["total"] for row in rows}
+        except Exception as e:
+            logger.error("Error reading reminder status: %s", e)
+            return {}
+
+# ============================
+# Scheduler
+# ============================
+
+class ReminderScheduler(threading.Thread):
+    """
+    Daemon thread that queues the next day's reminders.
+
+    From REMINDER_SEND_TIME on it checks every `interval` seconds, so bookings made
+    later in the day still get a reminder. The sent log makes every check idempotent.
+    """
+
+    def __init__(self, interval=REMINDER_CHECK_INTERVAL, send_time=REMINDER_SEND_TIME, sms_enabled=False):
+        super().__init__(name="reminder-scheduler", daemon=True)
+        self.interval = interval
+        self.sms_enabled = sms_enabled
+        self.send_time = datetime.time.fromisoformat(send_time)
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run_once(self, now=None):
+        """Queues tomorrow's reminders if it is past the send time. Returns the number queued."""
+        now = now or datetime.datetime.now()
+        if now.time() < self.send_time:
+            return 0
+        tomorrow = (now.date() + datetime.timedelta(days=1)).isoformat()
+        return queue_reminders(tomorrow, sms_enabled=self.sms_enabled)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Error queueing reminders: %s", e)
+            self._stop_event.wait(self.interval)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_reminder_scheduler(interval=REMINDER_CHECK_INTERVAL, send_time=REMINDER_SEND_TIME, sms_enabled=False):
+    """Starts the process-wide reminder scheduler if it is not running yet."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            _scheduler = ReminderScheduler(interval, send_time, sms_enabled)
+            _scheduler.start()
+        return _scheduler
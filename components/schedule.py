@@ -0,0 +1,271 @@
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from components.db import get_db_connection, register_reset_hook
+
+logger = logging.getLogger(__name__)
+
+# Salon hours and booking granularity
+OPENING_TIME = "10:00"
+CLOSING_TIME = "19:00"
+SLOT_STEP_MINUTES = 15
+DEFAULT_SERVICE_DURATION = 30
+
+# ============================
+# Time Helpers
+# ============================
+
+def to_minutes(time_text):
+    """Converts 'HH:MM' to minutes after midnight."""
+    hours, minutes = time_text.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def to_time_text(minutes):
+    """Converts minutes after midnight to 'HH:MM'."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+# ============================
+# Interval Index
+# ============================
+
+class DayIntervalIndex:
+    """
+    The booked intervals of one stylist on one day, kept sorted by start time.
+
+    Booked intervals never overlap, so both the starts and the ends are sorted and
+    a conflict check only has to look at the neighbours found by binary search.
+    """
+
+    def __init__(self, intervals=()):
+        self._starts = []
+        self._ends = []
+        self._ids = []
+        for start, end, appointment_id in sorted(intervals):
+            self._starts.append(start)
+            self._ends.append(end)
+            self._ids.append(appointment_id)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def conflicts(self, start, end):
+        """Returns True if [start, end) overlaps a booked interval. O(log n)."""
+        i = bisect_right(self._starts, start)
+        if i > 0 and self._ends[i - 1] > start:
+            return True
+        return i < len(self._starts) and self._starts[i] < end
+
+    def add(self, start, end, appointment_id):
+        """Inserts a booked interval. Raises ValueError if it overlaps an existing one."""
+        if self.conflicts(start, end):
+            raise ValueError(f"{to_time_text(start)}-{to_time_text(end)} overlaps an existing booking.")
+        i = bisect_left(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._ids.insert(i, appointment_id)
+
+    def remove(self, appointment_id):
+        if appointment_id in self._ids:
+            i = self._ids.index(appointment_id)
+            del self._starts[i], self._ends[i], self._ids[i]
+
+    def free_slots(self, duration, opening, closing, step=SLOT_STEP_MINUTES):
+        """Returns every start time (in minutes) on the `step` grid where `duration` minutes fit."""
+        slots = []
+        gap_start = opening
+        for start, end in zip(self._starts + [closing], self._ends + [closing]):
+            gap_end = min(start, closing)
+            # First grid point inside the gap
+            t = -(-gap_start // step) * step
+            while t + duration <= gap_end:
+                slots.append(t)
+                t += step
+            gap_start = max(gap_start, end)
+            if gap_start >= closing:
+                break
+        return slots
+
+
+class ScheduleIndex:
+    """
+    Process-wide cache of DayIntervalIndex objects keyed by (stylist_id, date), loaded on demand.
+
+    Only reads (`has_conflict`, `find_free_slots`) are served from the cache; a booking
+    reloads its day inside the write transaction, see `reserve_slot`.
+    """
+
+    def __init__(self):
+        self._days = {}
+        self._lock = threading.RLock()
+
+    def load(self, conn, stylist_id, date):
+        """(Re)loads one stylist's day from the database and returns its index."""
+        rows = conn.execute(
+            """SELECT id, start_time, end_time FROM appointments
+               WHERE stylist_id = ? AND date = ? AND start_time IS NOT NULL""",
+            (stylist_id, date)
+        ).fetchall()
+        index = DayIntervalIndex(
+            (to_minutes(row["start_time"]), to_minutes(row["end_time"]), row["id"]) for row in rows
+        )
+        with self._lock:
+            self._days[(stylist_id, date)] = index
+        return index
+
+    def get(self, conn, stylist_id, date):
+        with self._lock:
+            index = self._days.get((stylist_id, date))
+        return index if index is not None else self.load(conn, stylist_id, date)
+
+    def record(self, stylist_id, date, start, end, appointment_id):
+        """Adds a booking to the day's index if that day is cached."""
+        with self._lock:
+            index = self._days.get((stylist_id, date))
+            if index is not None:
+                try:
+                    index.add(start, end, appointment_id)
+                except ValueError:
+                    # Out of sync with the database, reload on next use
+                    del self._days[(stylist_id, date)]
+
+    def discard(self, stylist_id, date, appointment_id):
+        """Removes a booking from the day's index if that day is cached."""
+        with self._lock:
+            index = self._days.get((stylist_id, date))
+            if index is not None:
+                index.remove(appointment_id)
+
+    def forget(self, stylist_id=None, date=None):
+        """Drops a cached day, or everything when called without arguments."""
+        with self._lock:
+            if stylist_id is None:
+                self._days.clear()
+            else:
+                self._days.pop((stylist_id, date), None)
+
+
+schedule_index = ScheduleIndex()
+
+
+def _reset_schedule_state():
+    """Forgets the cached days after the database was replaced."""
+    schedule_index.forget()
+
+
+register_reset_hook(_reset_schedule_state)
+
+# ============================
+# Scheduling API
+# ============================
+
+def get_service_duration(conn, service_id):
+    row = conn.execute("SELECT duration_minutes FROM services WHERE id = ?", (service_id,)).fetchone()
+    return row["duration_minutes"] if row and row["duration_minutes"] else DEFAULT_SERVICE_DURATION
+
+
+def reserve_slot(conn, stylist_id, date, start_time, service_id):
+    """
+    Checks a slot against the stylist's bookings inside the caller's write transaction.
+
+    The day is reloaded from the database first, so the check also sees bookings made
+    by other processes (e.g. the import CLI) that this process's cache can't know about.
+    That costs one indexed read of the stylist's bookings for the day per booking; the
+    cached index saves the reads of the form, which checks slots far more often than it books.
+    Call `commit_slot` with the new appointment ID once it is committed.
+
+    Returns:
+        tuple: (start_minutes, end_minutes), or None if the slot conflicts or is outside opening hours.
+    """
+    start = to_minutes(start_time)
+    end = start + get_service_duration(conn, service_id)
+    if start < to_minutes(OPENING_TIME) or end > to_minutes(CLOSING_TIME):
+        return None
+    index = schedule_index.load(conn, stylist_id, date)
+    if index.conflicts(start, end):
+        return None
+    return start, end
+
+
+def commit_slot(stylist_id, date, start, end, appointment_id):
+    """Records a committed booking in the in-memory index."""
+    schedule_index.record(stylist_id, date, start, end, appointment_id)
+
+
+def release_slot(stylist_id, date, appointment_id):
+    """Removes a deleted booking from the in-memory index."""
+    schedule_index.discard(stylist_id, date, appointment_id)
+
+
+def has_conflict(stylist_id, date, start_time, service_id):
+    """Returns True if booking `service_id` at `start_time` would overlap the stylist's bookings."""
+    with get_db_connection() as conn:
+        try:
+            start = to_minutes(start_time)
+            end = start + get_service_duration(conn, service_id)
+            return schedule_index.get(conn, stylist_id, date).conflicts(start, end)
+        except Exception as e:
+            logger.error("Error checking schedule conflict: %s", e)
+            return True
+
+
+def find_free_slots(stylist_id, date, service_id):
+    """
+    Lists the start times ('HH:MM') at which the service fits into the stylist's day.
+
+    Args:
+        stylist_id (int): The stylist.
+        date (str): The date in 'YYYY-MM-DD' format.
+        service_id (int): The service to book (its duration decides the slot length).
+
+    Returns:
+        list: Free start times, earliest first.
+    """
+    with get_db_connection() as conn:
+        try:
+            duration = get_service_duration(conn, service_id)
+            index = schedule_index.get(conn, stylist_id, date)
+            slots = index.free_slots(duration, to_minutes(OPENING_TIME), to_minutes(CLOSING_TIME))
+            return [to_time_text(slot) for slot in slots]
+        except Exception as e:
+            logger.error("Error finding free slots: %s", e)
+            return []
+
+# ============================
+# Stylist Management
+# ============================
+
+def add_stylist(name):
+    """Adds a new stylist."""
+    with get_db_connection() as conn:
+        try:
+            conn.execute("INSERT INTO stylists (name) VALUES (?)", (name,))
+            conn.commit()
+            logger.info("Stylist '%s' added successfully!", name)
+            return True
+        except Exception as e:
+            logger.error("Error adding stylist: %s", e)
+            return False
+
+
+def get_stylists():
+    """Retrieves all active stylists."""
+    with get_db_connection() as conn:
+        try:
+            rows = conn.execute("SELECT id, name FROM stylists WHERE active = 1 ORDER BY name").fetchall()
+            return [{"id": row["id"], "name": row["name"]} for row in rows]
+        except Exception as e:
+            logger.error("Error retrieving stylists: %s", e)
+            return []
+
+
+def set_service_duration(service_id, duration_minutes):
+    """Sets how long a service takes, which decides the length of its time slots."""
+    with get_db_connection() as conn:
+        try:
+            conn.execute("UPDATE services SET duration_minutes = ? WHERE id = ?", (duration_minutes, service_id))
+            conn.commit()
+            return True
+        except Exception as e:
+            logger.error("Error updating service duration: %s", e)
+            return False
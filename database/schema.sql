@@ -1,3 +1,6 @@
+-- Base schema, applied as migration 1 by components/migrations.py.
+-- Later schema changes are numbered migrations there; don't add them here.
+
 -- ============================
 -- Customers Table
 -- ============================
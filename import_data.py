@@ -0,0 +1,31 @@
+import argparse
+import sys
+from components.bulk_import import IMPORT_CHUNK_SIZE, import_file
+from components.log import configure_logging
+
+parser = argparse.ArgumentParser(description="Bulk import customers or historical appointments from a CSV or Excel (.xlsx) file.")
+parser.add_argument("kind", choices=["customers", "appointments"])
+parser.add_argument("path", help="CSV or XLSX file")
+parser.add_argument("--rejected", default=None, help="Write rejected rows to this CSV file")
+parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Rows per transaction")
+args = parser.parse_args()
+
+configure_logging()
+
+result = import_file(
+    args.kind, args.path, args.path, chunk_size=args.chunk_size,
+    progress=lambda read, inserted: print(f"{read} rows read, {inserted} imported", flush=True)
+)
+if result.error:
+    print(f"Import failed after {result.rows_read} rows: {result.error}", file=sys.stderr)
+    sys.exit(1)
+
+print(f"Import finished: {result.summary()}")
+if result.rejected:
+    if args.rejected:
+        with open(args.rejected, "wb") as f:
+            f.write(result.rejected_csv())
+        print(f"Rejected rows written to {args.rejected}")
+    else:
+        for row in result.rejected[:20]:
+            print(f"  row {row['row']}: {row['reason']}")
@@ -1,9 +1,15 @@
 import sqlite3
+from components.log import configure_logging
+from components.migrations import migrate
 
 DB_PATH = "database/business.db"
 
-with sqlite3.connect(DB_PATH) as conn:
-    with open("database/schema.sql", "r") as f:
-        conn.executescript(f.read())
+configure_logging(level="INFO")  # List the migrations as they are applied
 
-print("Database schema initialized successfully!")
\ No newline at end of file
+conn = sqlite3.connect(DB_PATH)
+try:
+    version = migrate(conn)
+finally:
+    conn.close()
+
+print(f"Database schema initialized successfully (version {version})!")
@@ -0,0 +1,96 @@
+import socket
+import threading
+
+import pytest
+
+from components import db
+
+# ============================
+# Database
+# ============================
+
+@pytest.fixture
+def database(tmp_path):
+    """Points the connection pool at a fresh, fully migrated database for one test."""
+    path = str(tmp_path / "business.db")
+    db.configure_pool(path)
+    db.notify_database_replaced()  # Drop catalog and lookup caches filled by earlier tests
+    yield path
+    db.configure_pool(db.DB_PATH)
+    db.notify_database_replaced()
+
+# ============================
+# Local SMTP Server
+# ============================
+
+class SMTPRecorder:
+    """aiosmtpd handler and authenticator that records logins and accepted messages."""
+
+    def __init__(self):
+        self.messages = []
+        self._login_sessions = set()  # smtplib tries every offered mechanism before giving up
+        self.reject_login = False
+        self.refused_recipients = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, server, session, envelope, mechanism, auth_data):
+        from aiosmtpd.smtp import AuthResult
+
+        with self._lock:
+            self._login_sessions.add(session)
+        return AuthResult(success=not self.reject_login, handled=False)  # Let the server answer 235/535
+
+    @property
+    def logins(self):
+        """Connections that attempted to log in."""
+        return len(self._login_sessions)
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused_recipients:
+            return "550 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """A local SMTP server with AUTH (no TLS). Yields (host, port, recorder)."""
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+    recorder = SMTPRecorder()
+    controller = controller_module.Controller(
+        recorder, hostname="127.0.0.1", port=_free_port(),
+        authenticator=recorder, auth_require_tls=False,
+    )
+    controller.start()
+    try:
+        yield controller.hostname, controller.port, recorder
+    finally:
+        controller.stop()
+
+
+@pytest.fixture
+def email_settings(smtp_server, monkeypatch):
+    """Points components.notifications at the local SMTP server. Yields the server's recorder."""
+    from components import config, notifications
+
+    host, port, recorder = smtp_server
+    for name, value in {"EMAIL_HOST": host, "EMAIL_PORT": str(port), "EMAIL_USER": "salon@example.com",
+                        "EMAIL_PASS": "secret", "EMAIL_USE_TLS": "false"}.items():
+        monkeypatch.setenv(name, value)
+    config.reload_settings()
+    monkeypatch.setattr(notifications, "_smtp_session", None)
+    yield recorder
+    if notifications._smtp_session is not None:
+        notifications._smtp_session.close()
+    config.reload_settings()
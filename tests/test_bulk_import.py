@@ -0,0 +1,43 @@
+import io
+
+import pytest
+
+from components.bulk_import import import_file
+from components.customer import get_customer_by_phone
+
+CUSTOMERS_CSV = (
+    "Name,Phone,Email,Combo\n"
+    "Ana Rao,555-000-0001,ana@example.com,\n"
+    "Bad Email,555-000-0002,not-an-email,\n"
+    "Ana Again,555-000-0001,,\n"
+)
+
+
+def test_csv_import_rejects_bad_rows(database):
+    result = import_file("customers", io.BytesIO(CUSTOMERS_CSV.encode()), "customers.csv")
+
+    assert result.error is None
+    assert result.summary() == {"rows_read": 3, "inserted": 1, "combos_added": 0, "rejected": 2}
+    assert [row["reason"] for row in result.rejected] == ["Invalid email", "Duplicate phone"]
+    assert get_customer_by_phone("555-000-0001")["Name"] == "Ana Rao"
+
+
+def test_xlsx_import(database):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("openpyxl")
+    workbook = io.BytesIO()
+    pd.DataFrame({"name": ["Ana Rao"], "phone": ["555-000-0001"]}).to_excel(workbook, index=False)
+    workbook.seek(0)
+
+    result = import_file("customers", workbook, "customers.xlsx")
+
+    assert result.error is None
+    assert result.inserted == 1
+
+
+def test_failures_report_the_reason(database):
+    missing_column = import_file("customers", io.BytesIO(b"name\nAna\n"), "customers.csv")
+    assert missing_column.error == "Missing required column(s): phone"
+
+    legacy_excel = import_file("customers", io.BytesIO(b""), "customers.xls")
+    assert "Unsupported file type '.xls'" in legacy_excel.error
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+
+import pytest
+
+from components import notifications
+from components.channels import SMS_MAX_LENGTH, FakeSMSTransport, SMSChannel, TokenBucket
+from components.db import get_db_connection
+from components.outbox import OutboxWorker
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SlowTransport(FakeSMSTransport):
+    """Fake transport that takes a while per message and records how many sends overlap."""
+
+    def __init__(self, delay=0.05, fail_for=()):
+        super().__init__()
+        self.delay = delay
+        self.fail_for = set(fail_for)
+        self.active = 0
+        self.max_active = 0
+        self._active_lock = threading.Lock()
+
+    def send(self, to_number, text):
+        with self._active_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if to_number in self.fail_for:
+                raise RuntimeError("Provider rejected the number")
+            super().send(to_number, text)
+        finally:
+            with self._active_lock:
+                self.active -= 1
+
+# ============================
+# Rate Limiting
+# ============================
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=20, capacity=5)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    burst = time.monotonic() - start
+    for _ in range(4):
+        bucket.acquire()
+    paced = time.monotonic() - start - burst
+
+    assert burst < 0.05
+    assert paced >= 4 / 20 * 0.9
+    assert not bucket.acquire(timeout=0)
+
+
+def test_sms_channel_throttles_bursts():
+    channel = SMSChannel(FakeSMSTransport(), max_workers=4)
+    channel.rate_limiter = TokenBucket(rate=50, capacity=2)  # Instead of the shared "fake" provider bucket
+    start = time.monotonic()
+    results = channel.send_many([("", f"555-000-000{i}", "Hi") for i in range(6)])
+
+    assert results == [True] * 6
+    assert time.monotonic() - start >= 4 / 50 * 0.9  # Two from the burst, four paced at 50/s
+
+# ============================
+# SMS Channel
+# ============================
+
+def test_sms_channel_sends_through_the_transport():
+    transport = FakeSMSTransport()
+    channel = SMSChannel(transport)
+    long_text = "x" * (SMS_MAX_LENGTH + 20)
+
+    assert channel.send_many([("Subject", "555-000-0001", "Hello"), ("", "555-000-0002", long_text)]) == [True, True]
+    assert sorted(transport.sent) == [("555-000-0001", "Hello"), ("555-000-0002", "x" * SMS_MAX_LENGTH)]
+
+
+def test_sms_channel_reports_failures_per_message():
+    channel = SMSChannel(SlowTransport(delay=0, fail_for={"555-000-0002"}))
+    messages = [("", f"555-000-000{i}", "Hi") for i in range(1, 4)]
+
+    assert channel.send_many(messages) == [True, False, True]
+
+
+def test_sms_channel_bounds_concurrent_sends():
+    transport = SlowTransport()
+    channel = SMSChannel(transport, max_workers=2)
+
+    assert channel.send_many([("", f"555-000-000{i}", "Hi") for i in range(6)]) == [True] * 6
+    assert transport.max_active == 2
+
+# ============================
+# Email / SMS Fallback
+# ============================
+
+@pytest.fixture
+def fake_sms(email_settings, monkeypatch):
+    """SMS_TRANSPORT=fake on top of the local SMTP server. Yields the fake transport."""
+    from components import config
+
+    monkeypatch.chdir(REPOSITORY)  # Templates are read from templates/
+    monkeypatch.setenv("SMS_TRANSPORT", "fake")
+    config.reload_settings()
+    monkeypatch.setattr(notifications, "_sms_channel", None)
+    monkeypatch.setattr(notifications, "start_email_worker", lambda: None)  # The test drains the outbox itself
+    yield notifications.get_sms_channel().transport
+
+
+def test_customers_without_email_get_an_sms(database, fake_sms, email_settings):
+    notifications.send_appointment_confirmation(1, "Ana", "ana@example.com", "Eyebrows", "2026-10-19",
+                                                combos=[], customer_phone="555-000-0001")
+    notifications.send_appointment_confirmation(2, "Bea", "", "Eyebrows", "2026-10-19",
+                                                customer_phone="555-000-0002")
+    with get_db_connection() as conn:
+        queued = [tuple(row) for row in conn.execute("SELECT channel, recipient FROM outbox ORDER BY id")]
+    assert queued == [("email", "ana@example.com"), ("sms", "555-000-0002")]
+
+    assert OutboxWorker(notifications.get_channel_senders()).drain_once() == 2
+    assert [envelope.rcpt_tos for envelope in email_settings.messages] == [["ana@example.com"]]
+    assert [number for number, text in fake_sms.sent] == ["555-000-0002"]
+    assert "Bea" in fake_sms.sent[0][1]
+
+
+def test_no_sms_channel_without_a_transport(database, email_settings, monkeypatch):
+    from components import config
+
+    monkeypatch.delenv("SMS_TRANSPORT", raising=False)
+    config.reload_settings()
+    monkeypatch.setattr(notifications, "_sms_channel", None)
+
+    assert notifications.get_sms_channel() is None
+    assert not notifications.queue_sms("555-000-0002", "Hi")
+    assert set(notifications.get_channel_senders()) == {"email"}
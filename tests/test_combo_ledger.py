@@ -0,0 +1,52 @@
+from components.combo import add_combo, delete_combo_type
+from components.combo_ledger import reconcile_combo_balances
+from components.customer import add_customer, get_customer_by_phone_cached
+from components.db import get_db_connection
+
+
+def test_deleting_a_combo_type_revokes_its_customer_combos(database):
+    with get_db_connection() as conn:
+        combo_type_id = conn.execute(
+            "INSERT INTO combo_types (name, total_uses) VALUES ('Retired Combo', 5)"
+        ).lastrowid
+        kept_type_id = conn.execute("SELECT id FROM combo_types WHERE id != ? LIMIT 1", (combo_type_id,)).fetchone()[0]
+        conn.commit()
+    for i in range(3):
+        assert add_customer(f"Customer {i}", f"555-000-000{i}", None, combo_type_id)
+    assert add_combo(1, kept_type_id)
+    assert len(get_customer_by_phone_cached("555-000-0000")["Combos"]) == 2  # Cached before the delete
+
+    assert delete_combo_type(combo_type_id)
+
+    with get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM combos WHERE combo_type_id = ?", (combo_type_id,)).fetchone()[0] == 0
+        revokes = conn.execute(
+            "SELECT customer_id, delta, balance_after FROM combo_ledger WHERE event = 'revoke' ORDER BY customer_id"
+        ).fetchall()
+    assert [tuple(row) for row in revokes] == [(1, -5, 0), (2, -5, 0), (3, -5, 0)]
+    assert reconcile_combo_balances() == []
+    assert len(get_customer_by_phone_cached("555-000-0000")["Combos"]) == 1
+
+
+def test_reconciliation_checks_without_the_write_lock_and_repairs(database):
+    import sqlite3
+
+    assert add_customer("Customer", "555-000-0000", None, 1)
+    with get_db_connection() as conn:
+        combo_id, balance = conn.execute("SELECT id, remaining_uses FROM combos").fetchone()
+        conn.execute("UPDATE combos SET remaining_uses = remaining_uses + 2 WHERE id = ?", (combo_id,))
+        conn.commit()
+
+    writer = sqlite3.connect(database, timeout=0)
+    writer.execute("BEGIN IMMEDIATE")  # A booking in progress
+    try:
+        mismatches = reconcile_combo_balances()
+    finally:
+        writer.rollback()
+        writer.close()
+    assert [(row["combo_id"], row["remaining_uses"], row["ledger_balance"]) for row in mismatches] == [
+        (combo_id, balance + 2, balance)
+    ]
+
+    assert len(reconcile_combo_balances(repair=True)) == 1
+    assert reconcile_combo_balances() == []
@@ -0,0 +1,83 @@
+import random
+import threading
+
+from components.appointment import book_appointment, delete_appointment
+from components.combo import add_combo
+from components.combo_ledger import reconcile_combo_balances
+from components.db import get_db_connection
+
+THREADS = 8
+ATTEMPTS_PER_THREAD = 10
+TOTAL_USES = 30  # Fewer than the attempts, so some bookings must be turned away
+CANCEL_PROBABILITY = 0.3
+
+
+def _customer_with_combo():
+    with get_db_connection() as conn:
+        combo_type_id = conn.execute(
+            "INSERT INTO combo_types (name, total_uses) VALUES ('Test Combo', ?)", (TOTAL_USES,)
+        ).lastrowid
+        # No email, so cancellations don't queue messages
+        customer_id = conn.execute(
+            "INSERT INTO customers (name, phone, email) VALUES ('Test Customer', '5559999999', NULL)"
+        ).lastrowid
+        conn.commit()
+    assert add_combo(customer_id, combo_type_id)
+    with get_db_connection() as conn:
+        combo_id = conn.execute("SELECT id FROM combos WHERE customer_id = ?", (customer_id,)).fetchone()[0]
+    return customer_id, combo_id
+
+
+def test_concurrent_redemptions_keep_every_use(database):
+    customer_id, combo_id = _customer_with_combo()
+    lock = threading.Lock()
+    totals = {"booked": 0, "rejected": 0, "cancelled": 0}
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(ATTEMPTS_PER_THREAD):
+                booking = book_appointment(customer_id, 1, "2026-10-18", use_combo=True, combo_id=combo_id)
+                with lock:
+                    totals["booked" if booking else "rejected"] += 1
+                if booking and rng.random() < CANCEL_PROBABILITY and delete_appointment(booking["AppointmentID"]):
+                    with lock:
+                        totals["cancelled"] += 1
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with get_db_connection() as conn:
+        remaining = conn.execute("SELECT remaining_uses FROM combos WHERE id = ?", (combo_id,)).fetchone()[0]
+        linked = conn.execute("SELECT COUNT(*) FROM appointments WHERE combo_id = ?", (combo_id,)).fetchone()[0]
+
+    assert errors == []
+    assert totals["rejected"] > 0
+    assert remaining == TOTAL_USES - totals["booked"] + totals["cancelled"]
+    assert linked == TOTAL_USES - remaining
+    assert remaining >= 0
+    assert reconcile_combo_balances() == []
+
+
+def test_refunds_stop_at_the_total_uses(database, caplog):
+    customer_id, combo_id = _customer_with_combo()
+    with get_db_connection() as conn:
+        # Linked to the combo without redeeming a use, e.g. imported or edited by hand
+        appointment_id = conn.execute(
+            "INSERT INTO appointments (customer_id, service_id, date, combo_id) VALUES (?, 1, '2026-10-18', ?)",
+            (customer_id, combo_id)
+        ).lastrowid
+        conn.commit()
+
+    assert delete_appointment(appointment_id)
+
+    with get_db_connection() as conn:
+        assert conn.execute("SELECT remaining_uses FROM combos WHERE id = ?", (combo_id,)).fetchone()[0] == TOTAL_USES
+        assert conn.execute("SELECT COUNT(*) FROM combo_ledger WHERE event = 'refund'").fetchone()[0] == 0
+    assert f"Combo ID {combo_id} was not refunded" in caplog.text
@@ -0,0 +1,72 @@
+import types
+
+from components import customer as customer_module
+from components.customer import (
+    add_customer, edit_customer, get_customer_by_phone_cached, invalidate_customer_cache,
+    search_customers_by_phone_prefix
+)
+
+
+def _count_fetches(monkeypatch, during_fetch=None):
+    """Counts database lookups made by the cache; `during_fetch` runs right after each one."""
+    fetches = []
+    fetch = customer_module._fetch_customer_by_phone
+
+    def counting_fetch(conn, phone):
+        fetches.append(phone)
+        result = fetch(conn, phone)
+        if during_fetch:
+            during_fetch()
+        return result
+
+    monkeypatch.setattr(customer_module, "_fetch_customer_by_phone", counting_fetch)
+    return fetches
+
+
+def test_lookups_are_cached_until_a_write_invalidates_them(database, monkeypatch):
+    assert add_customer("Ana", "555-000-0001", None, 1)
+    fetches = _count_fetches(monkeypatch)
+
+    assert get_customer_by_phone_cached(" 555-000-0001 ")["Name"] == "Ana"
+    assert get_customer_by_phone_cached("555-000-0001")["Name"] == "Ana"
+    assert len(fetches) == 1
+
+    assert edit_customer(get_customer_by_phone_cached("555-000-0001")["ID"], "Ana Maria", None)
+    assert get_customer_by_phone_cached("555-000-0001")["Name"] == "Ana Maria"
+    assert len(fetches) == 2
+
+
+def test_a_lookup_racing_an_invalidation_is_not_cached(database, monkeypatch):
+    assert add_customer("Ana", "555-000-0001", None, 1)
+    fetches = _count_fetches(monkeypatch, during_fetch=invalidate_customer_cache)
+
+    get_customer_by_phone_cached("555-000-0001")
+    get_customer_by_phone_cached("555-000-0001")
+    assert len(fetches) == 2  # The first result may predate the write, so it was not stored
+
+
+def test_cached_lookups_expire(database, monkeypatch):
+    assert add_customer("Ana", "555-000-0001", None, 1)
+    fetches = _count_fetches(monkeypatch)
+    clock = types.SimpleNamespace(monotonic=lambda: 1000.0)
+    monkeypatch.setattr(customer_module, "time", clock)
+
+    assert get_customer_by_phone_cached("555-000-0002") is None  # Misses are cached too
+    get_customer_by_phone_cached("555-000-0002")
+    assert len(fetches) == 1
+
+    clock.monotonic = lambda: 1000.0 + customer_module.CUSTOMER_CACHE_TTL
+    get_customer_by_phone_cached("555-000-0002")
+    assert len(fetches) == 2
+
+
+def test_prefix_search(database):
+    for i, phone in enumerate(["555-100-0001", "555-100-0002", "555-109-0000", "555-200-0000"]):
+        assert add_customer(f"Customer {i}", phone, None, 1)
+
+    assert [row["Phone"] for row in search_customers_by_phone_prefix("555-10")] == [
+        "555-100-0001", "555-100-0002", "555-109-0000"
+    ]
+    assert [row["Phone"] for row in search_customers_by_phone_prefix("555-100", limit=1)] == ["555-100-0001"]
+    assert search_customers_by_phone_prefix("556") == []
+    assert search_customers_by_phone_prefix("  ") == []
@@ -0,0 +1,84 @@
+import socket
+import time
+from email.message import EmailMessage
+
+import pytest
+
+from components.mailer import SMTPSession
+
+
+def _message(to_email, subject="Hello"):
+    message = EmailMessage()
+    message["From"] = "salon@example.com"
+    message["To"] = to_email
+    message["Subject"] = subject
+    message.set_content("<b>Hi</b>", subtype="html")
+    return message
+
+
+@pytest.fixture
+def session(smtp_server):
+    host, port, _ = smtp_server
+    session = SMTPSession(host, port, "salon@example.com", "secret", use_tls=False, timeout=5)
+    yield session
+    session.close()
+
+
+def test_send_many_reuses_one_connection(session, smtp_server):
+    _, _, recorder = smtp_server
+    results = session.send_many([_message(f"customer{i}@example.com") for i in range(5)])
+    results += session.send_many([_message("customer5@example.com")])
+
+    assert results == [True] * 6
+    assert len(recorder.messages) == 6
+    assert session.connections_opened == 1
+    assert recorder.logins == 1
+
+
+def test_reconnects_after_idle_timeout(session, smtp_server):
+    _, _, recorder = smtp_server
+    session.idle_timeout = 0.05
+    assert session.send(_message("first@example.com"))
+    time.sleep(0.1)
+    assert session.send(_message("second@example.com"))
+
+    assert session.connections_opened == 2
+    assert recorder.logins == 2
+    assert len(recorder.messages) == 2
+
+
+def test_reconnects_when_the_server_dropped_the_session(session, smtp_server):
+    assert session.send(_message("first@example.com"))
+    session._smtp.sock.shutdown(socket.SHUT_RDWR)  # As if the server had timed the session out
+
+    assert session.send(_message("second@example.com"))
+    assert session.connections_opened == 2
+
+
+def test_send_many_reports_failures_per_message(session, smtp_server):
+    _, _, recorder = smtp_server
+    recorder.refused_recipients.add("unknown@example.com")
+    results = session.send_many([
+        _message("a@example.com"), _message("unknown@example.com"), _message("b@example.com"),
+    ])
+
+    assert results == [True, False, True]
+    assert [envelope.rcpt_tos for envelope in recorder.messages] == [["a@example.com"], ["b@example.com"]]
+    assert session.connections_opened == 1  # A refused recipient keeps the session
+
+
+def test_failed_login_fails_the_batch_after_one_handshake(session, smtp_server):
+    _, _, recorder = smtp_server
+    recorder.reject_login = True
+    results = session.send_many([_message(f"customer{i}@example.com") for i in range(4)])
+
+    assert results == [False] * 4
+    assert recorder.logins == 1
+    assert session.connections_opened == 0
+    assert recorder.messages == []
+
+
+def test_unreachable_server_fails_the_batch(smtp_server):
+    host, port, _ = smtp_server
+    session = SMTPSession(host, 1, use_tls=False, timeout=1)
+    assert session.send_many([_message("a@example.com"), _message("b@example.com")]) == [False, False]
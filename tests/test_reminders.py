@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from components import notifications
+from components.channels import EmailChannel
+from components.db import get_db_connection
+from components.outbox import OutboxWorker
+from components.reminders import get_reminder_status, queue_reminders
+
+DATE = "2026-10-19"
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def appointments(database, monkeypatch):
+    """Four appointments on DATE for customers with email, one for a customer reachable by phone only."""
+    monkeypatch.chdir(REPOSITORY)  # Templates are read from templates/
+    with get_db_connection() as conn:
+        for i in range(5):
+            email = f"customer{i}@example.com" if i < 4 else None
+            customer_id = conn.execute(
+                "INSERT INTO customers (name, phone, email) VALUES (?, ?, ?)", (f"Customer {i}", f"555-000-000{i}", email)
+            ).lastrowid
+            conn.execute("INSERT INTO appointments (customer_id, service_id, date) VALUES (?, 1, ?)", (customer_id, DATE))
+        conn.execute("INSERT INTO appointments (customer_id, service_id, date) VALUES (1, 1, '2026-10-20')")
+        conn.commit()
+
+
+def test_queue_reminders_is_idempotent(appointments):
+    assert queue_reminders(DATE, batch_size=3) == 4  # Across two batches; no SMS, so the phone-only customer waits
+    assert queue_reminders(DATE, batch_size=3) == 0
+    assert queue_reminders(DATE, sms_enabled=True) == 1  # Only the customer without email is left
+
+    with get_db_connection() as conn:
+        recipients = [row[0] for row in conn.execute("SELECT recipient FROM outbox ORDER BY id")]
+    assert recipients == [f"customer{i}@example.com" for i in range(4)] + ["555-000-0004"]
+    assert get_reminder_status(DATE) == {"pending": 5}
+
+
+def test_reminders_go_out_over_one_smtp_session(appointments, email_settings):
+    queue_reminders(DATE)
+    worker = OutboxWorker({"email": EmailChannel(notifications.send_emails).send_many})
+
+    assert worker.drain_once() == 4
+    assert get_reminder_status(DATE) == {"sent": 4}
+    assert len(email_settings.messages) == 4
+    assert email_settings.logins == 1
+    assert notifications.get_smtp_session().connections_opened == 1
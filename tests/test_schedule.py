@@ -0,0 +1,61 @@
+from components.appointment import book_appointment, delete_appointment
+from components.customer import delete_customer
+from components.db import get_db_connection
+from components.schedule import add_stylist, find_free_slots, get_stylists, has_conflict, set_service_duration
+
+DATE = "2026-10-19"
+
+
+def _setup():
+    """One customer, one stylist and a 75-minute service; returns (customer_id, stylist_id, service_id)."""
+    with get_db_connection() as conn:
+        customer_id = conn.execute(
+            "INSERT INTO customers (name, phone, email) VALUES ('Schedule Customer', '555-100-0000', NULL)"
+        ).lastrowid
+        conn.commit()
+    assert add_stylist("Ana")
+    assert set_service_duration(1, 75)
+    return customer_id, get_stylists()[0]["id"], 1
+
+
+def test_overlapping_bookings_are_rejected(database):
+    customer_id, stylist_id, service_id = _setup()
+    assert book_appointment(customer_id, service_id, DATE, stylist_id=stylist_id, start_time="10:00")
+
+    assert has_conflict(stylist_id, DATE, "11:00", service_id)
+    assert not has_conflict(stylist_id, DATE, "11:15", service_id)  # Starts as the first one ends
+    assert not book_appointment(customer_id, service_id, DATE, stylist_id=stylist_id, start_time="11:00")
+    assert not book_appointment(customer_id, service_id, DATE, stylist_id=stylist_id, start_time="18:00")  # Past closing
+    assert book_appointment(customer_id, service_id, DATE, stylist_id=stylist_id, start_time="11:15")
+
+
+def test_free_slots_follow_bookings_and_cancellations(database):
+    customer_id, stylist_id, service_id = _setup()
+    all_slots = find_free_slots(stylist_id, DATE, service_id)
+    assert all_slots[0] == "10:00" and all_slots[-1] == "17:45"
+
+    booking = book_appointment(customer_id, service_id, DATE, stylist_id=stylist_id, start_time="10:00")
+    slots = find_free_slots(stylist_id, DATE, service_id)
+    assert slots[0] == "11:15"
+
+    assert delete_appointment(booking["AppointmentID"])
+    assert find_free_slots(stylist_id, DATE, service_id) == all_slots
+
+
+def test_deleting_the_customer_frees_their_slots(database):
+    customer_id, stylist_id, service_id = _setup()
+    assert book_appointment(customer_id, service_id, DATE, stylist_id=stylist_id, start_time="10:00")
+    assert find_free_slots(stylist_id, DATE, service_id)[0] == "11:15"  # The day is cached now
+
+    assert delete_customer(customer_id)
+
+    assert find_free_slots(stylist_id, DATE, service_id)[0] == "10:00"
+    assert not has_conflict(stylist_id, DATE, "10:00", service_id)
+
+
+def test_a_stylist_without_a_start_time_is_rejected(database):
+    customer_id, stylist_id, service_id = _setup()
+    assert not book_appointment(customer_id, service_id, DATE, stylist_id=stylist_id)
+    assert not book_appointment(customer_id, service_id, DATE, start_time="10:00")
+    with get_db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM appointments").fetchone()[0] == 0
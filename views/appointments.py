@@ -0,0 +1,99 @@
+import streamlit as st
+from components.appointment import book_appointment
+from components.combo import get_customer_combos, get_services_for_combo
+from components.customer import get_customer_by_phone_cached, search_customers_by_phone_prefix
+from components.notifications import send_appointment_confirmation
+from components.schedule import add_stylist, find_free_slots, get_stylists
+from views.common import tracked_fragment
+
+# ============================
+# Appointment Management
+# ============================
+st.subheader("Appointment Management")
+
+
+# Typing a phone number, picking a slot or booking reruns only the form
+@tracked_fragment("Appointment Management: booking form")
+def booking_form():
+    st.write("### Book an Appointment")
+    phone = st.text_input("Customer Phone Number (for appointment)")
+
+    # Typeahead: offer matching customers as soon as part of the number is typed
+    if phone:
+        matches = search_customers_by_phone_prefix(phone)
+        if matches and not any(match["Phone"] == phone.strip() for match in matches):
+            match_options = {f"{match['Phone']} - {match['Name']}": match["Phone"] for match in matches}
+            phone = match_options[st.selectbox("Matching Customers", options=list(match_options.keys()))]
+
+    date = st.date_input("Appointment Date")
+
+    customer = get_customer_by_phone_cached(phone) if phone else None
+
+    if customer:
+        all_services = get_services_for_combo(None)
+        service_options = {service['name']: service['id'] for service in all_services}
+        selected_service = st.selectbox("Select a Service", list(service_options.keys()))
+        selected_service_id = service_options[selected_service]
+
+        use_combo = st.checkbox("Use Available Combo")
+        selected_combo_id = None
+
+        if use_combo:
+            available_combos = get_customer_combos(customer["ID"])
+            if available_combos:
+                combo_options = {f"{combo['name']} (Remaining: {combo['remaining_uses']})": combo['id'] for combo in available_combos}
+                selected_combo = st.selectbox("Select a Combo", options=list(combo_options.keys()))
+                selected_combo_id = combo_options[selected_combo]
+            else:
+                st.warning("No available combos for this customer.")
+
+        # Stylist and time slot (bookings stay date-only until stylists are added)
+        stylists = get_stylists()
+        selected_stylist_id = None
+        selected_start_time = None
+        if stylists:
+            stylist_options = {stylist['name']: stylist['id'] for stylist in stylists}
+            selected_stylist = st.selectbox("Select a Stylist", list(stylist_options.keys()))
+            selected_stylist_id = stylist_options[selected_stylist]
+            free_slots = find_free_slots(selected_stylist_id, str(date), selected_service_id)
+            if free_slots:
+                selected_start_time = st.selectbox("Select a Time", free_slots)
+            else:
+                st.warning(f"{selected_stylist} has no free time for this service on {date}.")
+
+        if st.button("Book Appointment", disabled=bool(stylists) and not selected_start_time):
+            booking = book_appointment(
+                customer["ID"], selected_service_id, str(date), use_combo=True, combo_id=selected_combo_id,
+                stylist_id=selected_stylist_id, start_time=selected_start_time
+            )
+            if booking:
+                st.success(f"Appointment booked for {customer['Name']} on {date} with service {selected_service}!")
+
+                # Send email confirmation, or an SMS if the customer has no email
+                booked_customer = booking["Customer"]
+                if booked_customer["Email"] or booked_customer["Phone"]:
+                    send_appointment_confirmation(
+                        booked_customer["ID"], # Pass customer ID
+                        booked_customer["Name"],
+                        booked_customer["Email"],
+                        selected_service,
+                        date,
+                        combos=booking["Combos"], # Combos as of the booking, no re-query
+                        customer_phone=booked_customer["Phone"]
+                    )
+
+                st.rerun(scope="fragment")
+            else:
+                st.error("Failed to book appointment.")
+
+
+booking_form()
+
+with st.expander("Manage Stylists"):
+    stylist_name = st.text_input("Stylist Name")
+    if st.button("Add Stylist"):
+        if stylist_name and add_stylist(stylist_name):
+            st.success(f"Stylist '{stylist_name}' added successfully!")
+            st.rerun()
+        else:
+            st.error("Failed to add the stylist. The name may already exist.")
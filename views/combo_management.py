@@ -0,0 +1,37 @@
+import streamlit as st
+from components.combo import add_combo_type, delete_combo_type, get_combo_types, get_services_for_combo
+
+# ============================
+# Combo Management
+# ============================
+st.subheader("Combo Management")
+
+# Add a new combo type
+st.write("### Add a New Combo Type")
+combo_name = st.text_input("Combo Name")
+total_uses = st.number_input("Total Uses", min_value=1, step=1)
+
+all_services = get_services_for_combo(None)
+service_options = {service['name']: service['id'] for service in all_services}
+selected_services = st.multiselect("Select Services for Combo", list(service_options.keys()))
+
+if st.button("Add Combo Type"):
+    selected_service_ids = [service_options[service] for service in selected_services]
+    if add_combo_type(combo_name, selected_service_ids, total_uses):
+        st.success(f"Combo type '{combo_name}' added successfully with services {selected_services}!")
+        st.rerun()
+    else:
+        st.error("Failed to add the combo type. It may already exist.")
+
+# View, edit, and delete combo types
+st.write("### Existing Combo Types")
+combo_types = get_combo_types()
+if combo_types:
+    for combo in combo_types:
+        st.write(f"**ID:** {combo['id']}, **Name:** {combo['name']}, **Total Uses:** {combo['total_uses']}")
+        if st.button(f"Delete Combo '{combo['name']}'", key=f"delete_combo_{combo['id']}"):
+            if delete_combo_type(combo['id']):
+                st.success(f"Combo '{combo['name']}' deleted successfully!")
+                st.rerun()
+            else:
+                st.error(f"Failed to delete combo '{combo['name']}'.")
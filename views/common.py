@@ -0,0 +1,20 @@
+import functools
+import streamlit as st
+from components.instrumentation import rerun_section
+
+
+def tracked_fragment(label):
+    """
+    Decorator for `st.fragment` functions whose SQL statements are listed as their own rerun
+    on the Query Stats page.
+
+    A widget inside a fragment reruns only the fragment, not the page script, so without
+    this its statements would count towards the page's last full rerun.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with rerun_section(label):
+                return func(*args, **kwargs)
+        return st.fragment(run)
+    return decorate
@@ -0,0 +1,80 @@
+import datetime
+import streamlit as st
+from components.combo import get_combo_types
+from components.combo_ledger import get_customer_combo_history
+from components.customer import add_combo_to_existing_customer, get_customer_by_phone, remove_combo_from_customer
+
+# ============================
+# Customer N Combo Management
+# ============================
+st.subheader("Customer & Combo Management")
+
+# Search for customer by phone
+st.write("### Search for a Customer")
+phone = st.text_input("Enter Customer Phone Number")
+
+if st.button("Search Customer"):
+    customer = get_customer_by_phone(phone)
+    if customer:
+        st.session_state["customer_data"] = customer
+    else:
+        st.error("Customer not found.")
+
+# Display and manage customer combos
+if "customer_data" in st.session_state and st.session_state["customer_data"]:
+    customer = st.session_state["customer_data"]
+    st.write(f"**Customer Name:** {customer['Name']}")
+    st.write(f"**Phone:** {customer['Phone']}")
+    st.write(f"**Email:** {customer['Email']}")
+
+    # Display customer's current combos
+    st.write("### Combos for the Customer:")
+    if customer["Combos"]:
+        for combo in customer["Combos"]:
+            st.write(f"- {combo['name']} ({combo['remaining_uses']})")
+
+        # Remove a combo
+        combo_options = {f"{combo['name']}": combo["id"] for combo in customer["Combos"]}
+        selected_combo_to_remove = st.selectbox("Select a Combo to Remove", options=list(combo_options.keys()))
+
+        if st.button("Remove Selected Combo"):
+            if remove_combo_from_customer(customer["ID"], combo_options[selected_combo_to_remove]):
+                st.success(f"Combo '{selected_combo_to_remove}' removed successfully.")
+                st.rerun()
+            else:
+                st.error("Failed to remove combo.")
+
+    else:
+        st.write("No active combos.")
+
+    # Add a new combo
+    st.write("### Add a New Combo for This Customer")
+    available_combos = get_combo_types()
+    combo_selection = {f"{combo['name']} (Uses: {combo['total_uses']})": combo['id'] for combo in available_combos}
+    new_combo_selected = st.selectbox("Select a New Combo", options=list(combo_selection.keys()))
+
+    if st.button("Add Selected Combo"):
+        if add_combo_to_existing_customer(customer["ID"], combo_selection[new_combo_selected]):
+            st.success(f"New combo '{new_combo_selected}' added successfully!")
+            st.rerun()
+        else:
+            st.error("Failed to add combo.")
+
+    # Every grant, redemption, refund and revocation, newest first
+    with st.expander("Combo History"):
+        history = get_customer_combo_history(customer["ID"])
+        if history:
+            st.table([
+                {
+                    "When": datetime.datetime.fromtimestamp(entry["created_at"]).strftime("%Y-%m-%d %H:%M"),
+                    "Combo": entry["combo_name"] or f"#{entry['combo_id']}",
+                    "Event": entry["event"].title(),
+                    "Change": f"{entry['delta']:+d}",
+                    "Balance": entry["balance_after"],
+                    "Appointment": entry["appointment_id"] or "",
+                    "Note": entry["note"] or "",
+                }
+                for entry in history
+            ])
+        else:
+            st.write("No combo activity recorded.")
@@ -0,0 +1,100 @@
+import streamlit as st
+from components.combo import get_combo_types
+from components.customer import add_customer, delete_customer, edit_customer, get_customer_by_phone
+from views.common import tracked_fragment
+
+# ============================
+# Customer Management
+# ============================
+st.subheader("Customer Management")
+
+# Add a new customer with a combo
+st.write("### Add a New Customer with Combo")
+name = st.text_input("Customer Name")
+phone = st.text_input("Phone Number")
+email = st.text_input("Email Address")
+
+# Dropdown to select a combo type
+combo_types = get_combo_types()
+if combo_types:
+    combo_type_options = {f"{combo['name']} (Uses: {combo['total_uses']})": combo['id'] for combo in combo_types}
+    selected_combo = st.selectbox("Select a Combo", options=list(combo_type_options.keys()))
+    selected_combo_id = combo_type_options[selected_combo]
+else:
+    st.warning("No combo types available. Please add combos in the Combo Management tab.")
+    selected_combo_id = None
+
+if st.button("Add Customer with Combo"):
+    if selected_combo_id and add_customer(name, phone, email, selected_combo_id):
+        st.success(f"Customer '{name}' added successfully with combo '{selected_combo}'!")
+        st.session_state["search_query"] = phone  # Auto-store newly added customer for quick lookup
+        st.rerun()
+    else:
+        st.error("Failed to add the customer. Please ensure the information is correct.")
+
+
+# Searching reruns only this part of the page; editing or deleting the found customer reruns the page
+@tracked_fragment("Customer Management: search")
+def customer_search():
+    # Search for a customer by phone
+    st.write("### Search Customer by Phone")
+
+    # Ensure search query persists in session state
+    if "search_query" not in st.session_state:
+        st.session_state["search_query"] = ""
+
+    search_query = st.text_input("Enter Customer Phone Number", st.session_state["search_query"])
+
+    if st.button("Search"):
+        customer = get_customer_by_phone(search_query)
+        if customer:
+            st.session_state["search_query"] = search_query  # Persist search query
+            st.session_state["customer_data"] = customer  # Store customer data
+            st.session_state["editing"] = False  # Ensure editing state resets
+        else:
+            st.error("Customer not found.")
+
+    # Display customer details if found
+    if "customer_data" in st.session_state and st.session_state["customer_data"]:
+        customer = st.session_state["customer_data"]
+
+        st.write("### Customer Details")
+        st.write(f"**ID:** {customer['ID']}")
+        st.write(f"**Name:** {customer['Name']}")
+        st.write(f"**Phone:** {customer['Phone']} (Phone Number is not editable)")
+        st.write(f"**Email:** {customer['Email']}")
+        st.write(f"**Combos:** {customer['Combos']}")
+
+        # Edit Customer Button
+        with st.expander("Edit Customer"):
+            new_name = st.text_input("New Name", customer['Name'])
+            new_email = st.text_input("New Email", customer['Email'])
+
+            if st.button("Update Customer Details"):
+                result = edit_customer(customer['ID'], new_name, new_email)
+
+                if result == 'email_exists':
+                    st.error(f"Failed to update customer. Email '{new_email}' is already in use by another customer.")
+                elif result:
+                    st.success(f"Customer {customer['Name']} updated successfully!")
+                    st.session_state["customer_data"]["Name"] = new_name  # Update session data
+                    st.session_state["customer_data"]["Email"] = new_email
+                    st.rerun()
+                else:
+                    st.error("Failed to update customer.")
+
+        # Delete Customer Button (No Confirmation, Immediate Deletion)
+        if st.button("Delete Customer"):
+            delete_status = delete_customer(customer['ID'])  # Try deleting the customer
+            if delete_status:
+                st.success(f"Customer {customer['Name']} deleted successfully!")
+
+                # Ensure UI refreshes correctly
+                st.session_state.pop("customer_data", None)
+                st.session_state.pop("search_query", None)
+                st.rerun()
+            else:
+                st.error("Failed to delete customer. Customer might not exist.")
+
+
+customer_search()
@@ -0,0 +1,99 @@
+import datetime
+import streamlit as st
+from components.backup import backup_to_bytes, create_snapshot, read_manifest, restore_database
+from components.export import export_data
+
+# ============================
+# Download Data Tab
+# ============================
+st.subheader("Download Customer Data")
+st.write("Choose a format and the tables to include, then prepare the export. Nothing is written to disk.")
+
+export_format = st.radio("Export Format", ["CSV", "Parquet"], horizontal=True)
+include_appointments = st.checkbox("Include appointments")
+include_combo_history = st.checkbox("Include combo history")
+
+if st.button("Prepare Export"):
+    export = export_data(export_format.lower(), include_appointments, include_combo_history)
+    if export:
+        st.session_state["export_file"] = export  # Kept per session, so admins don't overwrite each other
+        st.success("Customer data is ready for download!")
+    else:
+        st.session_state.pop("export_file", None)
+        st.error("Failed to export customer data.")
+
+if "export_file" in st.session_state:
+    export = st.session_state["export_file"]
+    st.download_button(
+        label=f"Download {export['file_name']}",
+        data=export["data"],
+        file_name=export["file_name"],
+        mime=export["mime"]
+    )
+
+st.write("---")
+
+# ---- Warning Notice for Admin Only ----
+st.warning("Do Not Use. (For Admin use Only)")
+
+st.subheader("Database Backup")
+st.write("Prepare a backup of the entire database, then download it. Use this backup to restore data if needed. "
+         "The backup is taken online, so the app keeps working while it runs.")
+compress_backup = st.checkbox("Compress backup (gzip)")
+if st.button("Prepare Database Backup"):
+    try:
+        st.session_state["db_backup"] = backup_to_bytes(compress_backup)
+    except Exception as e:
+        st.session_state.pop("db_backup", None)
+        st.error(f"An error occurred while backing up the database: {e}")
+
+if "db_backup" in st.session_state:
+    db_backup = st.session_state["db_backup"]
+    st.download_button(
+        label=f"Download {db_backup['file_name']}",
+        data=db_backup["data"],
+        file_name=db_backup["file_name"],
+        mime=db_backup["mime"]
+    )
+    st.caption(f"SHA-256: {db_backup['sha256']}")
+
+snapshots = read_manifest()
+with st.expander(f"Scheduled Snapshots ({len(snapshots)})"):
+    if st.button("Take Snapshot Now"):
+        try:
+            create_snapshot()
+            snapshots = read_manifest()
+            st.success("Snapshot created.")
+        except Exception as e:
+            st.error(f"Error creating snapshot: {e}")
+    st.table([
+        {
+            "File": snapshot["file"],
+            "Created": datetime.datetime.fromtimestamp(snapshot["created_at"]).strftime("%Y-%m-%d %H:%M"),
+            "Size (KB)": round(snapshot["size"] / 1024, 1),
+            "SHA-256": snapshot["sha256"][:16],
+        }
+        for snapshot in snapshots
+    ])
+
+st.write("---")
+
+# ---- Warning Notice for Admin Only ----
+st.warning("Do Not Use. (For Admin use Only)")
+
+# ---- New Database Restore Section ----
+st.subheader("Restore Database Backup")
+st.write("Upload the database backup file you previously downloaded. It is checked first and then swapped in while the app keeps running. **Warning:** This action will replace all current data.")
+
+uploaded_file = st.file_uploader("Upload Database Backup", type=["db", "gz"])
+if uploaded_file is not None:
+    if st.button("Restore Database"):
+        # The upload is validated before anything is replaced, and a snapshot of the
+        # current database is kept in database/backups
+        with st.spinner("Validating and restoring..."):
+            restored, message = restore_database(uploaded_file)
+        if restored:
+            st.session_state.pop("db_backup", None)
+            st.success(f"{message} A snapshot of the previous data was saved in database/backups.")
+        else:
+            st.error(message)
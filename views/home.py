@@ -0,0 +1,13 @@
+import streamlit as st
+
+# ============================
+# Home Page
+# ============================
+st.subheader("Welcome to Ani's Threading and Skincare Management System!")
+st.write("""
+    This system allows you to:
+    - Manage customers and assign combos.
+    - Handle combo packages for discounted services.
+    - Schedule and manage appointments.
+    - Track combo usage and appointment history.
+""")
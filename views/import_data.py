@@ -0,0 +1,34 @@
+import streamlit as st
+from components.bulk_import import import_file
+
+# ============================
+# Import Data
+# ============================
+st.subheader("Import Data")
+st.write("Upload a CSV or Excel (.xlsx) file. Customers need `name` and `phone` columns (optional: `email`, `combo`, `remaining_uses`). "
+         "Appointments need `phone`, `service` and `date`. Import customers before their appointments.")
+
+import_kind = st.radio("Import", ["Customers", "Appointments"], horizontal=True)
+upload = st.file_uploader("Upload File", type=["csv", "xlsx"])
+
+if upload is not None and st.button("Import"):
+    progress_text = st.empty()
+    result = import_file(
+        import_kind.lower(), upload, upload.name,
+        progress=lambda read, inserted: progress_text.write(f"{read} rows read, {inserted} imported...")
+    )
+    summary = result.summary()
+    if result.error:
+        st.error(f"Import failed: {result.error}")
+    if summary["rows_read"] or not result.error:
+        st.success(f"Imported {summary['inserted']} of {summary['rows_read']} rows"
+                   + (f" and {summary['combos_added']} combos." if summary["combos_added"] else "."))
+    if result.rejected:
+        st.warning(f"{summary['rejected']} rows were rejected.")
+        st.dataframe(result.rejected[:100])
+        st.download_button(
+            label="Download Rejected Rows",
+            data=result.rejected_csv(),
+            file_name=f"rejected_{import_kind.lower()}.csv",
+            mime="text/csv"
+        )
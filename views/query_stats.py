@@ -0,0 +1,53 @@
+import datetime
+import streamlit as st
+from components.instrumentation import (
+    get_current_rerun_id, get_function_stats, get_rerun_stats, get_slow_queries, get_slow_query_threshold,
+    get_statement_stats, reset_stats, set_slow_query_threshold
+)
+
+# ============================
+# Query Stats (admin)
+# ============================
+st.subheader("Query Stats")
+st.write("SQL statements issued through the connection pool since the server started.")
+
+threshold = st.number_input("Slow query threshold (ms)", min_value=1.0,
+                            value=float(get_slow_query_threshold()), step=10.0)
+if threshold != get_slow_query_threshold():
+    set_slow_query_threshold(threshold)
+if st.button("Reset Statistics"):
+    reset_stats()
+    st.rerun()
+
+# Leave out this page's own rerun; other sessions' reruns may be newer
+current_rerun_id = get_current_rerun_id()
+reruns = [rerun for rerun in get_rerun_stats() if rerun["id"] != current_rerun_id]
+st.write("### Recent Reruns")
+if reruns:
+    st.dataframe([
+        {"Rerun": rerun["id"], "Page": rerun["label"],
+         "Started": datetime.datetime.fromtimestamp(rerun["started_at"]).strftime("%H:%M:%S"),
+         "Queries": rerun["queries"], "Time (ms)": round(rerun["total_ms"], 2), "Rows": rerun["rows"]}
+        for rerun in reruns
+    ])
+    labels = {f"#{rerun['id']} {rerun['label']}": rerun for rerun in reruns}
+    selected = st.selectbox("Statements per function in rerun", list(labels.keys()))
+    st.dataframe(labels[selected]["functions"])
+else:
+    st.info("No reruns recorded yet.")
+
+st.write("### Per Component Function")
+st.dataframe(get_function_stats())
+
+st.write("### Most Expensive Statements")
+st.dataframe(get_statement_stats())
+
+st.write("### Slow Queries")
+slow_queries = get_slow_queries()
+if slow_queries:
+    st.dataframe([
+        {**query, "started_at": datetime.datetime.fromtimestamp(query["started_at"]).strftime("%Y-%m-%d %H:%M:%S")}
+        for query in slow_queries
+    ])
+else:
+    st.info(f"No statement has taken {get_slow_query_threshold():g} ms or longer.")
@@ -0,0 +1,88 @@
+import calendar
+import datetime
+import streamlit as st
+from components.appointment import count_appointments_by_day, delete_appointment, get_appointments_in_range
+from components.combo import get_services_for_combo
+from views.common import tracked_fragment
+
+# Appointments listed per page
+APPOINTMENTS_PAGE_SIZE = 20
+
+# ============================
+# View Appointments
+# ============================
+st.subheader("View Appointments")
+
+# Ensure selected date exists and is valid
+if "selected_date" not in st.session_state or not isinstance(st.session_state["selected_date"], datetime.date):
+    st.session_state["selected_date"] = datetime.date.today()  # Default to today
+
+view = st.radio("View", ["Day", "Week", "Month"], horizontal=True)
+st.session_state["selected_date"] = st.date_input("Select a Date", value=st.session_state["selected_date"])
+selected_date = st.session_state["selected_date"]
+
+all_services = get_services_for_combo(None)
+service_filter = {"All Services": None, **{service['name']: service['id'] for service in all_services}}
+selected_service_id = service_filter[st.selectbox("Service", list(service_filter.keys()))]
+
+# Date range for the selected view
+if view == "Day":
+    start_date = end_date = selected_date
+elif view == "Week":
+    start_date = selected_date - datetime.timedelta(days=selected_date.weekday())
+    end_date = start_date + datetime.timedelta(days=6)
+else:
+    start_date = selected_date.replace(day=1)
+    end_date = selected_date.replace(day=calendar.monthrange(selected_date.year, selected_date.month)[1])
+
+# Restart paging whenever the range or filter changes
+range_key = (str(start_date), str(end_date), selected_service_id)
+if st.session_state.get("appointment_range") != range_key:
+    st.session_state["appointment_range"] = range_key
+    st.session_state["appointment_cursors"] = [None]  # Cursor each visited page starts after
+
+
+# Deleting an appointment or paging reruns only the list (and the counts above it)
+@tracked_fragment("View Appointments: appointment list")
+def appointment_list(view, start_date, end_date, selected_service_id):
+    if view != "Day":
+        daily_counts = count_appointments_by_day(str(start_date), str(end_date), selected_service_id)
+        st.write(f"### {start_date} to {end_date}: {sum(daily_counts.values())} appointments")
+        if daily_counts:
+            st.table([{"Date": day, "Appointments": total} for day, total in sorted(daily_counts.items())])
+
+    cursors = st.session_state["appointment_cursors"]
+    page = get_appointments_in_range(
+        str(start_date), str(end_date), service_id=selected_service_id,
+        after=cursors[-1], limit=APPOINTMENTS_PAGE_SIZE
+    )
+
+    # Display appointments
+    if page["Appointments"]:
+        st.write(f"Page {len(cursors)}")
+        for appointment in page["Appointments"]:
+            st.write(f"**Appointment ID:** {appointment['ID']}")
+            st.write(f"**Customer:** {appointment['Name']} ({appointment['Phone']})")
+            st.write(f"**Service:** {appointment['Service']}")
+            st.write(f"**Date:** {appointment['Date']}")
+
+            # Delete appointment button
+            if st.button(f"Delete Appointment {appointment['ID']}", key=f"delete_appointment_{appointment['ID']}"):
+                if delete_appointment(appointment['ID']):
+                    st.success(f"Appointment ID {appointment['ID']} deleted successfully!")
+                    st.rerun(scope="fragment")
+                else:
+                    st.error(f"Failed to Delete the appointment ID {appointment['ID']}")
+            st.write("---") #seperator
+
+        # Callbacks move the cursor before the rerun the click starts, so no second rerun is needed
+        previous_column, next_column = st.columns(2)
+        if len(cursors) > 1:
+            previous_column.button("Previous Page", on_click=cursors.pop)
+        if page["NextCursor"]:
+            next_column.button("Next Page", on_click=cursors.append, args=(page["NextCursor"],))
+    else:
+        st.write("No appointments found for this period")
+
+
+appointment_list(view, start_date, end_date, selected_service_id)